@@ -2,57 +2,19 @@
 # autor: Luis Emilio Veledíaz Flores - A01029829
 # fecha: 19 de Noviembre de 2025
 
-from random_agents.agent import RandomAgent, DirtCell, ChargingStation, ObstacleAgent
+from random_agents.agent import RandomAgent
 from random_agents.model import RandomModel
+from roomba_common.layers import SpaceLayers
 
 from mesa.visualization import (
     Slider,
     SolaraViz,
-    make_space_component,
-    make_plot_component,
 )
-from mesa.visualization.components import AgentPortrayalStyle
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
 import solara
 
 
-def roombaPortrayal(agent):
-    """
-    define la representación visual de cada agente.
-    parámetros:
-        agent: agente a representar
-    retorna: estilo de representación del agente
-    """
-    if agent is None:
-        return  # no dibuja si no hay agente
-
-    # crea un estilo de representación base
-    portrayal = AgentPortrayalStyle(
-        size=100,
-        marker="s",
-    )
-
-    # asigna color y propiedades según el tipo de agente
-    if isinstance(agent, RandomAgent):
-        portrayal.color = "red"  # roomba es rojo
-        portrayal.zorder = 3  # se dibuja encima
-    elif isinstance(agent, DirtCell):
-        portrayal.zorder = 0  # se dibuja al fondo
-        if agent.isDirty:
-            portrayal.color = "tab:brown"  # tile sucia es cafecito
-            portrayal.size = 100
-        else:
-            portrayal.color = "white"  # tile limpia es blanca
-            portrayal.size = 0  # no se ve
-    elif isinstance(agent, ChargingStation):
-        portrayal.color = "tab:green"  # cargador es verde
-        portrayal.zorder = 2
-    elif isinstance(agent, ObstacleAgent):
-        portrayal.color = "black"  # obstáculo es negro
-        portrayal.zorder = 1
-
-    return portrayal  # retorna el estilo del agente
-
-
 # parámetros del modelo que se pueden ajustar en la interfaz
 modelParams = {
     "seed": {
@@ -65,31 +27,73 @@ modelParams = {
     "dirtyPercentage": Slider("Dirty Cells (%)", 30, 0, 100),  # porcentaje de suciedad
     "obstaclePercentage": Slider("Obstacles (%)", 15, 0, 100),  # porcentaje de obstáculos
     "maxSteps": Slider("Max Steps", 10000, 1000, 100000),  # límite máximo de pasos
+    "recordReplay": {
+        "type": "Checkbox",
+        "value": False,
+        "label": "Record Replay",
+    },
 }
 
 
-def postProcessSpace(ax):
-    """ajusta el aspecto del espacio visual."""
-    ax.set_aspect("equal")  # asegura que el grid sea cuadrado
-
-
 def postProcessLines(ax):
     """ajusta el aspecto de los gráficos de líneas."""
     ax.legend(loc="center left", bbox_to_anchor=(1, 0.9))
 
 
-# componente que visualiza el grid con los agentes
-spaceComponent = make_space_component(
-    roombaPortrayal,  # función que define cómo se ven los agentes
-    draw_grid=False,  # no dibuja líneas de grid
-    post_process=postProcessSpace,  # aplica ajustes visuales
-)
+def spaceComponent(model):
+    """
+    visualiza el grid por capas: fondo png fijo con la suciedad inicial, capas svg con
+    las tiles limpiadas (solo cambia la última) y los roombas encima.
+    parámetros:
+        model: modelo de la simulación
+    retorna: componente con la imagen del grid
+    """
+    layers = solara.use_memo(lambda: SpaceLayers(model), dependencies=[model])
+    size = {"width": f"{layers.pixelWidth}px", "height": f"{layers.pixelHeight}px"}
+
+    with solara.Div(style={"position": "relative", **size}) as main:
+        solara.Image(layers.background, width=size["width"])
+        for overlay in layers.cleanOverlays(model):
+            solara.HTML(tag="div", unsafe_innerHTML=overlay, style="position: absolute; top: 0; left: 0;")
+        solara.HTML(tag="div", unsafe_innerHTML=layers.sprites(model), style="position: absolute; top: 0; left: 0;")
+    return main
+
+
+# colores de las líneas con datos del modelo (mismos 4 datos en ambas simulaciones)
+LINE_COLORS = {
+    "Movement Count": "tab:blue",
+    "Step Limit": "tab:red",
+    "Percentage Clean": "tab:green",
+    "Battery": "tab:orange",
+}
 
-# componente que visualiza gráficos de líneas con datos del modelo
-plotComponent = make_plot_component(
-    {"Movement Count": "tab:blue", "Step Limit": "tab:red", "Percentage Clean": "tab:green", "Battery": "tab:orange"},
-    post_process=postProcessLines,  # aplica ajustes visuales
-)
+# puntos máximos por línea: historias largas se muestrean para que dibujar no dependa del número de pasos
+MAX_PLOT_POINTS = 500
+
+
+def plotComponent(model):
+    """
+    grafica las líneas del datacollector muestreando como máximo MAX_PLOT_POINTS puntos.
+    parámetros:
+        model: modelo de la simulación
+    retorna: componente con la gráfica
+    """
+    modelVars = model.datacollector.model_vars
+    numPoints = len(modelVars["Battery"])
+    stride = max(1, -(-numPoints // MAX_PLOT_POINTS))  # división hacia arriba
+    # índices muestreados, incluyendo siempre el último dato
+    indices = list(range(0, numPoints, stride))
+    if indices and indices[-1] != numPoints - 1:
+        indices.append(numPoints - 1)
+
+    fig = Figure()
+    ax = fig.subplots()
+    for name, color in LINE_COLORS.items():
+        values = modelVars[name]
+        ax.plot(indices, [values[i] for i in indices], label=name, color=color)
+    ax.set_xlabel("Step")
+    postProcessLines(ax)
+    return solara.FigureMatplotlib(fig)
 
 
 def metricsComponent(model):
@@ -116,13 +120,57 @@ def metricsComponent(model):
 - **Batería restante:** {agent.battery if agent else 0}%
 """)
 
+
+def replayComponent(model):
+    """
+    muestra un slider para revisar cualquier paso grabado sin volver a simular.
+    parámetros:
+        model: modelo de la simulación
+    retorna: componente con el slider y el frame reconstruido
+    """
+    tick, setTick = solara.use_state(0)
+
+    if model.replay is None:
+        return solara.Markdown("*Activa **Record Replay** y reinicia el modelo para grabar la corrida.*")
+
+    replay = model.replay
+    # la bitácora crece mientras el hilo de mesa avanza el modelo; record() publica cada
+    # tick ya completo, así que basta leer numTicks una vez
+    numTicks = replay.numTicks
+    tick = min(tick, numTicks - 1)
+    frame = replay.seek(tick)
+    stepValue = replay.stepValues[tick]
+
+    # capas: 0 libre, 1 sucia, 2 obstáculo, 3 cargador
+    image = frame["dirt"].astype(int)
+    image[replay.blocked] = 2
+    image[replay.stationPos[:, 0], replay.stationPos[:, 1]] = 3
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.imshow(image.T, origin="lower", cmap=ListedColormap(["white", "tab:brown", "black", "tab:green"]), vmin=0, vmax=3)
+    ax.scatter(frame["pos"][:, 0], frame["pos"][:, 1], color="red", marker="s")
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    with solara.Column() as main:
+        solara.SliderInt("Replay Step", value=tick, on_value=setTick, min=0, max=numTicks - 1)
+        solara.Text(f"Paso del modelo: {stepValue}")
+        solara.FigureMatplotlib(fig)
+    return main
+
 # crea la instancia del modelo
 model = RandomModel()
 
 # crea la página de visualización con todos los componentes
 page = SolaraViz(
     model,
-    components=[spaceComponent, plotComponent, metricsComponent],  # componentes a mostrar
+    components=[spaceComponent, plotComponent, metricsComponent, replayComponent],  # componentes a mostrar
     model_params=modelParams,  # parámetros
     name="Simulación de Roomba Individual - A01029829",  # nombre de la simulación
+    # los controles de mesa avanzan el modelo en un hilo aparte, render_interval pasos
+    # por cuadro (se ajustan en la barra lateral)
+    play_interval=50,  # milisegundos entre cuadros
+    render_interval=10,  # pasos por cuadro
+    use_threads=True,
 )
\ No newline at end of file
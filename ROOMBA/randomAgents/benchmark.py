@@ -0,0 +1,142 @@
+# simulación 1: suite de benchmarks (velocidad) y KPIs (comportamiento) del roomba
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+
+
+# escenarios fijos: tamaños x semillas
+SIZES = ((20, 20), (50, 50), (100, 100))
+QUICK_SIZES = ((20, 20), (40, 40))
+SEEDS = (1, 2, 3, 42)
+MAX_STEPS = 5000
+
+# KPIs de getMetrics que deben quedar idénticos entre versiones
+KPIS = ("timeSteps", "timeAllClean", "percentageClean", "movementCount")
+
+
+def parseArgs(argv=None):
+    """lee las opciones del benchmark desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Benchmark y KPIs de la simulación del roomba.")
+    parser.add_argument("--quick", action="store_true", help="solo escenarios pequeños")
+    parser.add_argument("--no-memory", action="store_true", help="no mide memoria pico (más rápido)")
+    parser.add_argument("--output", default="benchmark.json", help="archivo json con los resultados")
+    parser.add_argument("--compare", default=None, help="resultados anteriores contra los cuales comparar")
+    parser.add_argument("--tolerance", type=float, default=0.8,
+                        help="fracción mínima de ticks/s respecto a --compare antes de avisar")
+    return parser.parse_args(argv)
+
+
+def scenarios(quick=False):
+    """retorna la lista de escenarios (nombre y parámetros del modelo)."""
+    result = []
+    for width, height in (QUICK_SIZES if quick else SIZES):
+        for seed in SEEDS:
+            result.append({
+                "name": f"{width}x{height}-s{seed}",
+                "params": {"width": width, "height": height, "maxSteps": MAX_STEPS, "seed": seed},
+            })
+    return result
+
+
+def runScenario(modelClass, params, measureMemory=True):
+    """
+    corre un escenario hasta terminar.
+    parámetros:
+        modelClass: clase del modelo
+        params: parámetros del constructor
+        measureMemory: si es True repite la corrida con tracemalloc para medir memoria pico
+    retorna: diccionario con tiempos, memoria y getMetrics()
+    """
+    start = perf_counter()
+    model = modelClass(**params)
+    constructSeconds = perf_counter() - start
+
+    ticks = 0
+    start = perf_counter()
+    while model.running:
+        model.step()
+        ticks += 1
+    runSeconds = perf_counter() - start
+
+    result = {
+        "constructSeconds": constructSeconds,
+        "ticks": ticks,
+        "runSeconds": runSeconds,
+        "ticksPerSecond": ticks / runSeconds if runSeconds > 0 else 0.0,
+        "metrics": model.getMetrics(),
+    }
+
+    # tracemalloc hace lenta la corrida: la memoria se mide en una segunda pasada
+    if measureMemory:
+        tracemalloc.start()
+        model = modelClass(**params)
+        while model.running:
+            model.step()
+        result["peakMemoryMB"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    compara resultados contra una corrida anterior.
+    retorna: (lista de diferencias de KPIs, lista de avisos de velocidad)
+    """
+    previous = {s["name"]: s for s in baseline["scenarios"]}
+    kpiChanges, slowdowns = [], []
+    for scenario in results["scenarios"]:
+        old = previous.get(scenario["name"])
+        if old is None:
+            continue
+        for kpi in KPIS:
+            before, after = old["metrics"].get(kpi), scenario["metrics"].get(kpi)
+            if before != after:
+                kpiChanges.append(f"{scenario['name']}: {kpi} {before} -> {after}")
+        ratio = scenario["ticksPerSecond"] / old["ticksPerSecond"] if old["ticksPerSecond"] else 1.0
+        if ratio < tolerance:
+            slowdowns.append(f"{scenario['name']}: ticks/s x{ratio:.2f} "
+                             f"({old['ticksPerSecond']:.0f} -> {scenario['ticksPerSecond']:.0f})")
+    return kpiChanges, slowdowns
+
+
+def main(argv=None):
+    """corre la suite, guarda los resultados y (opcional) los compara con una corrida anterior."""
+    args = parseArgs(argv)
+
+    from random_agents.model import RandomModel as modelClass
+
+    results = {
+        "model": modelClass.__name__,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scenarios": [],
+    }
+    for scenario in scenarios(args.quick):
+        data = runScenario(modelClass, scenario["params"], not args.no_memory)
+        results["scenarios"].append({**scenario, **data})
+        print(f"{scenario['name']:<20} construcción {data['constructSeconds']:7.3f}s "
+              f"{data['ticksPerSecond']:10.1f} ticks/s  {data['metrics']}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        kpiChanges, slowdowns = compare(results, baseline, args.tolerance)
+        for line in slowdowns:
+            print(f"más lento: {line}")
+        for line in kpiChanges:
+            print(f"KPI distinto: {line}")
+        if kpiChanges:
+            sys.exit(1)  # el comportamiento de limpieza cambió
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# simulación 1: corridas sin interfaz (batch) del roomba individual
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import argparse
+import json
+import sys
+
+
+def parseArgs(argv=None):
+    """lee los parámetros de la corrida desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Corre la simulación del roomba individual sin visualización.")
+    parser.add_argument("--num-agents", type=int, default=1, help="número de roombas")
+    parser.add_argument("--width", type=int, default=20, help="ancho del grid")
+    parser.add_argument("--height", type=int, default=20, help="alto del grid")
+    parser.add_argument("--dirty", type=int, default=30, help="porcentaje de tiles sucias (0-100)")
+    parser.add_argument("--obstacles", type=int, default=15, help="porcentaje de obstáculos (0-100)")
+    parser.add_argument("--max-steps", type=int, default=10000, help="número máximo de pasos")
+    parser.add_argument("--seed", type=int, default=42, help="semilla")
+    parser.add_argument("--steps", type=int, default=None, help="pasos a correr (por defecto hasta terminar)")
+    parser.add_argument("--planner", choices=("hpa", "jps"), default=None,
+                        help="planeador de rutas (por defecto el movimiento original)")
+    parser.add_argument("--floor-plan", default=None,
+                        help="plano de piso (.txt, .pgm o .png); reemplaza --width/--height/--obstacles")
+    parser.add_argument("--profile", default=None,
+                        help="archivo json con tiempos por fase/estado y llamadas a funciones auxiliares")
+    parser.add_argument("--trace", default=None, help="archivo de traza (formato chrome://tracing)")
+    parser.add_argument("--output", default=None, help="archivo json de salida (por defecto stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """corre el modelo y escribe getMetrics() como json."""
+    args = parseArgs(argv)
+
+    # importa solo el modelo (sin solara ni matplotlib) y hasta después de leer los argumentos
+    from random_agents.model import RandomModel
+
+    model = RandomModel(numAgents=args.num_agents, width=args.width, height=args.height,
+                        dirtyPercentage=args.dirty, obstaclePercentage=args.obstacles,
+                        maxSteps=args.max_steps, seed=args.seed, planner=args.planner,
+                        floorPlan=args.floor_plan)
+
+    profiler = model.enableProfiling(trace=args.trace is not None) if args.profile or args.trace else None
+
+    if args.steps is None:
+        while model.running:
+            model.step()
+    else:
+        for _ in range(args.steps):
+            if not model.running:
+                break
+            model.step()
+
+    metrics = model.getMetrics()
+    if profiler is not None:
+        if args.profile:
+            profiler.writeSummary(args.profile)
+        if args.trace:
+            profiler.writeTrace(args.trace)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(metrics, f)
+    else:
+        json.dump(metrics, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@
 
 from mesa.discrete_space import CellAgent, FixedAgent
 
+from roomba_common.coverage import VisitCounts
+
 
 class DirtCell(FixedAgent):
     """tile sucia que puede ser limpiada por el agente."""
@@ -19,7 +21,11 @@ class DirtCell(FixedAgent):
         pass
 
     def clean(self):
-        """marca la tile como limpia."""
+        """marca la tile como limpia y la anota en la lista de limpiezas del modelo."""
+        if self.isDirty:
+            self.model.cleanedTiles.append(self.cell.coordinate)  # evento para las capas de la vista
+            if self.model.reachableCells[self.model.cellId(self.cell)]:
+                self.model.remainingReachableDirt -= 1
         self.isDirty = False  # cambia el estado de sucia a limpia
 
 
@@ -50,25 +56,31 @@ class RandomAgent(CellAgent):
         self.cell = cell
         self.battery = 100  # batería inicial al 100%
         self.cleanedCells = 0  # contador de tiles limpias
-        self.state = "exploring"  # el estado inicial es explorar
+        self._state = "exploring"  # el estado inicial es explorar (ver propiedad state)
         self.movementCount = 0  # contador de movimientos realizados
         self.chargingTurns = 0  # contador de veces que se cargó
-        self.visited = set()  # conjunto de tiles visitadas
+        self.visited = VisitCounts(model.width, model.height)  # conteo uint32 de visitas por tile
         self.chargingStationPos = cell.coordinate  # posición del cargador
-        self.visitCount = {}  # contador de visitas por tile para priorizar no visitadas
+        self.visitCount = self.visited  # el mismo arreglo sirve de contador para priorizar no visitadas
+        self.clusterUnvisited = None  # tiles alcanzables sin visitar por cluster (solo con planner "hpa")
 
         # marca posición inicial como visitada
         if hasattr(self.cell, "coordinate"):
             self.visited.add(self.cell.coordinate)
-            self.visitCount[self.cell.coordinate] = 1
+            self.model.coverage.add(self.cell.coordinate)
+
+    @property
+    def state(self):
+        """estado actual de la máquina de estados."""
+        return self._state
 
-    def _isSafe(self, cell):
-        """verifica si una tile es segura para moverse sin obstáculos."""
-        # revisa si la tile tiene obstáculos o paredes
-        for agent in cell.agents:
-            if isinstance(agent, (ObstacleAgent, Wall)):
-                return False  # tile no segura si tiene obstáculo
-        return True  # tile segura si no tiene obstáculos
+    @state.setter
+    def state(self, value):
+        # avisa a la telemetría del modelo (si está activa) de cada cambio de estado
+        telemetry = self.model.telemetry
+        if telemetry is not None and value != self._state:
+            telemetry.record(self, self._state, value)
+        self._state = value
 
     def _distanceToCharger(self, cell=None):
         """calcula la distancia manhattan hasta el cargador."""
@@ -90,15 +102,8 @@ class RandomAgent(CellAgent):
         return self.battery <= 30 or self.battery <= distance + 5
 
     def _getSafeNeighbors(self):
-        """retorna lista de vecinos sin obstáculos."""
-        safeNeighbors = []
-        
-        # revisa cada vecino (8 direcciones)
-        for neighbor in self.cell.neighborhood:
-            if self._isSafe(neighbor):  # solo agrega si es segura
-                safeNeighbors.append(neighbor)
-        
-        return safeNeighbors
+        """retorna los vecinos sin obstáculos (precalculados en el grafo de navegación)."""
+        return self.model.safeNeighbors(self.cell)
 
     def _hasDirtInCell(self):
         """verifica si hay suciedad en la tile actual."""
@@ -130,7 +135,13 @@ class RandomAgent(CellAgent):
         return False  # no está en el cargador
 
     def moveTowardsCharger(self):
-        """se mueve hacia el cargador usando distancia manhattan."""
+        """se mueve hacia el cargador usando el planeador del modelo o distancia manhattan."""
+        if self.model.planner is not None:
+            step = self.model.planner.nextStep(self.cell, self.model.grid[self.chargingStationPos])
+            if step is not None:
+                self.moveToCell(step)
+                return
+
         safeNeighbors = self._getSafeNeighbors()
         if not safeNeighbors:
             return  # no hay vecinos seguros, no puede moverse
@@ -153,27 +164,56 @@ class RandomAgent(CellAgent):
             self.moveToCell(bestCell)
 
     def _findUnvisited(self):
-        """busca la tile no visitada más cercana usando BFS."""
-        queue = [(self.cell, [self.cell])]
-        visited = {self.cell}
+        """busca la tile no visitada más cercana usando BFS sobre el grafo de navegación."""
+        model = self.model
+        if model.planner is not None and model.planner.mode == "hpa":
+            return self._findUnvisitedHierarchical()
+
+        indptr, indices = model.navIndptr, model.navIndices
+        counts = self.visited.counts  # conteos por id de tile
+
+        start = model.cellId(self.cell)
+        queue = [start]
+        parent = {start: None}  # también sirve como conjunto de tiles ya encoladas
         index = 0
-        
+
         while index < len(queue):
-            currentCell, path = queue[index]
+            current = queue[index]
             index += 1
-            
-            # si encontramos una tile no visitada, retorna el camino
-            if currentCell.coordinate not in self.visited:
-                return path
-            
+
+            # si encontramos una tile no visitada, reconstruye el camino
+            if counts[current] == 0:
+                path = []
+                while current is not None:
+                    path.append(model.cellsById[current])
+                    current = parent[current]
+                return path[::-1]
+
             # expandir búsqueda a vecinos seguros
-            for neighbor in currentCell.neighborhood:
-                if neighbor not in visited and self._isSafe(neighbor):
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
-        
+            for j in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[j]
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+
         return None  # no hay tile no visitadas accesibles
 
+    def _findUnvisitedHierarchical(self):
+        """busca una tile no visitada cercana revisando solo clusters que aún tienen tiles sin visitar."""
+        planner = self.model.planner
+        counts = self.visited.counts
+        if self.clusterUnvisited is None:
+            # conteo inicial; después se actualiza en moveToCell
+            mask = bytes(count == 0 and reached for count, reached in zip(counts, self.model.reachableCells))
+            self.clusterUnvisited = planner.freeCellsPerCluster(mask)
+
+        tallies = self.clusterUnvisited
+        return planner.findNearest(
+            self.cell,
+            isTarget=lambda cellId: counts[cellId] == 0,
+            clusterHasTarget=lambda cluster: tallies[cluster] > 0,
+        )
+
     def moveToUnvisited(self):
         """se mueve a un tile no visitada usando BFS o explora localmente."""
         # buscar tile no visitada más cercana
@@ -202,10 +242,14 @@ class RandomAgent(CellAgent):
         self.battery = max(0, self.battery - 1)  # consume 1% de batería
         self.movementCount += 1  # incrementa contador de movimientos
 
-        # marca como visitada y actualiza contador
+        # marca como visitada y actualiza contador (propio y compartido)
         if hasattr(self.cell, "coordinate"):
+            if self.clusterUnvisited is not None and self.cell.coordinate not in self.visited:
+                cellId = self.model.cellId(self.cell)
+                if self.model.reachableCells[cellId]:
+                    self.clusterUnvisited[self.model.planner.clusterOf(cellId)] -= 1
             self.visited.add(self.cell.coordinate)
-            self.visitCount[self.cell.coordinate] = self.visitCount.get(self.cell.coordinate, 0) + 1
+            self.model.coverage.add(self.cell.coordinate)
 
     def clean(self):
         """limpia la tile actual si contiene suciedad."""
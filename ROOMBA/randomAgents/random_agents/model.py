@@ -2,19 +2,37 @@
 # autor: Luis Emilio Veledíaz Flores - A01029829
 # fecha: 19 de Noviembre de 2025
 
+from array import array
+from collections import deque
+
+import numpy as np
 from mesa import Model
+from mesa.agent import AgentSet
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.datacollection import DataCollector
 
+from roomba_common.coverage import CoverageMap
+from roomba_common.pathfinding import PathPlanner
+from roomba_common.floorplan import FloorPlan, loadFloorPlan
+from roomba_common.profiling import TickProfiler
+from roomba_common.telemetry import StateTelemetry
+
 from .agent import RandomAgent, ObstacleAgent, DirtCell, ChargingStation
+from .snapshot import saveSnapshot, loadSnapshot
+from .replay import ReplayLog
+
+
+# desplazamientos de la vecindad Moore en el orden en que mesa arma cell.neighborhood
+NEIGHBOR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
 
 
 class RandomModel(Model):
     """modelo con un roomba que limpia tiles sucias."""
 
     steps = 0
+    MAX_WORLD_ATTEMPTS = 100  # intentos máximos para generar un mundo conectado
 
-    def __init__(self, numAgents=1, width=20, height=20, dirtyPercentage=30, obstaclePercentage=15, maxSteps=10000, seed=42):
+    def __init__(self, numAgents=1, width=20, height=20, dirtyPercentage=30, obstaclePercentage=15, maxSteps=10000, seed=42, legacyShuffle=False, recordReplay=False, keyframeInterval=1000, requireConnected=False, planner=None, clusterSize=10, floorPlan=None):
         """
         crea el modelo.
         parámetros:
@@ -25,8 +43,23 @@ class RandomModel(Model):
             obstaclePercentage: porcentaje de tiles con obstáculos (0-100)
             maxSteps: número máximo de pasos permitidos
             seed: semilla
+            legacyShuffle: si es True baraja todos los agentes como antes (para comparar corridas viejas)
+            recordReplay: si es True graba la corrida en self.replay para revisarla después
+            keyframeInterval: cada cuántos pasos la grabación guarda un keyframe completo
+            requireConnected: si es True regenera el mundo hasta que todas las tiles libres sean alcanzables
+            planner: None (búsquedas originales), "hpa" (rutas jerárquicas) o "jps" (jump point search)
+            clusterSize: lado de los clusters del planeador "hpa"
+            floorPlan: FloorPlan o ruta de un plano de piso; si se da, el mundo sale del plano
+                (width y height se toman del plano)
         """
         super().__init__(seed=seed)
+
+        # plano de piso opcional: define el tamaño y las capas del mundo
+        if floorPlan is not None and not isinstance(floorPlan, FloorPlan):
+            floorPlan = loadFloorPlan(floorPlan)
+        self.floorPlan = floorPlan
+        if floorPlan is not None:
+            width, height = floorPlan.width, floorPlan.height
         
         # guarda parámetros del modelo
         self.numAgents = numAgents
@@ -38,16 +71,72 @@ class RandomModel(Model):
         self.maxSteps = maxSteps  # límite máximo de pasos
         self.steps = 0  # contador de pasos de simulación
         self.timeAllClean = None  # tiempo cuando todas las tiles se limpian
+        self.timeReachableClean = None  # tiempo cuando se limpió toda la suciedad alcanzable
+        self.requireConnected = requireConnected
+        self.legacyShuffle = legacyShuffle  # orden de activación anterior
+        self.clusterSize = clusterSize
+        self.profiler = None  # medidor de tiempos (ver enableProfiling)
+        self.telemetry = None  # transiciones de estado de los roombas (ver enableTelemetry)
+        self.cleanedTiles = []  # coordenadas de las tiles limpiadas, en orden
 
         # crea el grid usando topología Moore (8 vecinos)
         self.grid = OrthogonalMooreGrid([width, height], torus=False, random=self.random)
         self.space = self.grid
 
-        # identifica coordenadas del borde de la grid
-        border = [(x, y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height-1] or x in [0, width - 1]]
+        # mapa de cobertura compartido (visitas por tile de todos los roombas)
+        self.coverage = CoverageMap(width, height)
+
+        # construye el mundo; con requireConnected lo regenera hasta que todo sea alcanzable
+        self._buildWorld()
+        self._buildNavigation()
+        self._analyzeReachability()
+        attempts = 1
+        while requireConnected and not self.fullyConnected:
+            if self.floorPlan is not None:
+                raise ValueError("el plano de piso tiene tiles libres inalcanzables")
+            if attempts >= self.MAX_WORLD_ATTEMPTS:
+                raise ValueError(f"no se generó un mundo conectado en {attempts} intentos")
+            self._clearWorld()
+            self._buildWorld()
+            self._buildNavigation()
+            self._analyzeReachability()
+            attempts += 1
+
+        # planeador de rutas opcional para mapas grandes (se construye sobre el grafo final)
+        self.planner = PathPlanner(self, planner, clusterSize) if planner else None
+
+        self.running = True  # bool de simulación activa
+
+        # configura recopilación de datos del modelo (los reporteros solo leen al roomba
+        # del conjunto activo, no recorren las paredes ni las tiles sucias)
+        self.datacollector = DataCollector(
+            model_reporters={
+                # reporta número total de movimientos realizados
+                "Movement Count": lambda m: m.activeAgents[0].movementCount if len(m.activeAgents) > 0 else 0,
+                # reporta porcentaje de limpieza calculado en tiempo real
+                "Percentage Clean": lambda m: (m.activeAgents[0].cleanedCells / m.numDirtCells * 100) if len(m.activeAgents) > 0 and m.numDirtCells > 0 else 0,
+                # reporta el límite de steps (línea de referencia)
+                "Step Limit": lambda m: (m.steps / m.maxSteps * 100) if m.maxSteps > 0 else 0,
+                # reporta la batería actual del roomba
+                "Battery": lambda m: m.activeAgents[0].battery if len(m.activeAgents) > 0 else 0,
+            }
+        )
+        self.datacollector.collect(self)  # recopila datos iniciales
+
+        # bitácora de repetición opcional
+        self.replay = ReplayLog(self, keyframeInterval) if recordReplay else None
+
+    def _buildWorld(self):
+        """coloca paredes, cargador, roomba, obstáculos y tiles sucias en el grid."""
+        if self.floorPlan is not None:
+            self._buildWorldFromPlan()
+            return
+
+        # identifica coordenadas del borde de la grid (set para revisar en O(1))
+        border = {(x, y)
+                  for y in range(self.height)
+                  for x in range(self.width)
+                  if y in [0, self.height-1] or x in [0, self.width - 1]}
 
         # crea obstáculos invisibles en el borde (paredes para contener el grid)
         for _, cell in enumerate(self.grid):
@@ -66,42 +155,175 @@ class RandomModel(Model):
                          if cell.coordinate not in border and cell != chargingCell]
 
         # calcula número de obstáculos basado en porcentaje
-        numObstacles = max(0, int(len(availableCells) * (obstaclePercentage / 100)))
+        numObstacles = max(0, int(len(availableCells) * (self.obstaclePercentage / 100)))
 
         # crea obstáculos visibles aleatorios en el interior
         if numObstacles > 0:
             obstacleCells = self.random.sample(availableCells, numObstacles)
             for cell in obstacleCells:
                 ObstacleAgent(self, cell=cell)
-                availableCells.remove(cell)
+
+            # filtra en una sola pasada conservando el orden (mismos sorteos que antes)
+            taken = set(obstacleCells)
+            availableCells = [cell for cell in availableCells if cell not in taken]
 
         # calcula número de tiles sucias basado en porcentaje
-        numDirtCells = max(0, int(len(availableCells) * (dirtyPercentage / 100)))
+        numDirtCells = max(0, int(len(availableCells) * (self.dirtyPercentage / 100)))
 
         # crea tiles sucias en ubicaciones aleatorias
         dirtCells = self.random.sample(availableCells, numDirtCells)
         for cell in dirtCells:
             DirtCell(self, cell=cell)
-            availableCells.remove(cell)
+
+        # conjunto activo: solo los roombas se barajan y ejecutan cada paso,
+        # las capas estáticas (obstáculos, cargador, suciedad) quedan fuera
+        self.activeAgents = AgentSet(self.agents_by_type.get(RandomAgent, []), random=self.random)
 
         # guarda el número total de tiles sucias para calcular porcentaje después
         self.numDirtCells = numDirtCells
-        self.running = True  # bool de simulación activa
 
-        # configura recopilación de datos del modelo
-        self.datacollector = DataCollector(
-            model_reporters={
-                # reporta número total de movimientos realizados
-                "Movement Count": lambda m: m.agents_by_type[RandomAgent][0].movementCount if len(m.agents_by_type[RandomAgent]) > 0 else 0,
-                # reporta porcentaje de limpieza calculado en tiempo real
-                "Percentage Clean": lambda m: (m.agents_by_type[RandomAgent][0].cleanedCells / m.numDirtCells * 100) if len(m.agents_by_type[RandomAgent]) > 0 and m.numDirtCells > 0 else 0,
-                # reporta el límite de steps (línea de referencia)
-                "Step Limit": lambda m: (m.steps / m.maxSteps * 100) if m.maxSteps > 0 else 0,
-                # reporta la batería actual del roomba
-                "Battery": lambda m: m.agents_by_type[RandomAgent][0].battery if len(m.agents_by_type[RandomAgent]) > 0 else 0,
-            }
-        )
-        self.datacollector.collect(self)  # recopila datos iniciales
+    def _buildWorldFromPlan(self):
+        """
+        construye el mundo desde self.floorPlan. paredes y obstáculos quedan solo en la
+        capa bloqueada (sin un agente por tile); se crean agentes únicamente para el
+        cargador, el roomba y las tiles sucias.
+        """
+        plan = self.floorPlan
+        free = np.flatnonzero(~plan.blocked.ravel())  # ids de tiles libres (x * height + y)
+        if len(free) == 0:
+            raise ValueError("el plano de piso no tiene tiles libres")
+
+        # cargador: el primero marcado en el plano o la primera tile libre
+        if plan.chargers:
+            chargerCoord = plan.chargers[0]
+        else:
+            chargerCoord = divmod(int(free[0]), self.height)
+        chargingCell = self.grid[chargerCoord]
+        ChargingStation(self, cell=chargingCell)
+        RandomAgent(self, cell=chargingCell)
+        chargerId = self.cellId(chargingCell)
+
+        # suciedad: la marcada en el plano o un porcentaje aleatorio de las tiles libres
+        if plan.dirt.any():
+            dirtIds = np.flatnonzero(plan.dirt.ravel())
+            dirtIds = dirtIds[dirtIds != chargerId].tolist()
+        else:
+            availableIds = free[free != chargerId].tolist()
+            numDirtCells = max(0, int(len(availableIds) * (self.dirtyPercentage / 100)))
+            dirtIds = self.random.sample(availableIds, numDirtCells)
+
+        for cellId in dirtIds:
+            DirtCell(self, cell=self.grid[divmod(cellId, self.height)])
+
+        self.activeAgents = AgentSet(self.agents_by_type.get(RandomAgent, []), random=self.random)
+        self.numDirtCells = len(dirtIds)
+
+    def _clearWorld(self):
+        """quita todos los agentes del grid para volver a generar el mundo."""
+        for agent in list(self.agents):
+            agent.remove()
+        self.coverage.counts[:] = 0
+
+    def cellId(self, cell):
+        """retorna el id plano de una tile (x * height + y)."""
+        x, y = cell.coordinate
+        return x * self.height + y
+
+    def mapLayers(self):
+        """
+        retorna las capas del mundo que captura una plantilla de mapa (MapTemplate).
+        retorna: (máscara (width, height) de la suciedad colocada, coordenadas de los cargadores)
+        """
+        dirt = np.zeros((self.width, self.height), dtype=bool)
+        for agent in self.agents_by_type.get(DirtCell, []):
+            dirt[agent.cell.coordinate] = True
+        chargers = [s.cell.coordinate for s in self.agents_by_type.get(ChargingStation, [])]
+        return dirt, chargers
+
+
+    def _buildNavigation(self):
+        """
+        construye una sola vez el grafo de navegación de las tiles transitables.
+        los obstáculos no se mueven, así que los vecinos seguros de cada tile se
+        guardan en formato CSR: los vecinos de la tile i son
+        navIndices[navIndptr[i]:navIndptr[i + 1]], en el mismo orden que cell.neighborhood.
+        """
+        numCells = self.width * self.height
+
+        self.cellsById = [None] * numCells
+        for cell in self.grid:
+            self.cellsById[self.cellId(cell)] = cell
+
+        template = self.floorPlan if getattr(self.floorPlan, "navIndptr", None) is not None else None
+        if template is not None:
+            # plantilla de mapa: las capas precalculadas se usan sin copiarlas (solo lectura)
+            self.navBlocked, self.navIndptr, self.navIndices = template.navigationViews(self)
+        else:
+            # capa estática de tiles bloqueadas (obstáculos, incluido el borde, o el plano de piso)
+            if self.floorPlan is not None:
+                self.navBlocked = bytearray(self.floorPlan.blocked.tobytes())
+            else:
+                self.navBlocked = bytearray(numCells)
+            for agent in self.agents_by_type.get(ObstacleAgent, []):
+                self.navBlocked[self.cellId(agent.cell)] = 1
+
+            # vecinos de todas las tiles a la vez, en el orden de cell.neighborhood
+            blocked = np.frombuffer(bytes(self.navBlocked), dtype=np.uint8).reshape(self.width, self.height)
+            xs, ys = np.divmod(np.arange(numCells), self.height)
+            valid = np.zeros((numCells, len(NEIGHBOR_OFFSETS)), dtype=bool)
+            targets = np.zeros((numCells, len(NEIGHBOR_OFFSETS)), dtype=np.int64)
+            for k, (dx, dy) in enumerate(NEIGHBOR_OFFSETS):
+                nx, ny = xs + dx, ys + dy
+                inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+                nx, ny = np.where(inside, nx, 0), np.where(inside, ny, 0)
+                valid[:, k] = inside & (blocked[nx, ny] == 0)
+                targets[:, k] = nx * self.height + ny
+
+            self.navIndptr = array("i", [0])
+            self.navIndptr.frombytes(np.cumsum(valid.sum(axis=1), dtype=np.int32).tobytes())
+            self.navIndices = array("i")
+            self.navIndices.frombytes(targets[valid].astype(np.int32).tobytes())
+
+        # mismos vecinos como tuplas de tiles para los agentes
+        cells, indices, indptr = self.cellsById, self.navIndices.tolist(), self.navIndptr.tolist()
+        self.navNeighbors = [tuple([cells[j] for j in indices[indptr[i]:indptr[i + 1]]]) for i in range(numCells)]
+
+    def safeNeighbors(self, cell):
+        """retorna los vecinos transitables de una tile (precalculados)."""
+        return self.navNeighbors[self.cellId(cell)]
+
+    def _analyzeReachability(self):
+        """
+        calcula con flood fill (vecindad Moore) las tiles alcanzables desde el roomba
+        y separa la suciedad alcanzable de la que quedó encerrada por obstáculos.
+        """
+        indptr, indices = self.navIndptr, self.navIndices
+        starts = [self.cellId(a.cell) for a in self.activeAgents]
+
+        template = self.floorPlan if getattr(self.floorPlan, "reachableCells", None) is not None else None
+        if template is not None and set(starts) == {x * self.height + y for x, y in template.chargers}:
+            # mismos puntos de inicio que la plantilla: las tiles alcanzables ya están calculadas
+            reached = template.reachableView(self)
+        else:
+            reached = bytearray(self.width * self.height)
+            for start in starts:
+                reached[start] = 1
+            queue = deque(starts)
+            while queue:
+                current = queue.popleft()
+                for j in range(indptr[current], indptr[current + 1]):
+                    neighbor = indices[j]
+                    if not reached[neighbor]:
+                        reached[neighbor] = 1
+                        queue.append(neighbor)
+
+        dirt = self.agents_by_type.get(DirtCell, [])
+        self.reachableCells = reached  # 1 por cada tile (por id) a la que se puede llegar
+        self.reachableDirt = [a for a in dirt if reached[self.cellId(a.cell)]]
+        # suciedad alcanzable que falta limpiar; DirtCell.clean la descuenta
+        self.remainingReachableDirt = sum(1 for a in self.reachableDirt if a.isDirty)
+        self.numUnreachableDirt = len(dirt) - len(self.reachableDirt)  # nunca se podrán limpiar
+        self.fullyConnected = sum(reached) == len(reached) - sum(self.navBlocked)
 
     def getMetrics(self):
         """
@@ -115,9 +337,6 @@ class RandomModel(Model):
 
         totalDirtCells = self.numDirtCells  # total de tiles sucias al inicio
         cleanedCells = agent.cleanedCells  # tiles que limpió el agente
-        # calcula tiles sucias restantes
-        remainingDirty = sum(1 for a in self.agents if isinstance(a, DirtCell) and a.isDirty)
-
         # calcula porcentaje de limpieza respecto al total
         percentageClean = (cleanedCells / totalDirtCells * 100) if totalDirtCells > 0 else 0
 
@@ -125,12 +344,72 @@ class RandomModel(Model):
         metrics = {
             "timeSteps": self.steps,  # pasos totales de simulación
             "timeAllClean": self.timeAllClean if self.timeAllClean is not None else self.steps,  # pasos para limpiar todo
+            "timeReachableClean": self.timeReachableClean if self.timeReachableClean is not None else self.steps,  # pasos para limpiar lo alcanzable
             "percentageClean": percentageClean,  # porcentaje de limpieza
             "movementCount": agent.movementCount,  # movimientos realizados
         }
 
         return metrics
 
+    def snapshot(self):
+        """
+        guarda el estado completo de la simulación (tiles sucias, roomba, rng,
+        pasos y datos recolectados) en un snapshot binario.
+        retorna: bytes del snapshot
+        """
+        return saveSnapshot(self)
+
+    @classmethod
+    def fromSnapshot(cls, data, floorPlan=None):
+        """
+        crea un modelo a partir de un snapshot; continúa exactamente donde se guardó.
+        parámetros:
+            data: bytes creados con snapshot()
+            floorPlan: plano o plantilla del mundo (necesario si no venía de un archivo)
+        """
+        return loadSnapshot(cls, data, floorPlan)
+
+    def enableProfiling(self, trace=False):
+        """
+        activa la medición de tiempos por fase, por estado de los roombas y de llamadas
+        a sus funciones auxiliares.
+        parámetros:
+            trace: si es True también guarda cada evento para exportar una traza
+        retorna: TickProfiler con las mediciones
+        """
+        self.disableProfiling()
+        self.profiler = TickProfiler(trace)
+        self.profiler.attach(self)
+        return self.profiler
+
+    def disableProfiling(self):
+        """
+        desactiva la medición y quita los envoltorios de los roombas.
+        retorna: el TickProfiler que estaba activo (o None)
+        """
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            profiler.detach()
+        return profiler
+
+    def enableTelemetry(self, capacity=65536):
+        """
+        activa el registro de transiciones de estado de los roombas.
+        parámetros:
+            capacity: número de transiciones recientes que se guardan
+        retorna: StateTelemetry con los eventos y sus histogramas
+        """
+        self.telemetry = StateTelemetry(self, capacity)
+        return self.telemetry
+
+    def disableTelemetry(self):
+        """
+        desactiva el registro de transiciones.
+        retorna: la StateTelemetry que estaba activa (o None)
+        """
+        telemetry, self.telemetry = self.telemetry, None
+        return telemetry
+
     def step(self):
         """avanza el modelo un paso."""
         # verifica si se alcanzó el límite de pasos
@@ -146,16 +425,43 @@ class RandomModel(Model):
             self.running = False  # detiene la simulación
             return
 
-        # ejecuta un paso para todos los agentes (en orden aleatorio)
-        self.agents.shuffle_do("step")
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.startTick()
+
+        # ejecuta un paso para los roombas (en orden aleatorio)
+        if self.legacyShuffle:
+            self.agents.shuffle_do("step")  # baraja todos los agentes como antes
+        else:
+            self.activeAgents.shuffle_do("step")
         self.steps += 1  # incrementa contador de pasos
+        if profiler is not None:
+            profiler.mark("agents")
 
-        # verifica si todas las tiles están limpias
+        # verifica si todas las tiles están limpias (solo revisa la suciedad alcanzable)
         if self.timeAllClean is None:
-            remainingDirty = sum(1 for a in self.agents if isinstance(a, DirtCell) and a.isDirty)
-            if remainingDirty == 0:
+            remainingReachable = self.remainingReachableDirt
+            if remainingReachable + self.numUnreachableDirt == 0:
                 self.timeAllClean = self.steps  # registra el tiempo de limpieza completa
+                self.timeReachableClean = self.steps
                 self.running = False  # detiene la simulación
+            elif remainingReachable == 0:
+                # lo que queda sucio está encerrado: no tiene caso seguir simulando
+                self.timeReachableClean = self.steps
+                self.running = False
+        if profiler is not None:
+            profiler.mark("dirt")
 
         # recopila datos de este paso
-        self.datacollector.collect(self)
\ No newline at end of file
+        self.datacollector.collect(self)
+        if profiler is not None:
+            profiler.mark("collect")
+
+        # graba el paso en la bitácora de repetición
+        if self.replay is not None:
+            self.replay.record(self)
+            if profiler is not None:
+                profiler.mark("replay")
+
+        if profiler is not None:
+            profiler.endTick()
\ No newline at end of file
@@ -0,0 +1,113 @@
+# simulación 1: snapshots binarios del estado completo de RandomModel
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import io
+import json
+
+import numpy as np
+
+from roomba_common.telemetry import STATES
+
+from .agent import DirtCell
+
+
+# parámetros del constructor que se guardan para reconstruir el mundo
+PARAMS = ("numAgents", "width", "height", "dirtyPercentage", "obstaclePercentage",
+          "maxSteps", "seed", "legacyShuffle", "requireConnected", "clusterSize")
+
+def saveSnapshot(model):
+    """
+    serializa el estado completo del modelo a bytes (npz comprimido).
+    parámetros:
+        model: RandomModel a guardar
+    retorna: bytes con el snapshot
+    """
+    roombas = list(model.activeAgents)
+    dirt = list(model.agents_by_type.get(DirtCell, []))
+
+    # datos pequeños (parámetros, contadores, rng, datos recolectados) van en json
+    meta = {
+        "params": {name: getattr(model, name) for name in PARAMS} | {
+            "planner": model.planner.mode if model.planner else None,
+            "floorPlan": model.floorPlan.source if model.floorPlan else None,
+        },
+        "steps": model.steps,
+        "timeAllClean": model.timeAllClean,
+        "timeReachableClean": model.timeReachableClean,
+        "running": model.running,
+        "random": model.random.getstate(),
+        "rng": model.rng.bit_generator.state,
+        "modelVars": model.datacollector.model_vars,
+    }
+
+    # capas y campos del roomba como arreglos compactos
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        "dirtPos": np.array([a.cell.coordinate for a in dirt], dtype=np.int32).reshape(-1, 2),
+        "dirtState": np.array([a.isDirty for a in dirt], dtype=bool),
+        "pos": np.array([a.cell.coordinate for a in roombas], dtype=np.int32).reshape(-1, 2),
+        "battery": np.array([a.battery for a in roombas], dtype=np.int16),
+        "cleanedCells": np.array([a.cleanedCells for a in roombas], dtype=np.int32),
+        "movementCount": np.array([a.movementCount for a in roombas], dtype=np.int32),
+        "chargingTurns": np.array([a.chargingTurns for a in roombas], dtype=np.int32),
+        "state": np.array([STATES.index(a.state) for a in roombas], dtype=np.int8),
+        "visitCounts": np.array([a.visited.asArray() for a in roombas], dtype=np.uint32).reshape(len(roombas), model.width, model.height),
+        "coverage": model.coverage.counts,
+    }
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def loadSnapshot(modelClass, data, floorPlan=None):
+    """
+    reconstruye un modelo desde un snapshot creado con saveSnapshot.
+    parámetros:
+        modelClass: clase del modelo (RandomModel)
+        data: bytes del snapshot
+        floorPlan: plano o plantilla del mundo (en lugar de la ruta guardada)
+    retorna: modelo con el mismo estado que al guardar
+    """
+    arrays = np.load(io.BytesIO(data), allow_pickle=False)
+    meta = json.loads(arrays["meta"].tobytes().decode())
+    if floorPlan is not None:
+        meta["params"]["floorPlan"] = floorPlan
+    # snapshots anteriores guardaban rngStreams aunque el roomba no hace sorteos
+    meta["params"].pop("rngStreams", None)
+
+    # el constructor es determinista: con los mismos parámetros genera el mismo mundo
+    model = modelClass(**meta["params"])
+
+    dirt = list(model.agents_by_type.get(DirtCell, []))
+    dirtPos = np.array([a.cell.coordinate for a in dirt], dtype=np.int32).reshape(-1, 2)
+    if not np.array_equal(dirtPos, arrays["dirtPos"]):
+        raise ValueError("el snapshot no corresponde al mundo generado por sus parámetros")
+    for agent, isDirty in zip(dirt, arrays["dirtState"]):
+        if not isDirty:
+            agent.clean()  # también la anota en model.cleanedTiles
+
+    for idx, agent in enumerate(model.activeAgents):
+        agent.cell = model.grid[tuple(int(v) for v in arrays["pos"][idx])]
+        agent.battery = int(arrays["battery"][idx])
+        agent.cleanedCells = int(arrays["cleanedCells"][idx])
+        agent.movementCount = int(arrays["movementCount"][idx])
+        agent.chargingTurns = int(arrays["chargingTurns"][idx])
+        agent.state = STATES[arrays["state"][idx]]
+        agent.visited.asArray()[:] = arrays["visitCounts"][idx]
+        agent.visited._size = int(np.count_nonzero(arrays["visitCounts"][idx]))
+
+    model.coverage.counts[:] = arrays["coverage"]
+
+    # contadores, generadores aleatorios y datos recolectados
+    model.steps = meta["steps"]
+    model.timeAllClean = meta["timeAllClean"]
+    model.timeReachableClean = meta["timeReachableClean"]
+    model.running = meta["running"]
+    version, internal, gauss = meta["random"]
+    model.random.setstate((version, tuple(internal), gauss))
+    model.rng.bit_generator.state = meta["rng"]
+    model.datacollector.model_vars = meta["modelVars"]
+
+    return model
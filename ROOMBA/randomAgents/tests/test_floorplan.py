@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from random_agents.model import RandomModel
+from roomba_common.floorplan import FloorPlan, loadFloorPlan
+
+ROWS = ["#####", "#C.*#", "#.#.#", "#####"]
+
+
+def expected_plan():
+    return FloorPlan.fromRows(np.array([list(row.encode()) for row in ROWS], dtype=np.uint8))
+
+
+def assert_same_plan(plan, expected):
+    assert (plan.width, plan.height) == (5, 4)
+    assert np.array_equal(plan.blocked, expected.blocked)
+    assert np.array_equal(plan.dirt, expected.dirt)
+    assert plan.chargers == expected.chargers
+
+
+@pytest.mark.parametrize("ending", ["\n", "\r\n"])
+@pytest.mark.parametrize("finalNewline", [True, False])
+def test_text_plans_accept_both_line_endings(tmp_path, ending, finalNewline):
+    path = tmp_path / "plan.txt"
+    path.write_bytes((ending.join(ROWS) + (ending if finalNewline else "")).encode())
+
+    plan = loadFloorPlan(str(path))
+    assert_same_plan(plan, expected_plan())
+    assert plan.chargers == [(1, 2)]
+    assert plan.dirt[3, 2] and plan.blocked[2, 1]
+
+
+def test_single_row_without_newline(tmp_path):
+    path = tmp_path / "plan.txt"
+    path.write_bytes(b"#.*C#")
+    plan = loadFloorPlan(str(path))
+    assert (plan.width, plan.height) == (5, 1)
+    assert plan.chargers == [(3, 0)]
+
+
+@pytest.mark.parametrize("content", [b"###\n##\n###\n", b"###\r\n###\n", b"###\n###\n##", b""])
+def test_uneven_or_empty_text_plans_are_rejected(tmp_path, content):
+    path = tmp_path / "plan.txt"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        loadFloorPlan(str(path))
+
+
+def gray_image():
+    # fila 0 = arriba: obstáculo (oscuro), piso sucio (gris) y piso limpio (claro)
+    return np.array([[0, 0, 0, 0],
+                     [0, 128, 255, 0],
+                     [0, 0, 0, 0]], dtype=np.uint8)
+
+
+def test_binary_pgm_matches_the_image(tmp_path):
+    gray = gray_image()
+    path = tmp_path / "plan.pgm"
+    path.write_bytes(b"P5\n# plano de prueba\n4 3\n255\n" + gray.tobytes())
+
+    plan = loadFloorPlan(str(path))
+    expected = FloorPlan.fromGray(gray)
+    assert (plan.width, plan.height) == (4, 3)
+    assert np.array_equal(plan.blocked, expected.blocked)
+    assert np.array_equal(plan.dirt, expected.dirt)
+    assert plan.dirt[1, 1] and not plan.blocked[2, 1] and not plan.dirt[2, 1]
+
+
+def test_sixteen_bit_and_ascii_pgm_match_binary(tmp_path):
+    gray = gray_image()
+    wide = tmp_path / "wide.pgm"
+    wide.write_bytes(b"P5 4 3 65535\n" + (gray.astype(">u2") * 257).tobytes())
+    text = tmp_path / "text.pgm"
+    text.write_text("P2\n4 3\n255\n" + "\n".join(" ".join(map(str, row)) for row in gray) + "\n")
+
+    expected = FloorPlan.fromGray(gray)
+    for path in (wide, text):
+        plan = loadFloorPlan(str(path))
+        assert np.array_equal(plan.blocked, expected.blocked)
+        assert np.array_equal(plan.dirt, expected.dirt)
+
+
+def test_model_builds_from_a_crlf_plan(tmp_path):
+    path = tmp_path / "plan.txt"
+    path.write_bytes("\r\n".join(ROWS).encode())
+    model = RandomModel(floorPlan=str(path), seed=1)
+    assert (model.width, model.height) == (5, 4)
+    assert bytes(model.navBlocked) == expected_plan().blocked.tobytes()
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from random_agents.agent import DirtCell
+from random_agents.model import RandomModel
+from random_agents.replay import ReplayLog
+from roomba_common.telemetry import STATES
+
+
+def live_frame(model):
+    """Read the fields a replay frame holds straight from the model."""
+    roombas = list(model.activeAgents)
+    dirt = np.zeros((model.width, model.height), dtype=bool)
+    for agent in model.agents_by_type.get(DirtCell, []):
+        dirt[agent.cell.coordinate] = agent.isDirty
+    return {
+        "pos": np.array([a.cell.coordinate for a in roombas]).reshape(-1, 2),
+        "battery": np.array([a.battery for a in roombas]),
+        "state": np.array([STATES.index(a.state) for a in roombas]),
+        "dirt": dirt,
+    }
+
+
+def record_run(steps, keyframeInterval, **params):
+    model = RandomModel(recordReplay=True, keyframeInterval=keyframeInterval, **params)
+    frames = [live_frame(model)]
+    stepValues = [model.steps]
+    for _ in range(steps):
+        model.step()
+        frames.append(live_frame(model))
+        stepValues.append(model.steps)
+    return model, frames, stepValues
+
+
+def assert_replays(log, frames):
+    assert log.numTicks == len(frames)
+    for tick, expected in enumerate(frames):
+        frame = log.seek(tick)
+        for key, value in expected.items():
+            assert np.array_equal(frame[key], value), (tick, key)
+
+
+@pytest.mark.parametrize("keyframeInterval", [1, 7, 1000])
+def test_seek_matches_live_state_at_every_tick(keyframeInterval, tmp_path):
+    model, frames, stepValues = record_run(400, keyframeInterval, width=20, height=20, seed=4)
+    assert_replays(model.replay, frames)
+    assert model.replay.stepValues == stepValues
+
+    path = tmp_path / "run.npz"
+    model.replay.save(path)
+    loaded = ReplayLog.load(path)
+    assert_replays(loaded, frames)
+    assert loaded.stepValues == stepValues
+    assert np.array_equal(loaded.blocked, model.replay.blocked)
+
+
+def test_seek_outside_the_recording_fails():
+    model, frames, _ = record_run(5, 2, width=10, height=10, seed=1)
+    with pytest.raises(IndexError):
+        model.replay.seek(len(frames))
+    with pytest.raises(IndexError):
+        model.replay.seek(-1)
@@ -0,0 +1,75 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from random_agents.model import RandomModel
+
+
+def decode(data):
+    """Return a snapshot as (meta, arrays) so two snapshots can be compared field by field."""
+    arrays = np.load(io.BytesIO(data), allow_pickle=False)
+    meta = json.loads(arrays["meta"].tobytes().decode())
+    return meta, {key: arrays[key] for key in arrays.files if key != "meta"}
+
+
+def assert_same_state(a, b):
+    metaA, arraysA = decode(a.snapshot())
+    metaB, arraysB = decode(b.snapshot())
+    assert metaA == metaB
+    assert arraysA.keys() == arraysB.keys()
+    for key in arraysA:
+        assert np.array_equal(arraysA[key], arraysB[key]), key
+    assert a.getMetrics() == b.getMetrics()
+    assert sorted(a.cleanedTiles) == sorted(b.cleanedTiles)
+
+
+@pytest.mark.parametrize("params", [
+    dict(),
+    dict(planner="hpa", clusterSize=5),
+    dict(planner="jps"),
+    dict(legacyShuffle=True),
+])
+def test_restored_model_continues_exactly(params):
+    model = RandomModel(width=25, height=25, maxSteps=5000, seed=3, **params)
+    for _ in range(150):
+        model.step()
+
+    restored = RandomModel.fromSnapshot(model.snapshot())
+    assert_same_state(model, restored)
+
+    for step in range(1, 301):
+        model.step()
+        restored.step()
+        assert model.getMetrics() == restored.getMetrics()
+        assert [a.cell.coordinate for a in model.activeAgents] == [a.cell.coordinate for a in restored.activeAgents]
+        if step % 50 == 0:
+            assert_same_state(model, restored)
+    assert model.datacollector.get_model_vars_dataframe().equals(restored.datacollector.get_model_vars_dataframe())
+
+
+def test_forks_from_one_snapshot_are_identical():
+    model = RandomModel(width=20, height=20, seed=11)
+    for _ in range(100):
+        model.step()
+    data = model.snapshot()
+
+    forks = [RandomModel.fromSnapshot(data) for _ in range(3)]
+    for fork in forks:
+        for _ in range(200):
+            fork.step()
+    for fork in forks[1:]:
+        assert_same_state(forks[0], fork)
+
+
+def test_snapshot_of_a_finished_run_stays_stopped():
+    model = RandomModel(width=10, height=10, maxSteps=40, seed=2)
+    while model.running:
+        model.step()
+
+    restored = RandomModel.fromSnapshot(model.snapshot())
+    assert not restored.running
+    model.step()
+    restored.step()
+    assert_same_state(model, restored)
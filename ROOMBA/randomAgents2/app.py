@@ -2,59 +2,18 @@
 # autor: Luis Emilio Veledíaz Flores - A01029829
 # fecha: 19 de Noviembre de 2025
 
-from random_agents.agent import RandomAgent, DirtCell, ChargingStation, ObstacleAgent, Wall
 from random_agents.model import RandomModel
+from roomba_common.layers import SpaceLayers
 
 from mesa.visualization import (
     Slider,
     SolaraViz,
-    make_space_component,
-    make_plot_component,
 )
-from mesa.visualization.components import AgentPortrayalStyle
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
 import solara
 
 
-def roombaPortrayal(agent):
-    """
-    define la representación visual de cada agente.
-    parámetros:
-        agent: agente a representar
-    retorna: estilo de representación del agente
-    """
-    if agent is None:
-        return
-
-    portrayal = AgentPortrayalStyle(
-        size=100,
-        marker="s",
-    )
-
-    # asigna color y propiedades según el tipo de agente
-    if isinstance(agent, RandomAgent):
-        portrayal.color = "red"  # todos los roombas son rojos
-        portrayal.zorder = 3
-    elif isinstance(agent, DirtCell):
-        portrayal.zorder = 0
-        if agent.isDirty:
-            portrayal.color = "tab:brown"
-            portrayal.size = 100
-        else:
-            portrayal.color = "white"
-            portrayal.size = 0
-    elif isinstance(agent, ChargingStation):
-        portrayal.color = "tab:green"  # cargadores verdes
-        portrayal.zorder = 2
-    elif isinstance(agent, ObstacleAgent):
-        portrayal.color = "black"
-        portrayal.zorder = 1
-    elif isinstance(agent, Wall):
-        portrayal.color = "black"
-        portrayal.zorder = 0
-
-    return portrayal
-
-
 # parámetros del modelo que se pueden ajustar en la interfaz
 modelParams = {
     "seed": {
@@ -68,75 +27,155 @@ modelParams = {
     "dirtyPercentage": Slider("Dirty Cells (%)", 30, 0, 100),
     "obstaclePercentage": Slider("Obstacles (%)", 10, 0, 100),
     "maxSteps": Slider("Max Steps", 10000, 1000, 100000),
+    "recordReplay": {
+        "type": "Checkbox",
+        "value": False,
+        "label": "Record Replay",
+    },
 }
 
 
-def postProcessSpace(ax):
-    """ajusta el aspecto del espacio visual."""
-    ax.set_aspect("equal")
-
-
 def postProcessLines(ax):
     """ajusta el aspecto de los gráficos de líneas."""
     ax.legend(loc="center left", bbox_to_anchor=(1, 0.9))
 
 
-# componente que visualiza el grid con los agentes
-spaceComponent = make_space_component(
-    roombaPortrayal,
-    draw_grid=False,
-    post_process=postProcessSpace,
-)
+def spaceComponent(model):
+    """
+    visualiza el grid por capas: fondo png fijo con la suciedad inicial, capas svg con
+    las tiles limpiadas (solo cambia la última) y los roombas encima.
+    parámetros:
+        model: modelo de la simulación
+    retorna: componente con la imagen del grid
+    """
+    layers = solara.use_memo(lambda: SpaceLayers(model), dependencies=[model])
+    size = {"width": f"{layers.pixelWidth}px", "height": f"{layers.pixelHeight}px"}
+
+    with solara.Div(style={"position": "relative", **size}) as main:
+        solara.Image(layers.background, width=size["width"])
+        for overlay in layers.cleanOverlays(model):
+            solara.HTML(tag="div", unsafe_innerHTML=overlay, style="position: absolute; top: 0; left: 0;")
+        solara.HTML(tag="div", unsafe_innerHTML=layers.sprites(model), style="position: absolute; top: 0; left: 0;")
+    return main
+
+
+# colores de las líneas con datos del modelo (mismos 4 datos en ambas simulaciones)
+LINE_COLORS = {
+    "Movement Count": "tab:blue",
+    "Step Limit": "tab:red",
+    "Percentage Clean": "tab:green",
+    "Battery": "tab:orange",
+}
+
+# puntos máximos por línea: historias largas se muestrean para que dibujar no dependa del número de pasos
+MAX_PLOT_POINTS = 500
 
-# componente que visualiza gráficos de líneas con datos del modelo
-# mismo formato que Sim1: 4 datos
-plotComponent = make_plot_component(
-    {
-        "Movement Count": "tab:blue",
-        "Step Limit": "tab:red",
-        "Percentage Clean": "tab:green",
-        "Battery": "tab:orange"
-    },
-    post_process=postProcessLines,
-)
+
+def plotComponent(model):
+    """
+    grafica las líneas del datacollector muestreando como máximo MAX_PLOT_POINTS puntos.
+    parámetros:
+        model: modelo de la simulación
+    retorna: componente con la gráfica
+    """
+    modelVars = model.datacollector.model_vars
+    numPoints = len(modelVars["Battery"])
+    stride = max(1, -(-numPoints // MAX_PLOT_POINTS))  # división hacia arriba
+    # índices muestreados, incluyendo siempre el último dato
+    indices = list(range(0, numPoints, stride))
+    if indices and indices[-1] != numPoints - 1:
+        indices.append(numPoints - 1)
+
+    fig = Figure()
+    ax = fig.subplots()
+    for name, color in LINE_COLORS.items():
+        values = modelVars[name]
+        ax.plot(indices, [values[i] for i in indices], label=name, color=color)
+    ax.set_xlabel("Step")
+    postProcessLines(ax)
+    return solara.FigureMatplotlib(fig)
 
 
 def metricsComponent(model):
     """
     muestra las estadísticas de la simulación incluyendo métricas por agente.
+    el texto de los contadores solo se vuelve a construir cuando cambia model.metricsVersion;
+    el número de paso se muestra aparte.
     parámetros:
         model: modelo de la simulación
     retorna: componente markdown con las métricas
     """
-    # obtiene todos los agentes roombas
-    agents = [a for a in model.agents if isinstance(a, RandomAgent)]
-    
-    # calcula tiles sucias restantes
-    totalDirty = sum(1 for a in model.agents if isinstance(a, DirtCell) and a.isDirty)
-    
-    # obtiene las métricas generales
-    metrics = model.getMetrics()
-
-    # construye las métricas individuales de cada agente
-    agentMetrics = ""
-    for agent in sorted(agents, key=lambda a: a.agentId):
-        agentMetrics += f"\n**Roomba {agent.agentId}:** Limpiadas: {agent.cleanedCells} - Movimientos: {agent.movementCount} - Batería: {agent.battery}%\n"
-
-    # retorna un texto formateado con las estadísticas
-    return solara.Markdown(f"""
-### Estadísticas Generales
+    def buildText():
+        metrics = model.liveMetrics
 
-- Tiempo total: {model.steps} pasos
--   Tiempo hasta limpiar todo:  {metrics['timeAllClean']} pasos
+        # construye las métricas individuales de cada agente (ya vienen ordenadas por agentId)
+        agentMetrics = ""
+        for agentId, cleanedCells, movementCount, battery in metrics["agents"]:
+            agentMetrics += f"\n**Roomba {agentId}:** Limpiadas: {cleanedCells} - Movimientos: {movementCount} - Batería: {battery}%\n"
+
+        # texto formateado con las estadísticas
+        return f"""
 - Porcentaje de limpieza :   {metrics['percentageClean']:.2f} %
 -   Número de Movimientos :{metrics['totalMovements']}
 - Batería  promedio:  {metrics['averageBattery']:.2f} %
+- Tiles sucias restantes: {metrics['remainingDirty']}
 
 ### Métricas por Agente
 {agentMetrics}
+"""
+
+    text = solara.use_memo(buildText, dependencies=[model, model.metricsVersion])
+
+    # los tiempos cambian en cada paso: van en su propio texto corto
+    timeAllClean = model.liveMetrics["timeAllClean"]
+    with solara.Column(gap="0px") as main:
+        solara.Markdown(f"""
+### Estadísticas Generales
+
+- Tiempo total: {model.steps} pasos
+-   Tiempo hasta limpiar todo:  {timeAllClean if timeAllClean is not None else model.steps} pasos
 """)
+        solara.Markdown(text)
+    return main
 
 
+def replayComponent(model):
+    """
+    muestra un slider para revisar cualquier paso grabado sin volver a simular.
+    parámetros:
+        model: modelo de la simulación
+    retorna: componente con el slider y el frame reconstruido
+    """
+    tick, setTick = solara.use_state(0)
+
+    if model.replay is None:
+        return solara.Markdown("*Activa **Record Replay** y reinicia el modelo para grabar la corrida.*")
+
+    replay = model.replay
+    # la bitácora crece mientras el hilo de mesa avanza el modelo; record() publica cada
+    # tick ya completo, así que basta leer numTicks una vez
+    numTicks = replay.numTicks
+    tick = min(tick, numTicks - 1)
+    frame = replay.seek(tick)
+    stepValue = replay.stepValues[tick]
+
+    # capas: 0 libre, 1 sucia, 2 obstáculo, 3 cargador
+    image = frame["dirt"].astype(int)
+    image[replay.blocked] = 2
+    image[replay.stationPos[:, 0], replay.stationPos[:, 1]] = 3
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.imshow(image.T, origin="lower", cmap=ListedColormap(["white", "tab:brown", "black", "tab:green"]), vmin=0, vmax=3)
+    ax.scatter(frame["pos"][:, 0], frame["pos"][:, 1], color="red", marker="s")
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    with solara.Column() as main:
+        solara.SliderInt("Replay Step", value=tick, on_value=setTick, min=0, max=numTicks - 1)
+        solara.Text(f"Paso del modelo: {stepValue}")
+        solara.FigureMatplotlib(fig)
+    return main
 
 # crea la instancia del modelo
 model = RandomModel()
@@ -144,7 +183,12 @@ model = RandomModel()
 # crea la página de visualización con todos los componentes
 page = SolaraViz(
     model,
-    components=[spaceComponent, plotComponent, metricsComponent],
+    components=[spaceComponent, plotComponent, metricsComponent, replayComponent],
     model_params=modelParams,
     name="Multi-Roomba Simulation - A01029829",
+    # los controles de mesa avanzan el modelo en un hilo aparte, render_interval pasos
+    # por cuadro (se ajustan en la barra lateral)
+    play_interval=50,
+    render_interval=10,
+    use_threads=True,
 )
\ No newline at end of file
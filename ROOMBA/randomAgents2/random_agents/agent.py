@@ -4,6 +4,8 @@
 
 from mesa.discrete_space import CellAgent, FixedAgent
 
+from roomba_common.coverage import VisitedBitmap
+
 
 class DirtCell(FixedAgent):
     """tile sucia que puede ser limpiada por los agentes."""
@@ -17,7 +19,11 @@ class DirtCell(FixedAgent):
         pass
 
     def clean(self):
-        """marca la tile como limpia."""
+        """marca la tile como limpia y la anota en la lista de limpiezas del modelo."""
+        if self.isDirty:
+            self.model.cleanedTiles.append(self.cell.coordinate)  # evento para las capas de la vista
+            if self.model.reachableCells[self.model.cellId(self.cell)]:
+                self.model.remainingReachableDirt -= 1
         self.isDirty = False
 
 
@@ -64,18 +70,27 @@ class RandomAgent(CellAgent):
         self.cleanedCells = 0
         self.movementCount = 0
         self.chargingTurns = 0
-        self.state = "exploring"
-        self.visited = {cell.coordinate}
+        self._state = "exploring"  # ver propiedad state
+        self.visited = VisitedBitmap(model.width, model.height)  # bitmap de tiles visitadas
+        self.randomStream = model.random  # flujo aleatorio propio si el modelo usa rngStreams
+        self.visited.add(cell.coordinate)
+        self.model.coverage.add(cell.coordinate)
         self.homeStation = homeStationCoord
         self.knownChargingStations = {homeStationCoord}
         self.currentStation = None  # cargador que está ocupando
 
-    def _isSafe(self, cell):
-        """verifica si una tile es segura para moverse sin obstáculos."""
-        for agent in cell.agents:
-            if isinstance(agent, (ObstacleAgent, Wall)):
-                return False
-        return True
+    @property
+    def state(self):
+        """estado actual de la máquina de estados."""
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        # avisa a la telemetría del modelo (si está activa) de cada cambio de estado
+        telemetry = self.model.telemetry
+        if telemetry is not None and value != self._state:
+            telemetry.record(self, self._state, value)
+        self._state = value
 
     def _distanceToStation(self, stationCoord, cell=None):
         """calcula la distancia manhattan a un cargador."""
@@ -100,17 +115,20 @@ class RandomAgent(CellAgent):
                     agent.knownChargingStations.update(self.knownChargingStations)
 
     def _nearestKnownStation(self):
-        """retorna el cargador más cercana que conoce."""
+        """retorna el cargador más cercana que conoce (en empate, el de menor stationId)."""
         if not self.knownChargingStations:
             return self.homeStation
         
+        # el desempate no depende del orden del set, que cambia según cómo se llenó
+        # (un roomba restaurado de un snapshot debe elegir el mismo cargador)
+        stations = self.model.chargingStations
         nearest = None
-        minDist = float('inf')
+        minKey = (float('inf'), 0)
         
         for stationCoord in self.knownChargingStations:
-            dist = self._distanceToStation(stationCoord)
-            if dist < minDist:
-                minDist = dist
+            key = (self._distanceToStation(stationCoord), stations[stationCoord].stationId)
+            if key < minKey:
+                minKey = key
                 nearest = stationCoord
         
         return nearest
@@ -122,8 +140,8 @@ class RandomAgent(CellAgent):
         return self.battery <= 30 or self.battery <= distance + 5
 
     def _getSafeNeighbors(self):
-        """retorna lista de vecinos sin obstáculos."""
-        return [n for n in self.cell.neighborhood if self._isSafe(n)]
+        """retorna los vecinos sin obstáculos (precalculados en el grafo de navegación)."""
+        return self.model.safeNeighbors(self.cell)
 
     def _hasDirtInCell(self):
         """verifica si hay suciedad en la tile actual."""
@@ -167,8 +185,14 @@ class RandomAgent(CellAgent):
             self.currentStation = None
 
     def moveTowardsNearestStation(self):
-        """se mueve hacia el cargador más cercano usando distancia manhattan."""
+        """se mueve hacia el cargador más cercano usando el planeador del modelo o distancia manhattan."""
         nearestStation = self._nearestKnownStation()
+        if self.model.planner is not None:
+            step = self.model.planner.nextStep(self.cell, self.model.grid[nearestStation])
+            if step is not None:
+                self.moveToCell(step)
+                return
+
         safeNeighbors = self._getSafeNeighbors()
         
         if not safeNeighbors:
@@ -196,9 +220,9 @@ class RandomAgent(CellAgent):
         unvisitedNeighbors = [n for n in safeNeighbors if n.coordinate not in self.visited]
 
         if unvisitedNeighbors:
-            target = self.random.choice(unvisitedNeighbors)
+            target = self.randomStream.choice(unvisitedNeighbors)
         else:
-            target = self.random.choice(safeNeighbors)
+            target = self.randomStream.choice(safeNeighbors)
 
         self.moveToCell(target)
 
@@ -217,6 +241,7 @@ class RandomAgent(CellAgent):
 
         if hasattr(self.cell, "coordinate"):
             self.visited.add(self.cell.coordinate)
+            self.model.coverage.add(self.cell.coordinate)
 
     def clean(self):
         """limpia la tile actual si contiene suciedad."""
@@ -2,18 +2,52 @@
 # autor: Luis Emilio Veledíaz Flores - A01029829
 # fecha: 19 de Noviembre de 2025
 
+import random
+from array import array
+from collections import deque
+
+import numpy as np
 from mesa import Model
+from mesa.agent import AgentSet
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.datacollection import DataCollector
 
+from roomba_common.coverage import CoverageMap
+from roomba_common.pathfinding import PathPlanner
+from roomba_common.floorplan import FloorPlan, loadFloorPlan
+from roomba_common.profiling import TickProfiler
+from roomba_common.telemetry import StateTelemetry
+
 from .agent import RandomAgent, ObstacleAgent, DirtCell, ChargingStation, Wall
+from .snapshot import saveSnapshot, loadSnapshot
+from .replay import ReplayLog
+
+
+def spawnRandom(seed, *key):
+    """
+    crea un random.Random independiente para una llave, derivado de la semilla del modelo.
+    parámetros:
+        seed: semilla del modelo (None = entropía del sistema)
+        key: enteros que identifican el flujo (por ejemplo 1, agentId)
+    retorna: random.Random
+    """
+    sequence = np.random.SeedSequence(seed, spawn_key=key)
+    return random.Random(int.from_bytes(sequence.generate_state(4).tobytes(), "little"))
+
+
+# desplazamientos de la vecindad Moore en el orden en que mesa arma cell.neighborhood
+NEIGHBOR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
 
 
 class RandomModel(Model):
     """modelo con múltiples agentes roombas que se comunican y limpian tiles sucias."""
 
+    MAX_WORLD_ATTEMPTS = 100  # intentos máximos para generar un mundo conectado
+
     def __init__(self, numAgents=2, width=20, height=20, dirtyPercentage=30, 
-                 obstaclePercentage=10, maxSteps=10000, seed=42):
+                 obstaclePercentage=10, maxSteps=10000, seed=42, legacyShuffle=False,
+                 recordReplay=False, keyframeInterval=1000, requireConnected=False,
+                 planner=None, clusterSize=10, floorPlan=None, rngStreams=False):
         """
         crea el modelo.
         parámetros:
@@ -24,8 +58,25 @@ class RandomModel(Model):
             obstaclePercentage: porcentaje de tiles con obstáculos (0-100)
             maxSteps: número máximo de pasos permitidos
             seed: semilla para reproducibilidad
+            legacyShuffle: si es True baraja todos los agentes como antes (reproduce corridas viejas)
+            recordReplay: si es True graba la corrida en self.replay para revisarla después
+            keyframeInterval: cada cuántos pasos la grabación guarda un keyframe completo
+            requireConnected: si es True regenera el mundo hasta que todas las tiles libres sean alcanzables
+            planner: None (movimiento greedy original), "hpa" (rutas jerárquicas) o "jps" (jump point search)
+            clusterSize: lado de los clusters del planeador "hpa"
+            floorPlan: FloorPlan o ruta de un plano de piso; si se da, el mundo sale del plano
+                (width y height se toman del plano)
+            rngStreams: si es True cada roomba y el orden de activación usan su propio flujo
+                aleatorio derivado de la semilla (no dependen del orden de ejecución)
         """
         super().__init__(seed=seed)
+
+        # plano de piso opcional: define el tamaño y las capas del mundo
+        if floorPlan is not None and not isinstance(floorPlan, FloorPlan):
+            floorPlan = loadFloorPlan(floorPlan)
+        self.floorPlan = floorPlan
+        if floorPlan is not None:
+            width, height = floorPlan.width, floorPlan.height
         
         # guarda parámetros del modelo
         self.numAgents = numAgents
@@ -37,17 +88,93 @@ class RandomModel(Model):
         self.maxSteps = maxSteps
         self.steps = 0
         self.timeAllClean = None
+        self.timeReachableClean = None  # tiempo cuando se limpió toda la suciedad alcanzable
+        self.requireConnected = requireConnected
+        self.legacyShuffle = legacyShuffle
+        self.clusterSize = clusterSize
+        self.rngStreams = rngStreams
+        self.profiler = None  # medidor de tiempos (ver enableProfiling)
+        self.telemetry = None  # transiciones de estado de los roombas (ver enableTelemetry)
+        self.cleanedTiles = []  # coordenadas de las tiles limpiadas, en orden
         self.chargingStations = {}
 
         # crea el grid usando topología Moore (8 vecinos)
         self.grid = OrthogonalMooreGrid([width, height], torus=False, random=self.random)
         self.space = self.grid
 
-        # identifica coordenadas del borde de la grilla
-        border = [(x, y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height-1] or x in [0, width - 1]]
+        # mapa de cobertura compartido por toda la flota
+        self.coverage = CoverageMap(width, height)
+
+        # construye el mundo; con requireConnected lo regenera hasta que todo sea alcanzable
+        self._buildWorld()
+        self._buildNavigation()
+        self._analyzeReachability()
+        attempts = 1
+        while requireConnected and not self.fullyConnected:
+            if self.floorPlan is not None:
+                raise ValueError("el plano de piso tiene tiles libres inalcanzables")
+            if attempts >= self.MAX_WORLD_ATTEMPTS:
+                raise ValueError(f"no se generó un mundo conectado en {attempts} intentos")
+            self._clearWorld()
+            self._buildWorld()
+            self._buildNavigation()
+            self._analyzeReachability()
+            attempts += 1
+
+        # planeador de rutas opcional para mapas grandes (se construye sobre el grafo final)
+        self.planner = PathPlanner(self, planner, clusterSize) if planner else None
+
+        # flujos aleatorios independientes (el mundo ya se generó con self.random)
+        if rngStreams:
+            self._spawnStreams()
+
+        self.running = True
+
+        # métricas en vivo para la interfaz y el datacollector: se actualizan en cada paso y
+        # metricsVersion solo aumenta cuando algún contador cambió (no cuenta el número de paso)
+        self.liveMetrics = None
+        self.metricsVersion = 0
+        self._updateMetrics()
+
+        # configura recopilación de datos del modelo; los reporteros leen liveMetrics y
+        # solo los roombas (no recorren las paredes ni las tiles sucias)
+        self.datacollector = DataCollector(
+            model_reporters={
+                # número total de movimientos de todos los roombas
+                "Movement Count": lambda m: m.liveMetrics["totalMovements"],
+                # tiles limpias en total
+                "Percentage Clean": lambda m: m.liveMetrics["percentageClean"],
+                # línea de referencia del límite de pasos
+                "Step Limit": lambda m: (m.steps / m.maxSteps * 100) if m.maxSteps > 0 else 0,
+                # batería promedio de todos los roombas
+                "Battery": lambda m: m.liveMetrics["averageBattery"],
+            },
+            agenttype_reporters={
+                RandomAgent: {
+                    "Battery": "battery",
+                    "Cleaned Cells": "cleanedCells",
+                    "Movement Count": "movementCount",
+                    "State": "state",
+                    "Agent ID": "agentId",
+                },
+            }
+        )
+        self.datacollector.collect(self)
+
+        # bitácora de repetición opcional
+        self.replay = ReplayLog(self, keyframeInterval) if recordReplay else None
+
+    def _buildWorld(self):
+        """coloca paredes, obstáculos, cargadores, roombas y tiles sucias en el grid."""
+        if self.floorPlan is not None:
+            self._buildWorldFromPlan()
+            return
+
+        # identifica coordenadas del borde de la grilla (set para revisar en O(1))
+        border = {(x, y)
+                  for y in range(self.height)
+                  for x in range(self.width)
+                  if y in [0, self.height-1] or x in [0, self.width - 1]}
 
         # crea paredes invisibles en el borde
         for _, cell in enumerate(self.grid):
@@ -59,72 +186,214 @@ class RandomModel(Model):
                          if cell.coordinate not in border]
 
         # calcula número de obstáculos basado en porcentaje
-        numObstacles = max(0, int(len(availableCells) * (obstaclePercentage / 100)))
+        numObstacles = max(0, int(len(availableCells) * (self.obstaclePercentage / 100)))
 
         # crea obstáculos visibles aleatorios
         if numObstacles > 0:
             obstacleCells = self.random.sample(availableCells, numObstacles)
             for cell in obstacleCells:
                 ObstacleAgent(self, cell=cell)
-                availableCells.remove(cell)
+
+            # filtra en una sola pasada conservando el orden (mismos sorteos que antes)
+            taken = set(obstacleCells)
+            availableCells = [cell for cell in availableCells if cell not in taken]
 
         # crea cargadores en posiciones aleatorias
-        numStations = min(numAgents, len(availableCells))
+        numStations = min(self.numAgents, len(availableCells))
         chargingStationCells = self.random.sample(availableCells, numStations)
 
         # inicializa los cargadores
         for idx, cell in enumerate(chargingStationCells):
             station = ChargingStation(self, cell=cell, stationId=idx)
             self.chargingStations[cell.coordinate] = station
-            availableCells.remove(cell)
+
+        taken = set(chargingStationCells)
+        availableCells = [cell for cell in availableCells if cell not in taken]
 
         # crea agentes roombas en sus respectivos cargadores
         for idx, cell in enumerate(chargingStationCells):
-            if idx < numAgents:
+            if idx < self.numAgents:
                 RandomAgent(self, cell=cell, agentId=idx, homeStationCoord=cell.coordinate)
 
         # calcula número de tiles sucias basado en porcentaje
-        numDirtCells = max(0, int(len(availableCells) * (dirtyPercentage / 100)))
+        numDirtCells = max(0, int(len(availableCells) * (self.dirtyPercentage / 100)))
 
         # crea tiles sucias en ubicaciones aleatorias
         if numDirtCells > 0:
             dirtCells = self.random.sample(availableCells, numDirtCells)
             for cell in dirtCells:
                 DirtCell(self, cell=cell)
-                availableCells.remove(cell)
+
+        # conjunto activo con solo los roombas; las capas estáticas no se barajan
+        self.activeAgents = AgentSet(self.agents_by_type.get(RandomAgent, []), random=self.random)
 
         # guarda el número total de tiles sucias
         self.numDirtCells = numDirtCells
-        self.running = True
 
-        # configura recopilación de datos del modelo
-        self.datacollector = DataCollector(
-            model_reporters={
-                # número total de movimientos de todos los roombas
-                "Movement Count": lambda m: sum(a.movementCount for a in m.agents if isinstance(a, RandomAgent)),
-                # tiles limpias en total
-                "Percentage Clean": lambda m: (sum(a.cleanedCells for a in m.agents if isinstance(a, RandomAgent)) / m.numDirtCells * 100) if m.numDirtCells > 0 else 0,
-                # línea de referencia del límite de pasos
-                "Step Limit": lambda m: (m.steps / m.maxSteps * 100) if m.maxSteps > 0 else 0,
-                # batería promedio de todos los roombas
-                "Battery": lambda m: (sum(a.battery for a in m.agents if isinstance(a, RandomAgent)) / len([a for a in m.agents if isinstance(a, RandomAgent)])) if len([a for a in m.agents if isinstance(a, RandomAgent)]) > 0 else 0,
-            },
-            agent_reporters={
-                "Battery": "battery",
-                "Cleaned Cells": "cleanedCells",
-                "Movement Count": "movementCount",
-                "State": "state",
-                "Agent ID": "agentId",
-            }
-        )
-        self.datacollector.collect(self)
+    def _buildWorldFromPlan(self):
+        """
+        construye el mundo desde self.floorPlan. paredes y obstáculos quedan solo en la
+        capa bloqueada (sin un agente por tile); se crean agentes únicamente para los
+        cargadores, los roombas y las tiles sucias.
+        """
+        plan = self.floorPlan
+        free = np.flatnonzero(~plan.blocked.ravel())  # ids de tiles libres (x * height + y)
+        if len(free) == 0:
+            raise ValueError("el plano de piso no tiene tiles libres")
+
+        # cargadores: los marcados en el plano y, si faltan, en tiles libres aleatorias
+        stationIds = [x * self.height + y for x, y in plan.chargers[:self.numAgents]]
+        if len(stationIds) < self.numAgents:
+            taken = set(stationIds)
+            candidates = [cellId for cellId in free.tolist() if cellId not in taken]
+            stationIds += self.random.sample(candidates, min(self.numAgents - len(stationIds), len(candidates)))
+
+        for idx, cellId in enumerate(stationIds):
+            cell = self.grid[divmod(cellId, self.height)]
+            self.chargingStations[cell.coordinate] = ChargingStation(self, cell=cell, stationId=idx)
+            RandomAgent(self, cell=cell, agentId=idx, homeStationCoord=cell.coordinate)
+
+        # suciedad: la marcada en el plano o un porcentaje aleatorio de las tiles libres
+        taken = set(stationIds)
+        if plan.dirt.any():
+            dirtIds = [cellId for cellId in np.flatnonzero(plan.dirt.ravel()).tolist() if cellId not in taken]
+        else:
+            availableIds = [cellId for cellId in free.tolist() if cellId not in taken]
+            numDirtCells = max(0, int(len(availableIds) * (self.dirtyPercentage / 100)))
+            dirtIds = self.random.sample(availableIds, numDirtCells)
+
+        for cellId in dirtIds:
+            DirtCell(self, cell=self.grid[divmod(cellId, self.height)])
+
+        self.activeAgents = AgentSet(self.agents_by_type.get(RandomAgent, []), random=self.random)
+        self.numDirtCells = len(dirtIds)
+
+    def _spawnStreams(self):
+        """
+        deriva de la semilla un flujo para barajar a los roombas y uno por roomba
+        (SeedSequence con llaves distintas), así los sorteos de cada roomba no cambian
+        con el orden de activación ni con lo que hagan los demás.
+        """
+        self.scheduleRandom = spawnRandom(self.seed, 0)
+        self.activeAgents = AgentSet(list(self.activeAgents), random=self.scheduleRandom)
+        for agent in self.activeAgents:
+            agent.randomStream = spawnRandom(self.seed, 1, agent.agentId)
+
+    def _clearWorld(self):
+        """quita todos los agentes del grid para volver a generar el mundo."""
+        for agent in list(self.agents):
+            agent.remove()
+        self.chargingStations = {}
+        self.coverage.counts[:] = 0
+
+    def cellId(self, cell):
+        """retorna el id plano de una tile (x * height + y)."""
+        x, y = cell.coordinate
+        return x * self.height + y
+
+    def mapLayers(self):
+        """
+        retorna las capas del mundo que captura una plantilla de mapa (MapTemplate).
+        retorna: (máscara (width, height) de la suciedad colocada, coordenadas de los cargadores)
+        """
+        dirt = np.zeros((self.width, self.height), dtype=bool)
+        for agent in self.agents_by_type.get(DirtCell, []):
+            dirt[agent.cell.coordinate] = True
+        chargers = [s.cell.coordinate for s in self.agents_by_type.get(ChargingStation, [])]
+        return dirt, chargers
+
+
+    def _buildNavigation(self):
+        """
+        construye una sola vez el grafo de navegación de las tiles transitables.
+        los obstáculos no se mueven, así que los vecinos seguros de cada tile se
+        guardan en formato CSR: los vecinos de la tile i son
+        navIndices[navIndptr[i]:navIndptr[i + 1]], en el mismo orden que cell.neighborhood.
+        """
+        numCells = self.width * self.height
+
+        self.cellsById = [None] * numCells
+        for cell in self.grid:
+            self.cellsById[self.cellId(cell)] = cell
+
+        template = self.floorPlan if getattr(self.floorPlan, "navIndptr", None) is not None else None
+        if template is not None:
+            # plantilla de mapa: las capas precalculadas se usan sin copiarlas (solo lectura)
+            self.navBlocked, self.navIndptr, self.navIndices = template.navigationViews(self)
+        else:
+            # capa estática de tiles bloqueadas (obstáculos y paredes, o el plano de piso)
+            if self.floorPlan is not None:
+                self.navBlocked = bytearray(self.floorPlan.blocked.tobytes())
+            else:
+                self.navBlocked = bytearray(numCells)
+            for agentType in (ObstacleAgent, Wall):
+                for agent in self.agents_by_type.get(agentType, []):
+                    self.navBlocked[self.cellId(agent.cell)] = 1
+
+            # vecinos de todas las tiles a la vez, en el orden de cell.neighborhood
+            blocked = np.frombuffer(bytes(self.navBlocked), dtype=np.uint8).reshape(self.width, self.height)
+            xs, ys = np.divmod(np.arange(numCells), self.height)
+            valid = np.zeros((numCells, len(NEIGHBOR_OFFSETS)), dtype=bool)
+            targets = np.zeros((numCells, len(NEIGHBOR_OFFSETS)), dtype=np.int64)
+            for k, (dx, dy) in enumerate(NEIGHBOR_OFFSETS):
+                nx, ny = xs + dx, ys + dy
+                inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+                nx, ny = np.where(inside, nx, 0), np.where(inside, ny, 0)
+                valid[:, k] = inside & (blocked[nx, ny] == 0)
+                targets[:, k] = nx * self.height + ny
+
+            self.navIndptr = array("i", [0])
+            self.navIndptr.frombytes(np.cumsum(valid.sum(axis=1), dtype=np.int32).tobytes())
+            self.navIndices = array("i")
+            self.navIndices.frombytes(targets[valid].astype(np.int32).tobytes())
+
+        # mismos vecinos como tuplas de tiles para los agentes
+        cells, indices, indptr = self.cellsById, self.navIndices.tolist(), self.navIndptr.tolist()
+        self.navNeighbors = [tuple([cells[j] for j in indices[indptr[i]:indptr[i + 1]]]) for i in range(numCells)]
+
+    def safeNeighbors(self, cell):
+        """retorna los vecinos transitables de una tile (precalculados)."""
+        return self.navNeighbors[self.cellId(cell)]
+
+    def _analyzeReachability(self):
+        """
+        calcula con flood fill (vecindad Moore) las tiles alcanzables desde los roombas
+        y separa la suciedad alcanzable de la que quedó encerrada por obstáculos.
+        """
+        indptr, indices = self.navIndptr, self.navIndices
+        starts = [self.cellId(a.cell) for a in self.activeAgents]
+
+        template = self.floorPlan if getattr(self.floorPlan, "reachableCells", None) is not None else None
+        if template is not None and set(starts) == {x * self.height + y for x, y in template.chargers}:
+            # mismos puntos de inicio que la plantilla: las tiles alcanzables ya están calculadas
+            reached = template.reachableView(self)
+        else:
+            reached = bytearray(self.width * self.height)
+            for start in starts:
+                reached[start] = 1
+            queue = deque(starts)
+            while queue:
+                current = queue.popleft()
+                for j in range(indptr[current], indptr[current + 1]):
+                    neighbor = indices[j]
+                    if not reached[neighbor]:
+                        reached[neighbor] = 1
+                        queue.append(neighbor)
+
+        dirt = self.agents_by_type.get(DirtCell, [])
+        self.reachableCells = reached  # 1 por cada tile (por id) a la que se puede llegar
+        self.reachableDirt = [a for a in dirt if reached[self.cellId(a.cell)]]
+        # suciedad alcanzable que falta limpiar; DirtCell.clean la descuenta
+        self.remainingReachableDirt = sum(1 for a in self.reachableDirt if a.isDirty)
+        self.numUnreachableDirt = len(dirt) - len(self.reachableDirt)  # nunca se podrán limpiar
+        self.fullyConnected = sum(reached) == len(reached) - sum(self.navBlocked)
 
     def getMetrics(self):
         """
         obtiene las métricas finales de la simulación.
         retorna: diccionario con métricas globales
         """
-        agents = [a for a in self.agents if isinstance(a, RandomAgent)]
+        agents = list(self.activeAgents)
         if not agents:
             return None
 
@@ -136,11 +405,94 @@ class RandomModel(Model):
         return {
             "timeSteps": self.steps,
             "timeAllClean": self.timeAllClean if self.timeAllClean is not None else self.steps,
+            "timeReachableClean": self.timeReachableClean if self.timeReachableClean is not None else self.steps,
             "percentageClean": percentageClean,
             "totalMovements": totalMovements,
             "averageBattery": avgBattery,
         }
 
+    def _updateMetrics(self):
+        """
+        recalcula liveMetrics en O(roombas) y aumenta metricsVersion si algún contador cambió.
+        el número de paso no forma parte de liveMetrics (timeAllClean es None mientras falte
+        suciedad), así que un paso en el que nada más cambia no invalida la vista.
+        """
+        roombas = sorted(self.activeAgents, key=lambda a: a.agentId) if self.liveMetrics is None else self._metricsOrder
+        self._metricsOrder = roombas  # orden por agentId, se calcula una sola vez
+        agentRows = tuple((a.agentId, a.cleanedCells, a.movementCount, a.battery) for a in roombas)
+
+        totalCleaned = sum(row[1] for row in agentRows)
+        metrics = {
+            "timeAllClean": self.timeAllClean,
+            "percentageClean": (totalCleaned / self.numDirtCells * 100) if self.numDirtCells > 0 else 0,
+            "totalMovements": sum(row[2] for row in agentRows),
+            "averageBattery": sum(row[3] for row in agentRows) / len(agentRows) if agentRows else 0,
+            "remainingDirty": self.numDirtCells - len(self.cleanedTiles),
+            "agents": agentRows,  # (agentId, cleanedCells, movementCount, battery)
+        }
+        if metrics != self.liveMetrics:
+            self.liveMetrics = metrics
+            self.metricsVersion += 1
+
+    def snapshot(self):
+        """
+        guarda el estado completo de la simulación (capas, roombas, cargadores,
+        rng, pasos y datos recolectados) en un snapshot binario.
+        retorna: bytes del snapshot
+        """
+        return saveSnapshot(self)
+
+    @classmethod
+    def fromSnapshot(cls, data, floorPlan=None):
+        """
+        crea un modelo a partir de un snapshot; continúa exactamente donde se guardó.
+        parámetros:
+            data: bytes creados con snapshot()
+            floorPlan: plano o plantilla del mundo (necesario si no venía de un archivo)
+        """
+        return loadSnapshot(cls, data, floorPlan)
+
+    def enableProfiling(self, trace=False):
+        """
+        activa la medición de tiempos por fase, por estado de los roombas y de llamadas
+        a sus funciones auxiliares.
+        parámetros:
+            trace: si es True también guarda cada evento para exportar una traza
+        retorna: TickProfiler con las mediciones
+        """
+        self.disableProfiling()
+        self.profiler = TickProfiler(trace)
+        self.profiler.attach(self)
+        return self.profiler
+
+    def disableProfiling(self):
+        """
+        desactiva la medición y quita los envoltorios de los roombas.
+        retorna: el TickProfiler que estaba activo (o None)
+        """
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            profiler.detach()
+        return profiler
+
+    def enableTelemetry(self, capacity=65536):
+        """
+        activa el registro de transiciones de estado de los roombas.
+        parámetros:
+            capacity: número de transiciones recientes que se guardan
+        retorna: StateTelemetry con los eventos y sus histogramas
+        """
+        self.telemetry = StateTelemetry(self, capacity)
+        return self.telemetry
+
+    def disableTelemetry(self):
+        """
+        desactiva el registro de transiciones.
+        retorna: la StateTelemetry que estaba activa (o None)
+        """
+        telemetry, self.telemetry = self.telemetry, None
+        return telemetry
+
     def step(self):
         """avanza el modelo un paso."""
         # verifica si se alcanzó el límite de pasos
@@ -149,23 +501,54 @@ class RandomModel(Model):
             return
 
         # obtiene todos los agentes roomba
-        agents = [a for a in self.agents if isinstance(a, RandomAgent)]
+        agents = list(self.activeAgents)
 
         # verifica si todos los roombas se quedaron sin batería
         if all(a.battery <= 0 for a in agents):
             self.running = False
             return
 
-        # ejecuta un paso para todos los agentes
-        self.agents.shuffle_do("step")
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.startTick()
+
+        # ejecuta un paso para los roombas
+        if self.legacyShuffle:
+            self.agents.shuffle_do("step")
+        else:
+            self.activeAgents.shuffle_do("step")
         self.steps += 1
+        if profiler is not None:
+            profiler.mark("agents")
 
-        # verifica si todas las tiles están limpias
+        # verifica si todas las tiles están limpias (solo revisa la suciedad alcanzable)
         if self.timeAllClean is None:
-            remainingDirty = sum(1 for a in self.agents if isinstance(a, DirtCell) and a.isDirty)
-            if remainingDirty == 0:
+            remainingReachable = self.remainingReachableDirt
+            if remainingReachable + self.numUnreachableDirt == 0:
                 self.timeAllClean = self.steps
+                self.timeReachableClean = self.steps
+                self.running = False
+            elif remainingReachable == 0:
+                # lo que queda sucio está encerrado: ya no se puede avanzar
+                self.timeReachableClean = self.steps
                 self.running = False
+        if profiler is not None:
+            profiler.mark("dirt")
+
+        # las métricas van antes de recopilar: los reporteros del datacollector las leen
+        self._updateMetrics()
+        if profiler is not None:
+            profiler.mark("metrics")
 
         # recopila datos de este paso
-        self.datacollector.collect(self)
\ No newline at end of file
+        self.datacollector.collect(self)
+        if profiler is not None:
+            profiler.mark("collect")
+
+        if self.replay is not None:
+            self.replay.record(self)
+            if profiler is not None:
+                profiler.mark("replay")
+
+        if profiler is not None:
+            profiler.endTick()
\ No newline at end of file
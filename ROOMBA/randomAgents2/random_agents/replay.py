@@ -0,0 +1,165 @@
+# simulación 2: bitácora de repetición (replay) con keyframes para buscar pasos rápido
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import numpy as np
+
+from roomba_common.telemetry import STATES
+
+from .agent import DirtCell
+
+
+class ReplayLog:
+    """
+    graba una corrida como deltas por paso (movimientos, tiles limpiadas, batería/estado
+    y eventos de ocupar/liberar cargadores) más keyframes periódicos. cualquier paso se
+    reconstruye desde el keyframe anterior aplicando a lo más keyframeInterval deltas.
+    """
+
+    def __init__(self, model=None, keyframeInterval=1000):
+        """
+        crea la bitácora y graba el estado inicial del modelo.
+        parámetros:
+            model: RandomModel a grabar (None al cargar desde archivo)
+            keyframeInterval: cada cuántos pasos grabados se guarda un keyframe
+        """
+        self.keyframeInterval = keyframeInterval
+        self.keyframes = {}  # tick -> frame completo
+        self.deltas = []  # deltas[tick] lleva del frame tick - 1 al frame tick
+        self.stepValues = []  # model.steps de cada tick grabado
+
+        if model is None:
+            return
+
+        self.width = model.width
+        self.height = model.height
+
+        # capas estáticas: se guardan una sola vez (desde la capa de navegación del modelo)
+        self.blocked = np.frombuffer(bytes(model.navBlocked), dtype=bool).reshape(model.width, model.height).copy()
+        stations = sorted(model.chargingStations.values(), key=lambda s: s.stationId)
+        self.stationPos = np.array([s.cell.coordinate for s in stations], dtype=np.int32).reshape(-1, 2)
+
+        # frame inicial completo
+        dirt = np.zeros((model.width, model.height), dtype=bool)
+        for agent in model.agents_by_type.get(DirtCell, []):
+            dirt[agent.cell.coordinate] = agent.isDirty
+        pos, battery, state, owner, cleaned = self._capture(model)
+        self._frame = {"pos": pos, "battery": battery, "state": state, "dirt": dirt, "stationOwner": owner}
+        self._cleaned = cleaned
+
+        self.keyframes[0] = self._copyFrame(self._frame)
+        self.deltas.append(None)
+        self.stepValues.append(model.steps)
+
+    @property
+    def numTicks(self):
+        """número de frames grabados (incluye el inicial)."""
+        return len(self.deltas)
+
+    def _capture(self, model):
+        """lee los campos de los roombas y la ocupación de cargadores en O(roombas + cargadores)."""
+        roombas = sorted(model.activeAgents, key=lambda a: a.agentId)
+        stations = sorted(model.chargingStations.values(), key=lambda s: s.stationId)
+        pos = np.array([a.cell.coordinate for a in roombas], dtype=np.int32).reshape(-1, 2)
+        battery = np.array([a.battery for a in roombas], dtype=np.int16)
+        state = np.array([STATES.index(a.state) for a in roombas], dtype=np.int8)
+        owner = np.array([s.occupiedBy.agentId if s.occupiedBy else -1 for s in stations], dtype=np.int32)
+        cleaned = np.array([a.cleanedCells for a in roombas], dtype=np.int32)
+        return pos, battery, state, owner, cleaned
+
+    @staticmethod
+    def _copyFrame(frame):
+        return {key: value.copy() for key, value in frame.items()}
+
+    @staticmethod
+    def _apply(frame, delta):
+        """aplica un delta a un frame (en su lugar)."""
+        moves, cleanedTiles, agentVars, stationEvents = delta
+        frame["pos"][moves[:, 0]] = moves[:, 1:]
+        frame["dirt"][cleanedTiles[:, 0], cleanedTiles[:, 1]] = False
+        frame["battery"][agentVars[:, 0]] = agentVars[:, 1]
+        frame["state"][agentVars[:, 0]] = agentVars[:, 2]
+        frame["stationOwner"][stationEvents[:, 0]] = stationEvents[:, 1]
+
+    def record(self, model):
+        """graba el delta del último paso del modelo."""
+        pos, battery, state, owner, cleaned = self._capture(model)
+        last = self._frame
+
+        moved = np.flatnonzero((pos != last["pos"]).any(axis=1))
+        # un roomba limpia la tile donde está parado
+        cleanedIdx = np.flatnonzero(cleaned != self._cleaned)
+        changed = np.flatnonzero((battery != last["battery"]) | (state != last["state"]))
+        events = np.flatnonzero(owner != last["stationOwner"])
+
+        delta = (
+            np.column_stack([moved, pos[moved]]).astype(np.int32).reshape(-1, 3),
+            pos[cleanedIdx].reshape(-1, 2),
+            np.column_stack([changed, battery[changed], state[changed]]).astype(np.int32).reshape(-1, 3),
+            np.column_stack([events, owner[events]]).astype(np.int32).reshape(-1, 2),
+        )
+        self._apply(self._frame, delta)
+        self._cleaned = cleaned
+
+        # el tick se publica al final (numTicks = len(deltas)): quien lea la bitácora desde
+        # otro hilo nunca ve un tick sin su keyframe o su número de paso
+        tick = len(self.deltas)
+        if tick % self.keyframeInterval == 0:
+            self.keyframes[tick] = self._copyFrame(self._frame)
+        self.stepValues.append(model.steps)
+        self.deltas.append(delta)
+
+    def seek(self, tick):
+        """
+        reconstruye el frame de un tick grabado sin volver a simular.
+        parámetros:
+            tick: índice del frame (0 = estado inicial)
+        retorna: diccionario con pos, battery, state, dirt y stationOwner
+        """
+        if not 0 <= tick < self.numTicks:
+            raise IndexError(f"tick {tick} fuera de la grabación (0-{self.numTicks - 1})")
+        base = tick - tick % self.keyframeInterval
+        frame = self._copyFrame(self.keyframes[base])
+        for t in range(base + 1, tick + 1):
+            self._apply(frame, self.deltas[t])
+        return frame
+
+    def save(self, path):
+        """guarda la bitácora en un archivo npz comprimido."""
+        kinds = ("moves", "cleaned", "agentVars", "stationEvents")
+        arrays = {
+            "info": np.array([self.width, self.height, self.keyframeInterval], dtype=np.int64),
+            "stepValues": np.array(self.stepValues, dtype=np.int64),
+            "blocked": self.blocked,
+            "stationPos": self.stationPos,
+            "keyframeTicks": np.array(sorted(self.keyframes), dtype=np.int64),
+        }
+        for key in ("pos", "battery", "state", "dirt", "stationOwner"):
+            arrays[f"keyframe_{key}"] = np.stack([self.keyframes[t][key] for t in sorted(self.keyframes)])
+        # los deltas se concatenan con offsets por tick
+        for k, kind in enumerate(kinds):
+            parts = [d[k] for d in self.deltas[1:]]
+            arrays[kind] = np.concatenate(parts) if parts else np.zeros((0, 3 if kind in ("moves", "agentVars") else 2), dtype=np.int32)
+            arrays[f"{kind}_offsets"] = np.cumsum([0] + [len(p) for p in parts])
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """carga una bitácora guardada con save()."""
+        arrays = np.load(path, allow_pickle=False)
+        width, height, keyframeInterval = (int(v) for v in arrays["info"])
+        log = cls(keyframeInterval=keyframeInterval)
+        log.width, log.height = width, height
+        log.blocked = arrays["blocked"]
+        log.stationPos = arrays["stationPos"]
+        log.stepValues = arrays["stepValues"].tolist()
+        for i, tick in enumerate(arrays["keyframeTicks"]):
+            log.keyframes[int(tick)] = {key: arrays[f"keyframe_{key}"][i].copy()
+                                        for key in ("pos", "battery", "state", "dirt", "stationOwner")}
+        kinds = ("moves", "cleaned", "agentVars", "stationEvents")
+        data = [(arrays[kind], arrays[f"{kind}_offsets"]) for kind in kinds]
+        log.deltas = [None] + [
+            tuple(values[offsets[t]:offsets[t + 1]] for values, offsets in data)
+            for t in range(len(log.stepValues) - 1)
+        ]
+        return log
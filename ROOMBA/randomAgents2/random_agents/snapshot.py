@@ -0,0 +1,140 @@
+# simulación 2: snapshots binarios del estado completo de RandomModel
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import io
+import json
+
+import numpy as np
+
+from roomba_common.telemetry import STATES
+
+from .agent import DirtCell, RandomAgent
+
+
+# parámetros del constructor que se guardan para reconstruir el mundo
+PARAMS = ("numAgents", "width", "height", "dirtyPercentage", "obstaclePercentage",
+          "maxSteps", "seed", "legacyShuffle", "requireConnected", "clusterSize", "rngStreams")
+
+def saveSnapshot(model):
+    """
+    serializa el estado completo del modelo a bytes (npz comprimido).
+    parámetros:
+        model: RandomModel a guardar
+    retorna: bytes con el snapshot
+    """
+    roombas = sorted(model.activeAgents, key=lambda a: a.agentId)
+    stations = sorted(model.chargingStations.values(), key=lambda s: s.stationId)
+    stationIds = {s.cell.coordinate: s.stationId for s in stations}
+    dirt = list(model.agents_by_type.get(DirtCell, []))
+
+    # datos pequeños (parámetros, contadores, rng, datos recolectados) van en json
+    meta = {
+        "params": {name: getattr(model, name) for name in PARAMS} | {
+            "planner": model.planner.mode if model.planner else None,
+            "floorPlan": model.floorPlan.source if model.floorPlan else None,
+        },
+        "steps": model.steps,
+        "timeAllClean": model.timeAllClean,
+        "timeReachableClean": model.timeReachableClean,
+        "running": model.running,
+        "random": model.random.getstate(),
+        "rng": model.rng.bit_generator.state,
+        "streams": [model.scheduleRandom.getstate()] + [a.randomStream.getstate() for a in roombas] if model.rngStreams else None,
+        "modelVars": model.datacollector.model_vars,
+        "agentRecords": [(step, records[RandomAgent]) for step, records in model.datacollector._agenttype_records.items()],
+    }
+
+    # capas y campos de los roombas como arreglos compactos
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        "dirtPos": np.array([a.cell.coordinate for a in dirt], dtype=np.int32).reshape(-1, 2),
+        "dirtState": np.array([a.isDirty for a in dirt], dtype=bool),
+        "stationOwner": np.array([s.occupiedBy.agentId if s.occupiedBy else -1 for s in stations], dtype=np.int32),
+        "agentId": np.array([a.agentId for a in roombas], dtype=np.int32),
+        "pos": np.array([a.cell.coordinate for a in roombas], dtype=np.int32).reshape(-1, 2),
+        "battery": np.array([a.battery for a in roombas], dtype=np.int16),
+        "cleanedCells": np.array([a.cleanedCells for a in roombas], dtype=np.int32),
+        "movementCount": np.array([a.movementCount for a in roombas], dtype=np.int32),
+        "chargingTurns": np.array([a.chargingTurns for a in roombas], dtype=np.int32),
+        "state": np.array([STATES.index(a.state) for a in roombas], dtype=np.int8),
+        "currentStation": np.array([a.currentStation.stationId if a.currentStation else -1 for a in roombas], dtype=np.int32),
+        "knownStations": np.array([[coord in a.knownChargingStations for coord in stationIds] for a in roombas], dtype=bool).reshape(len(roombas), len(stations)),
+        "visited": np.array([np.frombuffer(a.visited.bits, dtype=np.uint8) for a in roombas], dtype=np.uint8).reshape(len(roombas), -1),
+        "coverage": model.coverage.counts,
+    }
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def loadSnapshot(modelClass, data, floorPlan=None):
+    """
+    reconstruye un modelo desde un snapshot creado con saveSnapshot.
+    parámetros:
+        modelClass: clase del modelo (RandomModel)
+        data: bytes del snapshot
+        floorPlan: plano o plantilla del mundo (en lugar de la ruta guardada)
+    retorna: modelo con el mismo estado que al guardar
+    """
+    arrays = np.load(io.BytesIO(data), allow_pickle=False)
+    meta = json.loads(arrays["meta"].tobytes().decode())
+    if floorPlan is not None:
+        meta["params"]["floorPlan"] = floorPlan
+
+    # el constructor es determinista: con los mismos parámetros genera el mismo mundo
+    model = modelClass(**meta["params"])
+
+    dirt = list(model.agents_by_type.get(DirtCell, []))
+    dirtPos = np.array([a.cell.coordinate for a in dirt], dtype=np.int32).reshape(-1, 2)
+    if not np.array_equal(dirtPos, arrays["dirtPos"]):
+        raise ValueError("el snapshot no corresponde al mundo generado por sus parámetros")
+    for agent, isDirty in zip(dirt, arrays["dirtState"]):
+        if not isDirty:
+            agent.clean()  # también la anota en model.cleanedTiles
+
+    stations = sorted(model.chargingStations.values(), key=lambda s: s.stationId)
+    stationCoords = [s.cell.coordinate for s in stations]
+    roombas = {a.agentId: a for a in model.activeAgents}
+
+    for idx, agentId in enumerate(arrays["agentId"]):
+        agent = roombas[int(agentId)]
+        agent.cell = model.grid[tuple(int(v) for v in arrays["pos"][idx])]
+        agent.battery = int(arrays["battery"][idx])
+        agent.cleanedCells = int(arrays["cleanedCells"][idx])
+        agent.movementCount = int(arrays["movementCount"][idx])
+        agent.chargingTurns = int(arrays["chargingTurns"][idx])
+        agent.state = STATES[arrays["state"][idx]]
+        stationId = int(arrays["currentStation"][idx])
+        agent.currentStation = stations[stationId] if stationId >= 0 else None
+        agent.knownChargingStations = {coord for coord, known in zip(stationCoords, arrays["knownStations"][idx]) if known}
+        agent.visited.bits[:] = arrays["visited"][idx].tobytes()
+        agent.visited._size = int(np.unpackbits(arrays["visited"][idx]).sum())
+
+    for station, owner in zip(stations, arrays["stationOwner"]):
+        if owner >= 0:
+            station.occupy(roombas[int(owner)])
+        else:
+            station.release()
+
+    model.coverage.counts[:] = arrays["coverage"]
+
+    # contadores, generadores aleatorios y datos recolectados
+    model.steps = meta["steps"]
+    model.timeAllClean = meta["timeAllClean"]
+    model.timeReachableClean = meta["timeReachableClean"]
+    model.running = meta["running"]
+    version, internal, gauss = meta["random"]
+    model.random.setstate((version, tuple(internal), gauss))
+    model.rng.bit_generator.state = meta["rng"]
+    if meta["streams"] is not None:
+        generators = [model.scheduleRandom] + [roombas[agentId].randomStream for agentId in sorted(roombas)]
+        for generator, (version, internal, gauss) in zip(generators, meta["streams"]):
+            generator.setstate((version, tuple(internal), gauss))
+    model.datacollector.model_vars = meta["modelVars"]
+    model.datacollector._agenttype_records = {step: {RandomAgent: [tuple(r) for r in records]} for step, records in meta["agentRecords"]}
+
+    model._updateMetrics()
+
+    return model
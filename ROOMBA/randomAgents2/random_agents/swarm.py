@@ -0,0 +1,422 @@
+# simulación 2: backend vectorizado ("swarm") para flotas grandes de roombas
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import numpy as np
+
+from mesa import Model
+from mesa.datacollection import DataCollector
+
+from roomba_common.coverage import CoverageMap
+from roomba_common.telemetry import STATES
+
+
+# códigos de estado (mismos estados que RandomAgent.step)
+EXPLORING = 0
+CLEANING = 1
+MOVING_TO_DIRT = 2
+MOVING_TO_CHARGE = 3
+CHARGING = 4
+
+# desplazamientos de la vecindad Moore en el mismo orden que OrthogonalMooreGrid
+OFFSETS = np.array([
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+])
+
+
+class SwarmModel(Model):
+    """
+    modelo de múltiples roombas guardados como arreglos (struct-of-arrays).
+
+    implementa la misma máquina de estados que RandomAgent, pero cada estado se
+    evalúa como operaciones con máscaras sobre todos los roombas a la vez. la
+    actualización es síncrona: todos los roombas leen el estado del inicio del
+    paso, y los conflictos (dos roombas limpiando la misma tile o pidiendo el
+    mismo cargador libre) se resuelven con una prioridad aleatoria por paso.
+    """
+
+    def __init__(self, numAgents=2, width=20, height=20, dirtyPercentage=30,
+                 obstaclePercentage=10, maxSteps=10000, seed=42):
+        """
+        crea el modelo.
+        parámetros:
+            numAgents: número de roombas en la simulación
+            width: ancho del grid
+            height: alto del grid
+            dirtyPercentage: porcentaje de tiles sucias (0-100)
+            obstaclePercentage: porcentaje de tiles con obstáculos (0-100)
+            maxSteps: número máximo de pasos permitidos
+            seed: semilla para reproducibilidad
+        """
+        super().__init__(seed=seed)
+
+        # guarda parámetros del modelo
+        self.numAgents = numAgents
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.dirtyPercentage = dirtyPercentage
+        self.obstaclePercentage = obstaclePercentage
+        self.maxSteps = maxSteps
+        self.steps = 0
+        self.timeAllClean = None
+
+        # capas del grid indexadas como [x, y]; el id plano de una tile es x * height + y
+        numCells = width * height
+        self.blocked = np.zeros(numCells, dtype=bool)  # paredes y obstáculos
+        self.dirt = np.zeros(numCells, dtype=bool)  # tiles sucias
+        self.stationAt = np.full(numCells, -1, dtype=np.int32)  # id del cargador en cada tile
+
+        # paredes en el borde del grid
+        xs, ys = np.divmod(np.arange(numCells), height)
+        border = (xs == 0) | (xs == width - 1) | (ys == 0) | (ys == height - 1)
+        self.blocked[border] = True
+
+        # tiles disponibles en el mismo orden que recorre OrthogonalMooreGrid,
+        # así la misma semilla produce el mismo mundo que RandomModel
+        availableCells = np.flatnonzero(~border).tolist()
+
+        numObstacles = max(0, int(len(availableCells) * (obstaclePercentage / 100)))
+        if numObstacles > 0:
+            obstacleCells = self.random.sample(availableCells, numObstacles)
+            self.blocked[obstacleCells] = True
+            availableCells = [c for c in availableCells if not self.blocked[c]]
+
+        # crea cargadores y roombas en posiciones aleatorias
+        numStations = min(numAgents, len(availableCells))
+        stationCells = self.random.sample(availableCells, numStations)
+        self.stationPos = np.array(stationCells, dtype=np.int64)
+        self.stationAt[self.stationPos] = np.arange(numStations, dtype=np.int32)
+        self.stationOwner = np.full(numStations, -1, dtype=np.int32)  # roomba que ocupa cada cargador
+        availableCells = [c for c in availableCells if self.stationAt[c] < 0]
+
+        numDirtCells = max(0, int(len(availableCells) * (dirtyPercentage / 100)))
+        if numDirtCells > 0:
+            dirtCells = self.random.sample(availableCells, numDirtCells)
+            self.dirt[dirtCells] = True
+
+        self.numDirtCells = numDirtCells
+        self.remainingDirty = numDirtCells
+
+        # campos de los roombas (uno por cargador, empiezan en su cargador)
+        n = numStations
+        self.pos = self.stationPos.copy()
+        self.battery = np.full(n, 100, dtype=np.int16)
+        self.state = np.full(n, EXPLORING, dtype=np.int8)
+        self.cleanedCells = np.zeros(n, dtype=np.int32)
+        self.movementCount = np.zeros(n, dtype=np.int32)
+        self.chargingTurns = np.zeros(n, dtype=np.int32)
+        self.currentStation = np.full(n, -1, dtype=np.int32)
+        self.homeStation = np.arange(n, dtype=np.int32)
+        # cargadores conocidos por roomba como lista con relleno: las primeras numKnown[i]
+        # columnas de knownStations[i] son ids de cargador y el resto es -1. el ancho crece
+        # al doble solo cuando algún roomba conoce más cargadores que los que caben
+        self.knownStations = np.full((n, 4), -1, dtype=np.int32)
+        self.knownStations[:, 0] = self.homeStation
+        self.numKnown = np.ones(n, dtype=np.int32)
+
+        # tiles visitadas como bitmap por roomba (1 bit por tile)
+        self.visited = np.zeros((n, (numCells + 7) // 8), dtype=np.uint8)
+        self.coverage = CoverageMap(width, height)  # cobertura compartida de la flota
+        self._markVisited(np.arange(n))
+
+        self.running = True
+
+        self.datacollector = DataCollector(
+            model_reporters={
+                "Movement Count": lambda m: int(m.movementCount.sum()),
+                "Percentage Clean": lambda m: (int(m.cleanedCells.sum()) / m.numDirtCells * 100) if m.numDirtCells > 0 else 0,
+                "Step Limit": lambda m: (m.steps / m.maxSteps * 100) if m.maxSteps > 0 else 0,
+                "Battery": lambda m: float(m.battery.mean()) if len(m.battery) > 0 else 0,
+            }
+        )
+        self.datacollector.collect(self)
+
+    @property
+    def stateNames(self):
+        """nombres de estado de cada roomba, como en RandomAgent.state."""
+        return [STATES[s] for s in self.state]
+
+    def _markVisited(self, idx):
+        """marca la tile actual de los roombas idx como visitada."""
+        cells = self.pos[idx]
+        self.visited[idx, cells >> 3] |= (1 << (cells & 7)).astype(np.uint8)
+        self.coverage.addMany(cells)
+
+    def _isVisited(self, idx, cells):
+        """verifica si cada roomba idx ya visitó la tile correspondiente en cells."""
+        return (self.visited[idx, cells >> 3] >> (cells & 7)) & 1 == 1
+
+    def _neighborCells(self, cells):
+        """retorna (vecinos, dentro): ids de los 8 vecinos y máscara de los que caen dentro del grid."""
+        x, y = np.divmod(cells, self.height)
+        nx = x[:, None] + OFFSETS[:, 0]
+        ny = y[:, None] + OFFSETS[:, 1]
+        inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        return np.where(inside, nx * self.height + ny, 0), inside
+
+    def _neighbors(self, cells):
+        """retorna (vecinos, seguros): ids de los 8 vecinos y máscara de vecinos transitables."""
+        neighbors, inside = self._neighborCells(cells)
+        return neighbors, inside & ~self.blocked[neighbors]
+
+    def _firstNeighbor(self, neighbors, mask):
+        """retorna el primer vecino que cumple la máscara (en orden Moore) o -1."""
+        found = mask.any(axis=1)
+        first = neighbors[np.arange(len(neighbors)), mask.argmax(axis=1)]
+        return np.where(found, first, -1)
+
+    def _randomNeighbor(self, neighbors, mask):
+        """elige un vecino al azar entre los que cumplen la máscara, o -1 si no hay."""
+        keys = np.where(mask, self.rng.random(mask.shape), -1.0)
+        found = mask.any(axis=1)
+        chosen = neighbors[np.arange(len(neighbors)), keys.argmax(axis=1)]
+        return np.where(found, chosen, -1)
+
+    def _distance(self, cells, targets):
+        """distancia manhattan entre tiles (ids planos)."""
+        x, y = np.divmod(cells, self.height)
+        tx, ty = np.divmod(targets, self.height)
+        return np.abs(x - tx) + np.abs(y - ty)
+
+    def _nearestKnownStation(self, idx):
+        """retorna la posición del cargador conocido más cercano para cada roomba idx."""
+        if len(idx) == 0:
+            return np.zeros(0, dtype=np.int64)
+        # solo recorre las columnas usadas de la lista de conocidos (no todos los cargadores)
+        known = self.knownStations[idx, :self.numKnown[idx].max()]
+        valid = known >= 0
+        stations = np.where(valid, known, 0)
+        dist = self._distance(self.pos[idx][:, None], self.stationPos[stations])
+        # empates por id de cargador, igual que recorrer los cargadores en orden
+        key = np.where(valid, dist * len(self.stationPos) + stations, np.iinfo(np.int64).max)
+        return self.stationPos[stations[np.arange(len(idx)), key.argmin(axis=1)]]
+
+    def _addKnownStations(self, rows, stations):
+        """agrega a la lista de cada roomba rows[k] el cargador stations[k] si aún no lo conoce."""
+        if len(rows) == 0:
+            return
+        # quita pares repetidos y los cargadores que el roomba ya conoce
+        pairs = np.unique(rows.astype(np.int64) * len(self.stationPos) + stations)
+        rows, stations = np.divmod(pairs, len(self.stationPos))
+        isNew = ~(self.knownStations[rows] == stations[:, None]).any(axis=1)
+        rows, stations = rows[isNew], stations[isNew]
+        if len(rows) == 0:
+            return
+
+        # columna de cada cargador nuevo: después de los conocidos, en orden dentro de cada roomba
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = rows[1:] != rows[:-1]
+        groupStart = np.maximum.accumulate(np.where(first, np.arange(len(rows)), 0))
+        columns = self.numKnown[rows] + np.arange(len(rows)) - groupStart
+
+        if columns.max() >= self.knownStations.shape[1]:
+            width = self.knownStations.shape[1]
+            while columns.max() >= width:
+                width *= 2
+            grown = np.full((len(self.knownStations), width), -1, dtype=np.int32)
+            grown[:, :self.knownStations.shape[1]] = self.knownStations
+            self.knownStations = grown
+
+        self.knownStations[rows, columns] = stations
+        np.add.at(self.numKnown, rows, 1)
+
+    def _needToCharge(self, idx):
+        """verifica qué roombas idx necesitan recargar."""
+        distance = self._distance(self.pos[idx], self._nearestKnownStation(idx))
+        battery = self.battery[idx]
+        return (battery <= 30) | (battery <= distance + 5)
+
+    def _moveTo(self, idx, targets):
+        """mueve los roombas idx a targets (ignora -1) y actualiza métricas."""
+        moving = targets >= 0
+        idx, targets = idx[moving], targets[moving]
+        self.pos[idx] = targets
+        self.battery[idx] = np.maximum(0, self.battery[idx] - 1)
+        self.movementCount[idx] += 1
+        self._markVisited(idx)
+
+    def _firstPerGroup(self, idx, keys):
+        """resuelve conflictos: elige al azar un solo roomba de idx por cada valor de keys."""
+        if len(idx) == 0:
+            return idx
+        order = np.lexsort((self.rng.permutation(len(idx)), keys))
+        sortedKeys = keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sortedKeys[1:] != sortedKeys[:-1]
+        return idx[order[first]]
+
+    def _releaseStation(self, idx):
+        """libera el cargador que ocupan los roombas idx."""
+        idx = idx[self.currentStation[idx] >= 0]
+        self.stationOwner[self.currentStation[idx]] = -1
+        self.currentStation[idx] = -1
+
+    def _learnStations(self, idx):
+        """los roombas idx que están sobre un cargador lo agregan a sus conocidos."""
+        stations = self.stationAt[self.pos[idx]]
+        onStation = stations >= 0
+        self._addKnownStations(idx[onStation], stations[onStation])
+
+    def _nearbyRoombas(self):
+        """intercambia cargadores conocidos entre roombas en la misma vecindad Moore."""
+        n = len(self.pos)
+        if n < 2:
+            return
+
+        # agrupa los roombas por tile ocupada
+        order = np.argsort(self.pos, kind="stable")
+        occupied, starts, counts = np.unique(self.pos[order], return_index=True, return_counts=True)
+
+        # busca tiles ocupadas en la vecindad (incluye la propia)
+        neighbors, inside = self._neighborCells(self.pos)
+        neighbors = np.concatenate([neighbors, self.pos[:, None]], axis=1)
+        inside = np.concatenate([inside, np.ones((n, 1), dtype=bool)], axis=1)
+
+        slot = np.minimum(np.searchsorted(occupied, neighbors), len(occupied) - 1)
+        found = inside & (occupied[slot] == neighbors)
+
+        # solo los roombas con alguien más cerca participan en el intercambio
+        nearby = np.where(found, counts[slot], 0).sum(axis=1) > 1
+        receivers, columns = np.nonzero(nearby[:, None] & found)
+        if len(receivers) == 0:
+            return
+        groups = slot[receivers, columns]
+
+        # un par (receptor, donante) por cada roomba en las tiles ocupadas de la vecindad
+        size = counts[groups]
+        receivers = np.repeat(receivers, size)
+        offset = np.arange(size.sum()) - np.repeat(np.cumsum(size) - size, size)
+        donors = order[np.repeat(starts[groups], size) + offset]
+
+        # todos leen las listas del inicio del intercambio (es síncrono)
+        known = self.knownStations[donors, :self.numKnown[donors].max()]
+        valid = known >= 0
+        self._addKnownStations(np.broadcast_to(receivers[:, None], known.shape)[valid], known[valid])
+
+    def _stepAgents(self):
+        """ejecuta un paso de la máquina de estados para todos los roombas."""
+        n = len(self.pos)
+        everyone = np.arange(n)
+        state = self.state.copy()  # estados al inicio del paso
+
+        # sin batería: pasa a cargando y libera su cargador
+        dead = self.battery <= 0
+        self.state[dead] = CHARGING
+        self._releaseStation(everyone[dead])
+
+        self._nearbyRoombas()
+
+        active = ~dead
+        hasDirt = self.dirt[self.pos]
+        stationHere = self.stationAt[self.pos]
+        neighbors, safe = self._neighbors(self.pos)
+        dirtyNeighbor = self._firstNeighbor(neighbors, safe & self.dirt[neighbors])
+
+        # estado: cargando
+        charging = everyone[active & (state == CHARGING)]
+        self._learnStations(charging)
+        away = charging[stationHere[charging] < 0]
+        self.state[away] = MOVING_TO_CHARGE
+        atStation = charging[stationHere[charging] >= 0]
+        stations = stationHere[atStation]
+        # conflicto: varios roombas piden el mismo cargador libre, solo uno lo ocupa
+        wanting = atStation[self.stationOwner[stations] == -1]
+        winners = self._firstPerGroup(wanting, stationHere[wanting])
+        self.stationOwner[stationHere[winners]] = winners
+        self.currentStation[winners] = stationHere[winners]
+        owners = atStation[(self.stationOwner[stations] == atStation) & (self.battery[atStation] < 100)]
+        self.battery[owners] = np.minimum(100, self.battery[owners] + 5)
+        self.chargingTurns[owners] += 1
+        charged = atStation[self.battery[atStation] >= 80]
+        self.state[charged] = EXPLORING
+        self._releaseStation(charged)
+
+        # estado: limpiando (conflicto: solo un roomba limpia cada tile)
+        cleaning = everyone[active & (state == CLEANING)]
+        cleaners = self._firstPerGroup(cleaning[hasDirt[cleaning]], self.pos[cleaning[hasDirt[cleaning]]])
+        self.dirt[self.pos[cleaners]] = False
+        self.battery[cleaners] = np.maximum(0, self.battery[cleaners] - 1)
+        self.cleanedCells[cleaners] += 1
+        self.remainingDirty -= len(cleaners)
+        cleaned = np.zeros(n, dtype=bool)
+        cleaned[cleaners] = True
+        self.state[cleaning[~cleaned[cleaning]]] = EXPLORING
+        self.state[cleaners[self._needToCharge(cleaners)]] = MOVING_TO_CHARGE
+
+        # estado: explorando
+        exploring = everyone[active & (state == EXPLORING)]
+        toClean = exploring[hasDirt[exploring]]
+        rest = exploring[~hasDirt[exploring]]
+        toDirt = rest[dirtyNeighbor[rest] >= 0]
+        rest = rest[dirtyNeighbor[rest] < 0]
+        need = self._needToCharge(rest)
+        self.state[toClean] = CLEANING
+        self.state[toDirt] = MOVING_TO_DIRT
+        self.state[rest[need]] = MOVING_TO_CHARGE
+        explorers = rest[~need]
+        if len(explorers):
+            candidates = safe[explorers]
+            unvisited = candidates & ~self._isVisited(explorers[:, None], neighbors[explorers])
+            hasUnvisited = unvisited.any(axis=1)
+            candidates[hasUnvisited] = unvisited[hasUnvisited]
+            self._moveTo(explorers, self._randomNeighbor(neighbors[explorers], candidates))
+
+        # estado: moviéndose hacia el cargador más cercano
+        toCharge = everyone[active & (state == MOVING_TO_CHARGE)]
+        if len(toCharge):
+            target = self._nearestKnownStation(toCharge)
+            distance = self._distance(neighbors[toCharge], target[:, None])
+            distance = np.where(safe[toCharge], distance, np.iinfo(np.int64).max)
+            best = neighbors[toCharge, distance.argmin(axis=1)]
+            self._moveTo(toCharge, np.where(safe[toCharge].any(axis=1), best, -1))
+            arrived = toCharge[self.stationAt[self.pos[toCharge]] >= 0]
+            self._learnStations(arrived)
+            self.state[arrived] = CHARGING
+
+        # estado: moviéndose hacia una tile sucia vecina
+        toDirt = everyone[active & (state == MOVING_TO_DIRT)]
+        self._moveTo(toDirt, dirtyNeighbor[toDirt])
+        self.state[toDirt[dirtyNeighbor[toDirt] < 0]] = EXPLORING
+        onDirt = self.dirt[self.pos[toDirt]]
+        self.state[toDirt[onDirt]] = CLEANING
+        rest = toDirt[~onDirt]
+        self.state[rest[self._needToCharge(rest)]] = MOVING_TO_CHARGE
+
+    def getMetrics(self):
+        """
+        obtiene las métricas finales de la simulación.
+        retorna: diccionario con métricas globales (mismas llaves que RandomModel)
+        """
+        if len(self.pos) == 0:
+            return None
+
+        totalCleaned = int(self.cleanedCells.sum())
+        return {
+            "timeSteps": self.steps,
+            "timeAllClean": self.timeAllClean if self.timeAllClean is not None else self.steps,
+            "percentageClean": (totalCleaned / self.numDirtCells * 100) if self.numDirtCells > 0 else 0,
+            "totalMovements": int(self.movementCount.sum()),
+            "averageBattery": float(self.battery.mean()),
+        }
+
+    def step(self):
+        """avanza el modelo un paso."""
+        if self.steps >= self.maxSteps:
+            self.running = False
+            return
+
+        if np.all(self.battery <= 0):
+            self.running = False
+            return
+
+        self._stepAgents()
+        self.steps += 1
+
+        if self.timeAllClean is None and self.remainingDirty == 0:
+            self.timeAllClean = self.steps
+            self.running = False
+
+        self.datacollector.collect(self)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from random_agents.model import RandomModel
+from roomba_common.floorplan import FloorPlan
+
+ROWS = ["########", "#C....C#", "#.*##..#", "#..*#..#", "########"]
+
+
+def expected_plan():
+    return FloorPlan.fromRows(np.array([list(row.encode()) for row in ROWS], dtype=np.uint8))
+
+
+@pytest.mark.parametrize("ending", ["\n", "\r\n"])
+@pytest.mark.parametrize("finalNewline", [True, False])
+def test_fleet_starts_on_the_plan_chargers(tmp_path, ending, finalNewline):
+    path = tmp_path / "plan.txt"
+    path.write_bytes((ending.join(ROWS) + (ending if finalNewline else "")).encode())
+    model = RandomModel(numAgents=2, floorPlan=str(path), seed=1)
+
+    expected = expected_plan()
+    assert (model.width, model.height) == (8, 5)
+    assert bytes(model.navBlocked) == expected.blocked.tobytes()
+    assert sorted(model.chargingStations) == sorted(expected.chargers) == [(1, 3), (6, 3)]
+    assert sorted(a.cell.coordinate for a in model.activeAgents) == [(1, 3), (6, 3)]
+    assert model.numDirtCells == 2
+
+
+def test_binary_pgm_plan_runs_like_the_text_plan(tmp_path):
+    # mismo mapa como imagen: paredes negras, suciedad gris y piso blanco (sin cargadores marcados)
+    gray = np.array([[{"#": 0, "*": 128}.get(c, 255) for c in row] for row in ROWS], dtype=np.uint8)
+    path = tmp_path / "plan.pgm"
+    path.write_bytes(b"P5\n8 5\n255\n" + gray.tobytes())
+    model = RandomModel(numAgents=2, floorPlan=str(path), seed=1)
+
+    assert bytes(model.navBlocked) == expected_plan().blocked.tobytes()
+    assert len(model.chargingStations) == 2
+    assert model.numDirtCells == 2
+    while model.running:
+        model.step()
+    assert model.getMetrics()["percentageClean"] == 100
@@ -0,0 +1,92 @@
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from random_agents.model import RandomModel
+from roomba_common.floorplan import FloorPlan
+
+
+def bfs_lengths(model, start):
+    """Shortest path length (in tiles) from start to every reachable tile of the navigation graph."""
+    lengths = {start: 1}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in model.navIndices[model.navIndptr[node]:model.navIndptr[node + 1]]:
+            if neighbor not in lengths:
+                lengths[neighbor] = lengths[node] + 1
+                queue.append(neighbor)
+    return lengths
+
+
+def assert_valid_path(model, path, start, goal):
+    ids = [model.cellId(cell) for cell in path]
+    assert ids[0] == start and ids[-1] == goal
+    for a, b in zip(ids, ids[1:]):
+        assert b in model.navIndices[model.navIndptr[a]:model.navIndptr[a + 1]], (a, b)
+
+
+def free_tiles(model):
+    return [i for i in range(model.width * model.height) if not model.navBlocked[i]]
+
+
+@pytest.mark.parametrize("mode", ["hpa", "jps"])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_paths_follow_the_navigation_graph(mode, seed):
+    model = RandomModel(width=40, height=30, obstaclePercentage=25, seed=seed, planner=mode, clusterSize=8)
+    tiles = free_tiles(model)
+    rng = random.Random(seed)
+
+    for _ in range(60):
+        start, goal = rng.sample(tiles, 2)
+        lengths = bfs_lengths(model, start)
+        path = model.planner.findPath(model.cellsById[start], model.cellsById[goal])
+        if goal not in lengths:
+            assert path is None
+            continue
+        assert_valid_path(model, path, start, goal)
+        if mode == "jps":
+            assert len(path) == lengths[goal]
+
+
+def test_next_step_walks_to_the_goal():
+    model = RandomModel(width=30, height=30, obstaclePercentage=20, seed=8, planner="hpa", clusterSize=6)
+    tiles = free_tiles(model)
+    rng = random.Random(8)
+
+    for _ in range(20):
+        start, goal = rng.sample(tiles, 2)
+        lengths = bfs_lengths(model, start)
+        cell, goalCell = model.cellsById[start], model.cellsById[goal]
+        walked = [cell]
+        while cell is not goalCell:
+            cell = model.planner.nextStep(cell, goalCell)
+            if cell is None:
+                break
+            walked.append(cell)
+            assert len(walked) <= len(tiles)
+        if goal in lengths:
+            assert_valid_path(model, walked, start, goal)
+        else:
+            assert cell is None
+
+
+@pytest.mark.parametrize("mode", ["hpa", "jps"])
+def test_walled_off_room_has_no_path(mode):
+    rows = [
+        "##########",
+        "#C.......#",
+        "#....#####",
+        "#....#...#",
+        "#....#...#",
+        "##########",
+    ]
+    plan = FloorPlan.fromRows(np.array([list(row.encode()) for row in rows], dtype=np.uint8))
+    model = RandomModel(floorPlan=plan, seed=1, planner=mode, clusterSize=4)
+
+    outside, inside = model.grid[(1, 2)], model.grid[(7, 2)]
+    assert model.planner.findPath(outside, inside) is None
+    assert model.planner.nextStep(outside, inside) is None
+    assert len(model.planner.findPath(outside, model.grid[(8, 4)])) == 8
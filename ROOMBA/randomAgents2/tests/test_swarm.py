@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from random_agents.model import RandomModel
+from random_agents.swarm import SwarmModel
+
+SEEDS = range(32)
+
+
+def run_kpis(model_class, **params):
+    """Run one model per seed until it stops and return the KPI rows as an array."""
+    rows = []
+    for seed in SEEDS:
+        model = model_class(seed=seed, **params)
+        while model.running:
+            model.step()
+        metrics = model.getMetrics()
+        rows.append((metrics["percentageClean"], metrics["totalMovements"],
+                     metrics["averageBattery"], metrics["timeAllClean"]))
+    return np.array(rows, dtype=float)
+
+
+def test_swarm_tracks_agents_until_clean():
+    params = dict(numAgents=4, width=15, height=15, maxSteps=3000)
+    agents = run_kpis(RandomModel, **params).mean(axis=0)
+    swarm = run_kpis(SwarmModel, **params).mean(axis=0)
+
+    assert agents[0] == swarm[0] == 100
+    assert swarm[1] == pytest.approx(agents[1], rel=0.1)  # movimientos
+    assert swarm[3] == pytest.approx(agents[3], rel=0.1)  # pasos hasta limpiar todo
+
+
+def test_swarm_tracks_agents_within_step_budget():
+    params = dict(numAgents=4, width=20, height=20, maxSteps=300)
+    agents = run_kpis(RandomModel, **params).mean(axis=0)
+    swarm = run_kpis(SwarmModel, **params).mean(axis=0)
+
+    assert swarm[0] == pytest.approx(agents[0], abs=5)  # porcentaje limpio
+    assert swarm[1] == pytest.approx(agents[1], rel=0.1)
+    assert swarm[2] == pytest.approx(agents[2], abs=3)  # batería promedio
+
+
+def test_nearest_known_station_matches_brute_force():
+    model = SwarmModel(numAgents=60, width=30, height=30, seed=5)
+    for _ in range(200):
+        model.step()
+
+    everyone = np.arange(len(model.pos))
+    expected = []
+    for i in everyone:
+        known = model.knownStations[i, :model.numKnown[i]]
+        assert len(set(known.tolist())) == len(known) and (known >= 0).all()
+        dist = [model._distance(model.pos[i], model.stationPos[s]) for s in known]
+        expected.append(model.stationPos[min(zip(dist, known))[1]])
+    assert model.numKnown.max() > 1
+    assert np.array_equal(model._nearestKnownStation(everyone), expected)
+
+
+def test_agents_break_station_ties_by_station_id_like_the_swarm():
+    model = RandomModel(numAgents=4, width=20, height=20, seed=3)
+    stations = sorted(model.chargingStations.values(), key=lambda s: s.stationId)
+    agent = model.activeAgents[0]
+
+    ties = []
+    for a in stations:
+        for b in stations:
+            if a.stationId < b.stationId:
+                for cell in model.grid.all_cells:
+                    if agent._distanceToStation(a.cell.coordinate, cell) == agent._distanceToStation(b.cell.coordinate, cell):
+                        ties.append((cell, a, b))
+    assert ties
+
+    for cell, first, second in ties[:20]:
+        agent.cell = cell
+        for known in ({first.cell.coordinate, second.cell.coordinate}, {second.cell.coordinate, first.cell.coordinate}):
+            agent.knownChargingStations = known
+            assert agent._nearestKnownStation() == first.cell.coordinate
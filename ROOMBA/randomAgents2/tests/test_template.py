@@ -0,0 +1,26 @@
+from random_agents.model import RandomModel
+from roomba_common.template import MapTemplate
+
+PARAMS = dict(numAgents=3, width=30, height=30, seed=7)
+
+
+def run(model, steps=80):
+    for _ in range(steps):
+        model.step()
+    return model.getMetrics()
+
+
+def test_models_keep_running_after_the_shared_template_is_closed():
+    template = MapTemplate.build(RandomModel, **PARAMS)
+    attached = MapTemplate.attach(template.share())
+    try:
+        planners = (None, "jps")
+        models = [RandomModel(numAgents=3, seed=7, floorPlan=attached, planner=planner) for planner in planners]
+        attached.close()
+
+        assert all(not isinstance(model.navIndices, memoryview) for model in models)
+        assert models[1].planner.indices is models[1].navIndices
+        expected = [run(RandomModel(numAgents=3, seed=7, floorPlan=template, planner=planner)) for planner in planners]
+        assert [run(model) for model in models] == expected
+    finally:
+        template.close(unlink=True)
@@ -0,0 +1,150 @@
+# simulaciones 1 y 2: representación compacta de tiles visitadas
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+from array import array
+
+import numpy as np
+
+
+class VisitCounts:
+    """
+    contador de visitas por tile (simulación 1) guardado como arreglo uint32 indexado por id de tile.
+    se usa igual que el set de visitadas (add / in) y que el dict de conteos (get).
+    """
+
+    __slots__ = ("width", "height", "counts", "_size")
+
+    MAX_COUNT = 2 ** 32 - 1  # el conteo se satura en el máximo de uint32 (no se alcanza en la práctica)
+
+    def __init__(self, width, height):
+        """
+        crea el contador vacío.
+        parámetros:
+            width: ancho del grid
+            height: alto del grid
+        """
+        self.width = width
+        self.height = height
+        self.counts = array("I", bytes(4 * width * height))  # un uint32 por tile
+        self._size = 0  # número de tiles distintas visitadas
+
+    def add(self, coordinate):
+        """suma una visita a la tile."""
+        cellId = coordinate[0] * self.height + coordinate[1]
+        count = self.counts[cellId]
+        if count == 0:
+            self._size += 1
+        if count < self.MAX_COUNT:
+            self.counts[cellId] = count + 1
+
+    def get(self, coordinate, default=0):
+        """retorna el número de visitas de la tile (o default si nunca se visitó)."""
+        count = self.counts[coordinate[0] * self.height + coordinate[1]]
+        return count if count else default
+
+    def __getitem__(self, coordinate):
+        return self.counts[coordinate[0] * self.height + coordinate[1]]
+
+    def __contains__(self, coordinate):
+        return self.counts[coordinate[0] * self.height + coordinate[1]] > 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        # recorre las coordenadas visitadas como el set original
+        for cellId, count in enumerate(self.counts):
+            if count:
+                yield divmod(cellId, self.height)
+
+    def asArray(self):
+        """retorna los conteos como arreglo numpy (width, height) sin copiar."""
+        return np.frombuffer(self.counts, dtype=np.uint32).reshape(self.width, self.height)
+
+
+class VisitedBitmap:
+    """
+    tiles visitadas por un roomba (simulación 2) guardadas como bitmap (1 bit por tile).
+    se usa igual que el set de coordenadas original (add / in / len).
+    """
+
+    __slots__ = ("width", "height", "bits", "_size")
+
+    def __init__(self, width, height):
+        """
+        crea el bitmap vacío.
+        parámetros:
+            width: ancho del grid
+            height: alto del grid
+        """
+        self.width = width
+        self.height = height
+        self.bits = bytearray((width * height + 7) // 8)
+        self._size = 0  # número de tiles visitadas
+
+    def add(self, coordinate):
+        """marca la tile como visitada."""
+        cellId = coordinate[0] * self.height + coordinate[1]
+        mask = 1 << (cellId & 7)
+        byte = self.bits[cellId >> 3]
+        if not byte & mask:
+            self.bits[cellId >> 3] = byte | mask
+            self._size += 1
+
+    def __contains__(self, coordinate):
+        cellId = coordinate[0] * self.height + coordinate[1]
+        return bool(self.bits[cellId >> 3] & (1 << (cellId & 7)))
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        # recorre las coordenadas visitadas como el set original
+        for cellId in np.flatnonzero(self.asArray()):
+            yield divmod(int(cellId), self.height)
+
+    def asArray(self):
+        """retorna las tiles visitadas como máscara numpy (width, height)."""
+        bits = np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), bitorder="little")
+        return bits[:self.width * self.height].astype(bool).reshape(self.width, self.height)
+
+
+class CoverageMap:
+    """mapa de cobertura compartido por todos los roombas: visitas totales por tile."""
+
+    def __init__(self, width, height):
+        """
+        crea el mapa vacío.
+        parámetros:
+            width: ancho del grid
+            height: alto del grid
+        """
+        self.width = width
+        self.height = height
+        self.counts = np.zeros((width, height), dtype=np.uint32)
+
+    def add(self, coordinate):
+        """suma una visita a la tile."""
+        self.counts[coordinate] += 1
+
+    def addMany(self, cellIds):
+        """suma una visita a varias tiles dadas por id plano (x * height + y)."""
+        np.add.at(self.counts.reshape(-1), cellIds, 1)
+
+    def visitCounts(self, coordinates):
+        """retorna las visitas de varias tiles a la vez (lista de coordenadas)."""
+        xs, ys = np.asarray(coordinates).reshape(-1, 2).T
+        return self.counts[xs, ys]
+
+    def visitedMask(self):
+        """retorna una máscara booleana (width, height) de las tiles visitadas por algún roomba."""
+        return self.counts > 0
+
+    def fraction(self, mask=None):
+        """porcentaje (0-1) de tiles visitadas, opcionalmente solo dentro de una máscara."""
+        visited = self.visitedMask()
+        if mask is None:
+            return visited.mean()
+        total = mask.sum()
+        return (visited & mask).sum() / total if total > 0 else 0
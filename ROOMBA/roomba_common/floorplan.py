@@ -0,0 +1,173 @@
+# simulaciones 1 y 2: carga de planos de piso (mapas de ocupación) desde archivos de texto o imagen
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import os
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # pillow es opcional: solo se necesita para png
+    Image = None
+
+
+# símbolos de los mapas de texto
+WALL = ord("#")
+DIRT = ord("*")
+CHARGER = ord("C")
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+CHUNK_BYTES = 1 << 20  # bytes revisados a la vez al validar un mapa de texto
+
+# umbrales de gris para mapas de imagen (0 = negro, 255 = blanco)
+BLOCKED_BELOW = 64  # oscuro: obstáculo
+FREE_FROM = 192  # claro: piso limpio; en medio: piso sucio
+
+
+class FloorPlan:
+    """
+    capas de un plano de piso indexadas como [x, y] (igual que el grid).
+    blocked y dirt son arreglos bool de (width, height); chargers es una lista de coordenadas.
+    """
+
+    def __init__(self, blocked, dirt=None, chargers=(), source=None):
+        """
+        crea el plano a partir de sus capas.
+        parámetros:
+            blocked: arreglo bool (width, height) con paredes y obstáculos
+            dirt: arreglo bool (width, height) con tiles sucias (None = sin suciedad marcada)
+            chargers: coordenadas de los cargadores marcados en el plano
+            source: ruta del archivo de origen (None si se creó en memoria)
+        """
+        self.blocked = np.ascontiguousarray(blocked, dtype=bool)
+        self.dirt = np.zeros_like(self.blocked) if dirt is None else np.ascontiguousarray(dirt, dtype=bool) & ~self.blocked
+        self.chargers = [tuple(int(v) for v in c) for c in chargers]
+        self.source = source
+
+    @property
+    def width(self):
+        return self.blocked.shape[0]
+
+    @property
+    def height(self):
+        return self.blocked.shape[1]
+
+    @classmethod
+    def fromRows(cls, rows, source=None):
+        """
+        crea el plano desde una matriz de filas (fila 0 = parte de arriba del mapa).
+        parámetros:
+            rows: arreglo uint8 (filas, columnas) con los símbolos de texto
+            source: ruta del archivo de origen
+        """
+        # la fila 0 del archivo es la parte de arriba: y = alto - 1 - fila
+        layers = np.ascontiguousarray(rows[::-1].T)
+        xs, ys = np.nonzero(layers == CHARGER)
+        return cls(layers == WALL, layers == DIRT, list(zip(xs.tolist(), ys.tolist())), source)
+
+    @classmethod
+    def fromGray(cls, gray, source=None):
+        """
+        crea el plano desde una imagen en escala de grises (fila 0 = parte de arriba).
+        parámetros:
+            gray: arreglo uint8 (filas, columnas)
+            source: ruta del archivo de origen
+        """
+        layers = np.ascontiguousarray(gray[::-1].T)
+        blocked = layers < BLOCKED_BELOW
+        return cls(blocked, (layers < FREE_FROM) & ~blocked, (), source)
+
+
+def loadFloorPlan(path):
+    """
+    carga un plano de piso desde un archivo.
+    formatos:
+        .pgm / .pnm: mapa de ocupación en gris (P5 binario se lee con memory map, P2 texto)
+        .png: imagen en gris (requiere pillow)
+        cualquier otro: mapa de texto con '#' pared, '*' suciedad, 'C' cargador y '.' piso
+    parámetros:
+        path: ruta del archivo
+    retorna: FloorPlan
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".pgm", ".pnm"):
+        return FloorPlan.fromGray(_readPgm(path), source=path)
+    if extension == ".png":
+        if Image is None:
+            raise ImportError("se necesita pillow para cargar planos png")
+        with Image.open(path) as image:
+            return FloorPlan.fromGray(np.asarray(image.convert("L")), source=path)
+    return FloorPlan.fromRows(_readAscii(path), source=path)
+
+
+def _readAscii(path):
+    """
+    lee un mapa de texto con memory map: las filas son una vista sobre el archivo mapeado
+    (no se lee completo a memoria) y FloorPlan.fromRows hace la única copia.
+    acepta fin de línea \\n o \\r\\n y una última línea sin salto de línea.
+    """
+    if os.path.getsize(path) == 0:
+        raise ValueError(f"el plano {path} está vacío")
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    uneven = ValueError(f"las filas del plano {path} no tienen el mismo largo")
+
+    # largo de línea y fin de línea tomados de la primera fila
+    first = -1
+    for start in range(0, len(data), CHUNK_BYTES):
+        hits = np.flatnonzero(data[start:start + CHUNK_BYTES] == NEWLINE)
+        if len(hits):
+            first = start + int(hits[0])
+            break
+    ending = 2 if first > 0 and data[first - 1] == CARRIAGE_RETURN else 1
+    lineLength = first + 1 if first >= 0 else len(data) + ending
+    complete, tail = divmod(len(data), lineLength)
+    if tail not in (0, lineLength - ending):
+        raise uneven
+
+    # filas completas como vista (filas, lineLength) sobre el archivo; cada una debe tener
+    # un solo salto de línea, al final (revisado por bloques para no crear temporales grandes)
+    lines = data[:complete * lineLength].reshape(complete, lineLength)
+    blockRows = max(1, CHUNK_BYTES // lineLength)
+    for row in range(0, complete, blockRows):
+        block = lines[row:row + blockRows]
+        if np.count_nonzero(block == NEWLINE) != len(block) or not np.all(block[:, -1] == NEWLINE):
+            raise uneven
+    if ending == 2 and not np.all(lines[:, -2] == CARRIAGE_RETURN):
+        raise uneven
+    rows = lines[:, :lineLength - ending]
+
+    if tail:
+        # última línea sin salto de línea: es el único caso en que las filas se copian aquí
+        last = data[complete * lineLength:]
+        if np.any(last == NEWLINE):
+            raise uneven
+        rows = np.concatenate([rows, last[None, :]])
+    return rows
+
+
+def _readPgm(path):
+    """lee un pgm; el formato binario (P5) se mapea a memoria sin leer todo el archivo."""
+    with open(path, "rb") as file:
+        header = []
+        offset = 0
+        # encabezado: número mágico, ancho, alto y valor máximo (con comentarios '#')
+        while len(header) < 4:
+            line = file.readline()
+            if not line:
+                raise ValueError(f"encabezado pgm incompleto en {path}")
+            offset += len(line)
+            header.extend(line.split(b"#")[0].split())
+        magic, width, height, maxValue = header[0], int(header[1]), int(header[2]), int(header[3])
+
+        if magic == b"P5":
+            dtype = np.uint8 if maxValue < 256 else np.dtype(">u2")
+            gray = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(height, width))
+        elif magic == b"P2":
+            gray = np.array(file.read().split(), dtype=np.int64)[:width * height].reshape(height, width)
+        else:
+            raise ValueError(f"formato pgm no soportado: {magic.decode()}")
+
+    if maxValue != 255:
+        gray = (gray.astype(np.int64) * 255 // maxValue)
+    return np.asarray(gray, dtype=np.uint8)
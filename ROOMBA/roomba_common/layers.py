@@ -0,0 +1,112 @@
+# simulaciones 1 y 2: vista del grid por capas (fondo estático, limpiezas y roombas)
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import io
+
+import numpy as np
+import PIL.Image
+
+
+# colores de las capas: 0 libre, 1 sucia, 2 obstáculo o pared, 3 cargador
+FREE, DIRTY, BLOCKED, CHARGER = range(4)
+PALETTE = np.array([
+    [255, 255, 255],  # white
+    [140, 86, 75],  # tab:brown
+    [0, 0, 0],  # black
+    [44, 160, 44],  # tab:green
+], dtype=np.uint8)
+CLEAN_COLOR = "white"  # mismo color que FREE
+ROOMBA_COLOR = "red"
+
+# limpiezas por capa del overlay: las capas llenas ya no cambian y solo se vuelve a
+# construir la última (a lo más CLEAN_CHUNK tiles por cuadro)
+CLEAN_CHUNK = 256
+
+
+class SpaceLayers:
+    """
+    dibuja el grid en capas: el fondo (paredes, obstáculos, cargadores y la suciedad
+    inicial) se codifica como png una sola vez y no cambia; las tiles limpiadas se pintan
+    encima como capas svg construidas solo con los eventos de model.cleanedTiles, y los
+    roombas se dibujan en cada cuadro como otro svg. así el costo por cuadro depende de
+    las limpiezas nuevas y del número de roombas, no del tamaño del grid.
+    """
+
+    def __init__(self, model, maxPixels=600):
+        """
+        crea las capas del modelo.
+        parámetros:
+            model: RandomModel a dibujar (de cualquiera de las dos simulaciones)
+            maxPixels: tamaño aproximado de la imagen (pixeles por lado)
+        """
+        self.width = model.width
+        self.height = model.height
+        self.scale = max(1, maxPixels // max(self.width, self.height))  # pixeles por tile
+
+        # capa estática: tiles bloqueadas (incluye paredes) y cargadores
+        dirt, chargers = model.mapLayers()
+        self.static = np.frombuffer(bytes(model.navBlocked), dtype=np.uint8).reshape(self.width, self.height) * BLOCKED
+        for coord in chargers:
+            self.static[coord] = CHARGER
+
+        # fondo con toda la suciedad colocada; lo que ya se limpió va en el overlay
+        layers = np.where(dirt & (self.static == FREE), DIRTY, self.static).astype(np.uint8)
+        # y = 0 es la última fila de pixeles, como en la vista de mesa
+        pixels = np.repeat(np.repeat(layers.T[::-1], self.scale, axis=0), self.scale, axis=1)
+        image = PIL.Image.fromarray(pixels)
+        image.putpalette(PALETTE.tobytes())
+        data = io.BytesIO()
+        image.save(data, format="png", compress_level=1)
+        self.background = data.getvalue()  # bytes del png; el mismo objeto en cada cuadro
+
+        self.numCleaned = 0  # eventos de model.cleanedTiles ya agregados al overlay
+        self._closedChunks = []  # svg de las capas llenas (ya no cambian)
+        self._openRects = []  # rects de la capa abierta
+
+    @property
+    def pixelWidth(self):
+        return self.width * self.scale
+
+    @property
+    def pixelHeight(self):
+        return self.height * self.scale
+
+    def _svg(self, rects, fill):
+        return (f'<svg viewBox="0 0 {self.width} {self.height}" width="{self.pixelWidth}" '
+                f'height="{self.pixelHeight}" fill="{fill}" shape-rendering="crispEdges">{"".join(rects)}</svg>')
+
+    def cleanOverlays(self, model):
+        """
+        agrega las limpiezas nuevas desde el último cuadro y retorna las capas del overlay.
+        parámetros:
+            model: RandomModel a dibujar
+        retorna: lista de svg (las capas llenas son los mismos objetos de cuadros anteriores)
+        """
+        cleaned = model.cleanedTiles
+        numCleaned = len(cleaned)  # el modelo puede seguir limpiando desde otro hilo
+        for x, y in cleaned[self.numCleaned:numCleaned]:
+            if self.static[x, y] != FREE:
+                continue  # la tile no se pintó sucia en el fondo
+            self._openRects.append(f'<rect x="{x}" y="{self.height - 1 - y}" width="1" height="1"/>')
+            if len(self._openRects) == CLEAN_CHUNK:
+                self._closedChunks.append(self._svg(self._openRects, CLEAN_COLOR))
+                self._openRects = []
+        self.numCleaned = numCleaned
+
+        if not self._openRects:
+            return self._closedChunks
+        return self._closedChunks + [self._svg(self._openRects, CLEAN_COLOR)]
+
+    def sprites(self, model):
+        """
+        dibuja los roombas.
+        parámetros:
+            model: RandomModel a dibujar
+        retorna: svg con un cuadro por roomba, del mismo tamaño que el fondo
+        """
+        rects = [
+            f'<rect x="{x + 0.1:g}" y="{self.height - 0.9 - y:g}" width="0.8" height="0.8"/>'
+            for x, y in (agent.cell.coordinate for agent in model.activeAgents)
+        ]
+        return self._svg(rects, ROOMBA_COLOR)
@@ -0,0 +1,472 @@
+# simulaciones 1 y 2: planeación de rutas jerárquica (HPA*) y jump point search para mapas grandes
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import heapq
+from array import array
+
+import numpy as np
+
+
+# direcciones de la vecindad Moore
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+class PathPlanner:
+    """
+    planeador de rutas sobre el grafo de navegación del modelo.
+
+    modo "hpa": divide el grid en clusters de clusterSize x clusterSize, precalcula las
+    entradas entre clusters y las distancias entre entradas del mismo cluster, busca en
+    ese grafo abstracto y refina solo dentro de los clusters del camino.
+    modo "jps": jump point search sobre el grid completo, útil en pisos abiertos.
+
+    si la búsqueda abstracta no encuentra camino se usa un BFS plano como respaldo.
+    """
+
+    MAX_CACHED_GOALS = 64  # metas con siguientes pasos guardados
+
+    def __init__(self, model, mode="hpa", clusterSize=10):
+        """
+        crea el planeador (requiere que el modelo ya tenga su grafo de navegación).
+        parámetros:
+            model: RandomModel con navBlocked, navIndptr, navIndices y cellsById
+            mode: "hpa" o "jps"
+            clusterSize: lado de cada cluster en modo "hpa"
+        """
+        if mode not in ("hpa", "jps"):
+            raise ValueError(f"modo de planeación desconocido: {mode}")
+
+        self.mode = mode
+        self.width = model.width
+        self.height = model.height
+        self.blocked = model.navBlocked
+        self.indptr = model.navIndptr
+        self.indices = model.navIndices
+        self.cellsById = model.cellsById
+        self.clusterSize = clusterSize
+        self.clustersY = -(-self.height // clusterSize)
+        self._nextTowards = {}  # meta -> {tile: siguiente tile} de caminos ya calculados
+
+        if mode == "hpa":
+            self._buildAbstractGraph()
+
+    # utilidades de ids
+
+    def _id(self, x, y):
+        return x * self.height + y
+
+    def _free(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and not self.blocked[x * self.height + y]
+
+    def clusterOf(self, cellId):
+        """retorna el índice del cluster que contiene la tile."""
+        x, y = divmod(cellId, self.height)
+        return (x // self.clusterSize) * self.clustersY + y // self.clusterSize
+
+    def _clusterBounds(self, cluster):
+        cx, cy = divmod(cluster, self.clustersY)
+        x0, y0 = cx * self.clusterSize, cy * self.clusterSize
+        return x0, min(x0 + self.clusterSize, self.width), y0, min(y0 + self.clusterSize, self.height)
+
+    # búsqueda local
+
+    def _bfs(self, start, isGoal, cluster=None):
+        """
+        BFS sobre el grafo CSR desde start, opcionalmente limitado a un cluster.
+        retorna (tile encontrada o None, diccionario de padres).
+        """
+        indptr, indices = self.indptr, self.indices
+        parent = {start: None}
+        queue = [start]
+        index = 0
+        while index < len(queue):
+            current = queue[index]
+            index += 1
+            if isGoal(current):
+                return current, parent
+            for j in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[j]
+                if neighbor in parent:
+                    continue
+                if cluster is not None and self.clusterOf(neighbor) != cluster:
+                    continue
+                parent[neighbor] = current
+                queue.append(neighbor)
+        return None, parent
+
+    @staticmethod
+    def _trace(parent, end):
+        path = []
+        while end is not None:
+            path.append(end)
+            end = parent[end]
+        return path[::-1]
+
+    def _localDistances(self, start, cluster):
+        """distancias (en pasos) desde start a todas las tiles de su cluster."""
+        _, parent = self._bfs(start, lambda _: False, cluster)
+        # los padres se insertan en orden de BFS: cada padre ya tiene su distancia
+        dist = {start: 0}
+        for cell, previous in parent.items():
+            if previous is not None:
+                dist[cell] = dist[previous] + 1
+        return dist
+
+    # grafo abstracto (HPA*)
+
+    def _buildAbstractGraph(self):
+        """precalcula las entradas entre clusters y las aristas del grafo abstracto."""
+        self.edges = {}  # nodo -> {vecino: costo}
+        clustersX = -(-self.width // self.clusterSize)
+
+        def addEdge(a, b, cost):
+            self.edges.setdefault(a, {})
+            self.edges.setdefault(b, {})
+            if cost < self.edges[a].get(b, float("inf")):
+                self.edges[a][b] = cost
+                self.edges[b][a] = cost
+
+        # cada cluster revisa sus 4 lados y crea entradas por cada tramo continuo de
+        # tiles libres que cruzan (incluyendo diagonales) hacia otro cluster
+        for cluster in range(clustersX * self.clustersY):
+            x0, x1, y0, y1 = self._clusterBounds(cluster)
+            sides = [
+                [(x1 - 1, y) for y in range(y0, y1)],  # lado derecho
+                [(x0, y) for y in range(y0, y1)],  # lado izquierdo
+                [(x, y1 - 1) for x in range(x0, x1)],  # lado superior
+                [(x, y0) for x in range(x0, x1)],  # lado inferior
+            ]
+            for side in sides:
+                run = []
+                for x, y in side + [(-1, -1)]:
+                    crossing = []
+                    if self._free(x, y):
+                        a = self._id(x, y)
+                        crossing = [b for b in self._neighborIds(x, y) if self.clusterOf(b) != cluster]
+                    if crossing:
+                        run.append((a, crossing))
+                    elif run:
+                        reps = [run[0], run[-1]] if len(run) >= 6 else [run[len(run) // 2]]
+                        for a, targets in reps:
+                            for b in targets:
+                                addEdge(a, b, 1)
+                        run = []
+
+        # aristas internas: distancias entre entradas del mismo cluster
+        byCluster = {}
+        for node in self.edges:
+            byCluster.setdefault(self.clusterOf(node), []).append(node)
+        self.clusterNodes = byCluster
+        for cluster, nodes in byCluster.items():
+            for node in nodes:
+                dist = self._localDistances(node, cluster)
+                for other in nodes:
+                    if other != node and other in dist:
+                        addEdge(node, other, dist[other])
+
+    def _neighborIds(self, x, y):
+        cellId = self._id(x, y)
+        return [self.indices[j] for j in range(self.indptr[cellId], self.indptr[cellId + 1])]
+
+    def _abstractSearch(self, start, goal=None, onSettle=None):
+        """
+        dijkstra/A* sobre el grafo abstracto con start (y goal) insertados.
+        con goal retorna la lista de nodos start..goal; con onSettle llama
+        onSettle(nodo, nodos hasta ahí) al asentar cada nodo y se detiene si retorna algo.
+        """
+        startCluster = self.clusterOf(start)
+        startDist = self._localDistances(start, startCluster)
+        goalDist = {}
+        if goal is not None:
+            goalCluster = self.clusterOf(goal)
+            goalDist = {n: d for n, d in self._localDistances(goal, goalCluster).items()
+                        if n in self.edges}
+            gx, gy = divmod(goal, self.height)
+
+        def heuristic(node):
+            if goal is None:
+                return 0
+            x, y = divmod(node, self.height)
+            return max(abs(x - gx), abs(y - gy))
+
+        GOAL = -1
+        best = {}
+        parent = {}
+        heap = []
+        for node in self.clusterNodes.get(startCluster, []):
+            if node in startDist:
+                best[node] = startDist[node]
+                parent[node] = start
+                heapq.heappush(heap, (startDist[node] + heuristic(node), startDist[node], node))
+
+        settled = set()
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if node == GOAL:
+                break
+            if node in settled or g > best.get(node, float("inf")):
+                continue
+            settled.add(node)
+
+            if onSettle is not None:
+                result = onSettle(node, lambda n=node: self._abstractChain(parent, n, start))
+                if result is not None:
+                    return result
+
+            if node in goalDist:
+                total = g + goalDist[node]
+                if total < best.get(GOAL, float("inf")):
+                    best[GOAL] = total
+                    parent[GOAL] = node
+                    heapq.heappush(heap, (total, total, GOAL))
+
+            for neighbor, cost in self.edges[node].items():
+                ng = g + cost
+                if ng < best.get(neighbor, float("inf")):
+                    best[neighbor] = ng
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (ng + heuristic(neighbor), ng, neighbor))
+
+        if goal is None or GOAL not in parent:
+            return None
+        return self._abstractChain(parent, parent[GOAL], start) + [goal]
+
+    @staticmethod
+    def _abstractChain(parent, node, start):
+        chain = [node]
+        while node != start:
+            node = parent[node]
+            chain.append(node)
+        return chain[::-1]
+
+    def _refine(self, chain):
+        """convierte una cadena de nodos abstractos en un camino de tiles."""
+        path = [chain[0]]
+        for a, b in zip(chain, chain[1:]):
+            if a == b:
+                continue
+            if b in self._neighborIds(*divmod(a, self.height)):
+                # cruce entre clusters o vecinos directos: un solo paso
+                path.append(b)
+                continue
+            # arista interna: ambos nodos están en el mismo cluster
+            found, parent = self._bfs(a, lambda c, b=b: c == b, self.clusterOf(a))
+            if found is None:
+                found, parent = self._bfs(a, lambda c, b=b: c == b)
+            path.extend(self._trace(parent, found)[1:])
+        return path
+
+    # jump point search
+
+    def _jump(self, x, y, dx, dy, goal):
+        """avanza en dirección (dx, dy) hasta encontrar un jump point, la meta o un obstáculo."""
+        while True:
+            x, y = x + dx, y + dy
+            if not self._free(x, y):
+                return None
+            if self._id(x, y) == goal:
+                return x, y
+            if dx and dy:
+                if ((not self._free(x - dx, y) and self._free(x - dx, y + dy))
+                        or (not self._free(x, y - dy) and self._free(x + dx, y - dy))):
+                    return x, y
+                if self._jump(x, y, dx, 0, goal) or self._jump(x, y, 0, dy, goal):
+                    return x, y
+            elif dx:
+                if ((not self._free(x, y + 1) and self._free(x + dx, y + 1))
+                        or (not self._free(x, y - 1) and self._free(x + dx, y - 1))):
+                    return x, y
+            else:
+                if ((not self._free(x + 1, y) and self._free(x + 1, y + dy))
+                        or (not self._free(x - 1, y) and self._free(x - 1, y + dy))):
+                    return x, y
+
+    def _prunedDirections(self, x, y, dx, dy):
+        """direcciones a explorar desde (x, y) llegando con dirección (dx, dy)."""
+        if dx == 0 and dy == 0:
+            return DIRECTIONS
+        directions = []
+        if dx and dy:
+            directions = [(dx, 0), (0, dy), (dx, dy)]
+            if not self._free(x - dx, y):
+                directions.append((-dx, dy))
+            if not self._free(x, y - dy):
+                directions.append((dx, -dy))
+        elif dx:
+            directions = [(dx, 0)]
+            if not self._free(x, y + 1):
+                directions.append((dx, 1))
+            if not self._free(x, y - 1):
+                directions.append((dx, -1))
+        else:
+            directions = [(0, dy)]
+            if not self._free(x + 1, y):
+                directions.append((1, dy))
+            if not self._free(x - 1, y):
+                directions.append((-1, dy))
+        return directions
+
+    def _jpsSearch(self, start, goal):
+        """A* con jump points; retorna el camino de tiles o None."""
+        gx, gy = divmod(goal, self.height)
+
+        # cada movimiento (recto o diagonal) cuesta un paso y una unidad de batería,
+        # así que g y h usan distancia de Chebyshev y no octile
+        def chebyshev(x, y):
+            return max(abs(x - gx), abs(y - gy))
+
+        sx, sy = divmod(start, self.height)
+        best = {start: 0}
+        parent = {start: None}
+        heap = [(chebyshev(sx, sy), 0, start)]
+        closed = set()
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if node == goal:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+            x, y = divmod(node, self.height)
+            if parent[node] is None:
+                dx = dy = 0
+            else:
+                px, py = divmod(parent[node], self.height)
+                dx, dy = (x > px) - (x < px), (y > py) - (y < py)
+            for ddx, ddy in self._prunedDirections(x, y, dx, dy):
+                point = self._jump(x, y, ddx, ddy, goal)
+                if point is None:
+                    continue
+                jx, jy = point
+                jumpId = self._id(jx, jy)
+                ng = g + max(abs(jx - x), abs(jy - y))
+                if ng < best.get(jumpId, float("inf")):
+                    best[jumpId] = ng
+                    parent[jumpId] = node
+                    heapq.heappush(heap, (ng + chebyshev(jx, jy), ng, jumpId))
+
+        if goal not in parent:
+            return None
+
+        # expande los jump points a tiles consecutivas (tramos rectos o diagonales)
+        points = self._trace(parent, goal)
+        path = [points[0]]
+        for a, b in zip(points, points[1:]):
+            ax, ay = divmod(a, self.height)
+            bx, by = divmod(b, self.height)
+            dx, dy = (bx > ax) - (bx < ax), (by > ay) - (by < ay)
+            while (ax, ay) != (bx, by):
+                ax, ay = ax + dx, ay + dy
+                path.append(self._id(ax, ay))
+        return path
+
+    # interfaz para los agentes
+
+    def findPath(self, startCell, goalCell):
+        """
+        busca un camino entre dos tiles.
+        retorna: lista de tiles (incluye inicio y meta) o None si no hay camino
+        """
+        start = self._id(*startCell.coordinate)
+        goal = self._id(*goalCell.coordinate)
+        path = self._findPathIds(start, goal)
+        return [self.cellsById[c] for c in path] if path else None
+
+    def _findPathIds(self, start, goal):
+        if start == goal:
+            return [start]
+        if self.blocked[goal]:
+            return None
+
+        path = None
+        if self.mode == "jps":
+            path = self._jpsSearch(start, goal)
+        else:
+            cluster = self.clusterOf(start)
+            if cluster == self.clusterOf(goal):
+                found, parent = self._bfs(start, lambda c: c == goal, cluster)
+                if found is not None:
+                    path = self._trace(parent, found)
+            if path is None:
+                chain = self._abstractSearch(start, goal)
+                if chain is not None:
+                    path = self._refine(chain)
+
+        if path is None:
+            # respaldo: BFS plano (completo)
+            found, parent = self._bfs(start, lambda c: c == goal)
+            path = self._trace(parent, found) if found is not None else None
+        return path
+
+    def nextStep(self, cell, goalCell):
+        """
+        retorna la siguiente tile del camino hacia goalCell (o None si no hay camino).
+        los caminos calculados se guardan, así las consultas siguientes sobre el mismo
+        camino son O(1).
+        """
+        start = self._id(*cell.coordinate)
+        goal = self._id(*goalCell.coordinate)
+        steps = self._nextTowards.get(goal)
+        if steps is not None and start in steps:
+            return self.cellsById[steps[start]]
+
+        path = self._findPathIds(start, goal)
+        if not path or len(path) < 2:
+            return None
+
+        if steps is None:
+            if len(self._nextTowards) >= self.MAX_CACHED_GOALS:
+                self._nextTowards.clear()
+            steps = self._nextTowards[goal] = {}
+        for a, b in zip(path, path[1:]):
+            steps[a] = b
+        return self.cellsById[path[1]]
+
+    def freeCellsPerCluster(self, mask=None):
+        """
+        cuenta por cluster las tiles libres (opcionalmente solo donde mask es 1).
+        parámetros:
+            mask: bytes/bytearray por id de tile, por ejemplo tiles alcanzables
+        retorna: array('i') con un conteo por cluster
+        """
+        free = np.frombuffer(bytes(self.blocked), dtype=np.uint8) == 0
+        if mask is not None:
+            free &= np.frombuffer(bytes(mask), dtype=np.uint8) != 0
+        ids = np.flatnonzero(free)
+        xs, ys = np.divmod(ids, self.height)
+        clusters = (xs // self.clusterSize) * self.clustersY + ys // self.clusterSize
+        numClusters = -(-self.width // self.clusterSize) * self.clustersY
+        return array("i", np.bincount(clusters, minlength=numClusters).tolist())
+
+    def findNearest(self, startCell, isTarget, clusterHasTarget):
+        """
+        busca un camino a la tile objetivo más cercana (aproximada) sin recorrer todo el grid.
+        revisa primero el cluster propio y luego los clusters en orden de distancia por el
+        grafo abstracto, saltando los que clusterHasTarget(cluster) indica que no tienen objetivos.
+        solo disponible en modo "hpa".
+        parámetros:
+            startCell: tile de inicio
+            isTarget: función(id de tile) -> bool
+            clusterHasTarget: función(índice de cluster) -> bool
+        retorna: lista de tiles hasta el objetivo o None
+        """
+        start = self._id(*startCell.coordinate)
+        startCluster = self.clusterOf(start)
+
+        if clusterHasTarget(startCluster):
+            found, parent = self._bfs(start, isTarget, startCluster)
+            if found is not None:
+                return [self.cellsById[c] for c in self._trace(parent, found)]
+
+        def onSettle(node, chainTo):
+            cluster = self.clusterOf(node)
+            if not clusterHasTarget(cluster):
+                return None
+            found, parent = self._bfs(node, isTarget, cluster)
+            if found is None:
+                return None
+            path = self._refine(chainTo()) + self._trace(parent, found)[1:]
+            return [self.cellsById[c] for c in path]
+
+        return self._abstractSearch(start, onSettle=onSettle)
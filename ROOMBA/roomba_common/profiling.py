@@ -0,0 +1,188 @@
+# simulaciones 1 y 2: medición de tiempos por paso, por fase y por estado del roomba
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import json
+from time import perf_counter_ns
+
+
+# cubetas del histograma: la cubeta k junta duraciones en [2^(k-1), 2^k) microsegundos
+NUM_BUCKETS = 32
+
+
+class Timing:
+    """acumula conteo, total, máximo e histograma log2 de duraciones en O(1) por muestra."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0  # nanosegundos
+        self.max = 0
+        self.buckets = [0] * NUM_BUCKETS
+
+    def add(self, duration):
+        """agrega una duración en nanosegundos."""
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[min((duration // 1000).bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def summary(self):
+        """retorna las estadísticas en microsegundos y el histograma con etiquetas."""
+        histogram = {}
+        for k, count in enumerate(self.buckets):
+            if count:
+                histogram[f"<{2 ** k}us"] = count
+        return {
+            "count": self.count,
+            "totalMs": self.total / 1e6,
+            "meanUs": self.total / self.count / 1e3 if self.count else 0.0,
+            "maxUs": self.max / 1e3,
+            "histogram": histogram,
+        }
+
+
+class TickProfiler:
+    """
+    mide el tiempo de cada fase de RandomModel.step, el tiempo de step de los roombas
+    por estado de su máquina de estados y cuántas veces se llaman sus funciones auxiliares.
+    solo se activa con model.enableProfiling(); sin él el modelo no hace ninguna medición.
+    """
+
+    # funciones auxiliares de los roombas que se cuentan (si el agente las tiene);
+    # _getSafeNeighbors es la consulta al grafo de navegación que hace cada movimiento
+    HELPERS = ("_getSafeNeighbors", "_findDirtyNeighbor", "_NearbyRoombas", "_findUnvisited")
+
+    def __init__(self, trace=False, maxEvents=1_000_000):
+        """
+        crea el medidor.
+        parámetros:
+            trace: si es True además guarda cada evento para exportar una traza
+            maxEvents: máximo de eventos de traza que se guardan
+        """
+        self.trace = trace
+        self.maxEvents = maxEvents
+        self.phases = {}  # fase -> Timing
+        self.branches = {}  # estado del roomba -> Timing
+        self.calls = {}  # función auxiliar -> número de llamadas
+        self.ticks = 0
+        self.tickTime = 0  # nanosegundos sumados de todos los pasos medidos
+        self.events = []
+        self._origin = perf_counter_ns()
+        self._tickStart = 0
+        self._last = 0
+        self._agents = []
+
+    def attach(self, model):
+        """envuelve step y las funciones auxiliares de cada roomba (solo en la instancia)."""
+        for agent in model.activeAgents:
+            agent.step = self._timedStep(agent, agent.step)
+            for name in self.HELPERS:
+                if hasattr(agent, name):
+                    self.calls.setdefault(name, 0)
+                    setattr(agent, name, self._countedCall(name, getattr(agent, name)))
+            self._agents.append(agent)
+
+    def detach(self):
+        """quita los envoltorios: los roombas vuelven a usar los métodos de su clase."""
+        for agent in self._agents:
+            for name in ("step",) + self.HELPERS:
+                agent.__dict__.pop(name, None)
+        self._agents = []
+
+    def _timedStep(self, agent, step):
+        def timedStep():
+            state = agent.state  # rama de la máquina de estados que se va a ejecutar
+            start = perf_counter_ns()
+            step()
+            self._record(self.branches, f"agent:{state}", perf_counter_ns() - start, start)
+        return timedStep
+
+    def _countedCall(self, name, method):
+        calls = self.calls
+
+        def countedCall(*args, **kwargs):
+            calls[name] += 1
+            return method(*args, **kwargs)
+        return countedCall
+
+    def _record(self, table, name, duration, start):
+        timing = table.get(name)
+        if timing is None:
+            timing = table[name] = Timing()
+        timing.add(duration)
+        if self.trace and len(self.events) < self.maxEvents:
+            self.events.append((name, start, duration))
+
+    def startTick(self):
+        """marca el inicio de un paso del modelo."""
+        self._tickStart = self._last = perf_counter_ns()
+
+    def mark(self, phase):
+        """cierra la fase actual del paso con el nombre dado."""
+        now = perf_counter_ns()
+        self._record(self.phases, phase, now - self._last, self._last)
+        self._last = now
+
+    def endTick(self):
+        """marca el final del paso."""
+        duration = perf_counter_ns() - self._tickStart
+        self.ticks += 1
+        self.tickTime += duration
+        self._record(self.phases, "tick", duration, self._tickStart)
+
+    @property
+    def ticksPerSecond(self):
+        """pasos por segundo considerando solo el tiempo dentro de step."""
+        return self.ticks / (self.tickTime / 1e9) if self.tickTime else 0.0
+
+    def summary(self):
+        """
+        resume las mediciones.
+        retorna: diccionario con ticks, ticksPerSecond, fases, ramas por estado y llamadas
+        """
+        return {
+            "ticks": self.ticks,
+            "ticksPerSecond": self.ticksPerSecond,
+            "phases": {name: timing.summary() for name, timing in self.phases.items()},
+            "branches": {name: timing.summary() for name, timing in sorted(self.branches.items())},
+            "calls": dict(self.calls),
+        }
+
+    def formatSummary(self):
+        """retorna el resumen como texto con un histograma por fase y por estado."""
+        lines = [f"ticks: {self.ticks}  ticks/s: {self.ticksPerSecond:,.1f}"]
+        for title, table in (("fases", self.phases), ("estados", dict(sorted(self.branches.items())))):
+            lines.append(f"{title}:")
+            for name, timing in table.items():
+                data = timing.summary()
+                lines.append(f"  {name:<24} n={data['count']:<8} total={data['totalMs']:10.2f}ms "
+                             f"media={data['meanUs']:9.2f}us max={data['maxUs']:9.2f}us")
+                peak = max(data["histogram"].values())
+                for bucket, count in data["histogram"].items():
+                    lines.append(f"    {bucket:>10} {'#' * max(1, round(30 * count / peak))} {count}")
+        if self.calls:
+            lines.append("llamadas:")
+            for name, count in self.calls.items():
+                lines.append(f"  {name:<24} {count}")
+        return "\n".join(lines)
+
+    def writeSummary(self, path):
+        """guarda el resumen en un archivo json."""
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def writeTrace(self, path):
+        """
+        guarda los eventos en formato de traza de chrome (chrome://tracing o perfetto).
+        requiere haber creado el medidor con trace=True.
+        """
+        events = [
+            {"name": name, "ph": "X", "pid": 0, "tid": 1 if name.startswith("agent:") else 0,
+             "ts": (start - self._origin) / 1e3, "dur": duration / 1e3}
+            for name, start, duration in self.events
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
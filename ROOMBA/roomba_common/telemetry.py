@@ -0,0 +1,117 @@
+# simulaciones 1 y 2: telemetría de transiciones de estado de los roombas
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import numpy as np
+
+
+# estados de la máquina de estados de los roombas; su índice es el código que guardan
+# la telemetría, los snapshots y la bitácora de repetición
+STATES = ("exploring", "cleaning", "moving_to_dirt", "moving_to_charge", "charging")
+
+# cubetas del histograma de tiempo en estado: la cubeta k junta permanencias en [2^(k-1), 2^k) ticks
+NUM_DWELL_BUCKETS = 24
+# cubetas de batería al cambiar de estado: 0-9, 10-19, ..., 90-99, 100
+NUM_BATTERY_BUCKETS = 11
+
+
+class StateTelemetry:
+    """
+    registra cada cambio de estado de los roombas (aunque pase a mitad de un paso) en un
+    buffer circular compacto y agrega en O(1) por evento: conteos de transiciones,
+    histogramas de tiempo en cada estado y de batería al momento de la transición.
+    """
+
+    def __init__(self, model, capacity=65536):
+        """
+        crea la telemetría y toma el estado actual de los roombas como punto de partida.
+        parámetros:
+            model: RandomModel observado
+            capacity: número de transiciones recientes que guarda el buffer circular
+        """
+        self.model = model
+        self.capacity = capacity
+        numStates = len(STATES)
+        self._stateIndex = {state: idx for idx, state in enumerate(STATES)}
+
+        # buffer circular: columnas tick, agente, estado anterior, estado nuevo y batería
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.agentIds = np.zeros(capacity, dtype=np.int32)
+        self.fromStates = np.zeros(capacity, dtype=np.int8)
+        self.toStates = np.zeros(capacity, dtype=np.int8)
+        self.batteries = np.zeros(capacity, dtype=np.int16)
+        self.numEvents = 0  # transiciones registradas en total (pueden ser más que capacity)
+
+        # agregados
+        self.transitionCounts = np.zeros((numStates, numStates), dtype=np.int64)
+        self.dwellHistogram = np.zeros((numStates, NUM_DWELL_BUCKETS), dtype=np.int64)
+        self.dwellTotal = np.zeros(numStates, dtype=np.int64)  # ticks acumulados por estado
+        self.batteryHistogram = np.zeros((numStates, numStates, NUM_BATTERY_BUCKETS), dtype=np.int64)
+
+        self._enteredAt = {self._key(a): model.steps for a in model.activeAgents}
+
+    @staticmethod
+    def _key(agent):
+        return getattr(agent, "agentId", agent.unique_id)
+
+    def record(self, agent, oldState, newState):
+        """registra la transición de un roomba (lo llama el setter de RandomAgent.state)."""
+        tick = self.model.steps
+        key = self._key(agent)
+        old, new = self._stateIndex[oldState], self._stateIndex[newState]
+        battery = agent.battery
+
+        slot = self.numEvents % self.capacity
+        self.ticks[slot] = tick
+        self.agentIds[slot] = key
+        self.fromStates[slot] = old
+        self.toStates[slot] = new
+        self.batteries[slot] = battery
+        self.numEvents += 1
+
+        dwell = tick - self._enteredAt.get(key, tick)
+        self._enteredAt[key] = tick
+        self.transitionCounts[old, new] += 1
+        self.dwellTotal[old] += dwell
+        self.dwellHistogram[old, min(dwell.bit_length(), NUM_DWELL_BUCKETS - 1)] += 1
+        self.batteryHistogram[old, new, min(battery // 10, NUM_BATTERY_BUCKETS - 1)] += 1
+
+    def transitions(self):
+        """
+        retorna las transiciones guardadas (las últimas capacity) en orden cronológico.
+        retorna: lista de diccionarios con tick, agentId, fromState, toState y battery
+        """
+        count = min(self.numEvents, self.capacity)
+        order = (np.arange(count) + self.numEvents - count) % self.capacity
+        return [
+            {"tick": int(self.ticks[i]), "agentId": int(self.agentIds[i]),
+             "fromState": STATES[self.fromStates[i]], "toState": STATES[self.toStates[i]],
+             "battery": int(self.batteries[i])}
+            for i in order
+        ]
+
+    def summary(self):
+        """
+        resume la telemetría.
+        retorna: diccionario con conteos por transición, tiempo en estado y batería al cambiar
+        """
+        transitions = {}
+        for old, new in zip(*np.nonzero(self.transitionCounts)):
+            name = f"{STATES[old]}->{STATES[new]}"
+            transitions[name] = {
+                "count": int(self.transitionCounts[old, new]),
+                "battery": {f"{10 * b}-{min(10 * b + 9, 100)}": int(n)
+                            for b, n in enumerate(self.batteryHistogram[old, new]) if n},
+            }
+
+        timeInState = {}
+        for idx, state in enumerate(STATES):
+            exits = int(self.dwellHistogram[idx].sum())
+            if exits:
+                timeInState[state] = {
+                    "exits": exits,
+                    "meanTicks": float(self.dwellTotal[idx]) / exits,
+                    "histogram": {f"<{2 ** k}": int(n) for k, n in enumerate(self.dwellHistogram[idx]) if n},
+                }
+
+        return {"events": self.numEvents, "transitions": transitions, "timeInState": timeInState}
@@ -0,0 +1,191 @@
+# simulaciones 1 y 2: plantillas de mapa compartidas entre corridas (y procesos) de un barrido
+# autor: Luis Emilio Veledíaz Flores - A01029829
+# fecha: 19 de Noviembre de 2025
+
+import weakref
+from array import array
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .floorplan import FloorPlan
+
+
+# capas que se guardan en memoria compartida: nombre -> dtype
+LAYERS = {
+    "blocked": np.bool_,
+    "dirt": np.bool_,
+    "navIndptr": np.int32,
+    "navIndices": np.int32,
+    "reachableCells": np.uint8,
+}
+
+
+class MapTemplate(FloorPlan):
+    """
+    arreglos de un mapa, de solo lectura, compartidos por las corridas de un barrido:
+    capas del plano, grafo de navegación (CSR) y tiles alcanzables. cada
+    RandomModel(floorPlan=template) lee estos arreglos sin copiarlos (con share/attach,
+    una sola copia para todos los procesos), así que todas las corridas usan el mismo mapa.
+
+    la plantilla comparte memoria, no tiempo de construcción: cada corrida crea su propio
+    grid de mesa, sus vecinos por tile y un DirtCell por tile sucia, y eso es casi todo el
+    costo de construir un modelo, con o sin plantilla.
+    """
+
+    def __init__(self, blocked, dirt, chargers, navIndptr, navIndices, reachableCells, source=None):
+        """
+        crea la plantilla a partir de sus capas.
+        parámetros:
+            blocked, dirt, chargers, source: igual que en FloorPlan
+            navIndptr, navIndices: grafo de navegación en formato CSR (int32)
+            reachableCells: 1 por tile alcanzable desde los cargadores (uint8, por id)
+        """
+        super().__init__(blocked, dirt, chargers, source)
+        self.navIndptr = navIndptr
+        self.navIndices = navIndices
+        self.reachableCells = reachableCells
+        self._segments = []  # bloques de memoria compartida abiertos por esta plantilla
+        self._users = weakref.WeakSet()  # modelos que leen las capas sin copiarlas
+
+        # las capas compartidas son de solo lectura en todas las corridas
+        for name in LAYERS:
+            getattr(self, name).flags.writeable = False
+
+    @classmethod
+    def fromModel(cls, model):
+        """
+        captura la plantilla del mundo de un modelo ya construido.
+        parámetros:
+            model: RandomModel recién creado (de cualquiera de las dos simulaciones)
+        retorna: MapTemplate
+        """
+        blocked = np.frombuffer(bytes(model.navBlocked), dtype=bool).reshape(model.width, model.height).copy()
+        dirt, chargers = model.mapLayers()
+        return cls(
+            blocked, dirt, chargers,
+            np.array(model.navIndptr, dtype=np.int32),
+            np.array(model.navIndices, dtype=np.int32),
+            np.frombuffer(bytes(model.reachableCells), dtype=np.uint8).copy(),
+            source=model.floorPlan.source if model.floorPlan is not None else None,
+        )
+
+    @classmethod
+    def build(cls, modelClass, **params):
+        """
+        construye un modelo con los parámetros dados y captura su mapa.
+        parámetros:
+            modelClass: RandomModel de la simulación que usará la plantilla
+            params: parámetros del constructor de modelClass
+        retorna: MapTemplate
+        """
+        return cls.fromModel(modelClass(**params))
+
+    def share(self):
+        """
+        copia las capas a memoria compartida para que otros procesos las usen sin copiarlas.
+        retorna: diccionario (serializable con pickle) para MapTemplate.attach
+        """
+        handle = {"chargers": self.chargers, "source": self.source, "layers": {}}
+        for name, dtype in LAYERS.items():
+            array = getattr(self, name)
+            segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            shared = np.ndarray(array.shape, dtype=dtype, buffer=segment.buf)
+            shared[...] = array
+            shared.flags.writeable = False
+            setattr(self, name, shared)
+            self._segments.append(segment)
+            handle["layers"][name] = (segment.name, array.shape)
+        return handle
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        abre en este proceso una plantilla compartida con share().
+        parámetros:
+            handle: diccionario retornado por share()
+        retorna: MapTemplate sobre la misma memoria (sin copias)
+        """
+        segments = []
+        layers = {}
+        for name, dtype in LAYERS.items():
+            segmentName, shape = handle["layers"][name]
+            segment = shared_memory.SharedMemory(name=segmentName)
+            segments.append(segment)
+            layers[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+        template = cls.__new__(cls)
+        template.blocked = layers["blocked"]
+        template.dirt = layers["dirt"]
+        template.chargers = [tuple(c) for c in handle["chargers"]]
+        template.source = handle["source"]
+        template.navIndptr = layers["navIndptr"]
+        template.navIndices = layers["navIndices"]
+        template.reachableCells = layers["reachableCells"]
+        template._segments = segments
+        template._users = weakref.WeakSet()
+        for name in LAYERS:
+            getattr(template, name).flags.writeable = False
+        return template
+
+    def navigationViews(self, model):
+        """
+        retorna las capas de navegación para un modelo sin copiarlas y lo anota como usuario
+        de la plantilla (close() le da copias propias antes de cerrar la memoria compartida).
+        parámetros:
+            model: RandomModel que se construye con esta plantilla
+        retorna: (navBlocked, navIndptr, navIndices) como memoryview de solo lectura
+        """
+        self._users.add(model)
+        return (memoryview(self.blocked.view(np.uint8).reshape(-1)),
+                memoryview(self.navIndptr), memoryview(self.navIndices))
+
+    def reachableView(self, model):
+        """retorna reachableCells como memoryview de solo lectura y anota al modelo como usuario."""
+        self._users.add(model)
+        return memoryview(self.reachableCells)
+
+    @staticmethod
+    def detach(model):
+        """
+        cambia las capas que el modelo lee de la plantilla por copias propias.
+        parámetros:
+            model: RandomModel creado con floorPlan=plantilla
+        """
+        if isinstance(model.navBlocked, memoryview):
+            model.navBlocked = bytearray(model.navBlocked)
+        for name in ("navIndptr", "navIndices"):
+            view = getattr(model, name)
+            if isinstance(view, memoryview):
+                copy = array("i")
+                copy.frombytes(view.tobytes())
+                setattr(model, name, copy)
+        if isinstance(getattr(model, "reachableCells", None), memoryview):
+            model.reachableCells = bytearray(model.reachableCells)
+        if getattr(model, "planner", None) is not None:
+            model.planner.blocked = model.navBlocked
+            model.planner.indptr = model.navIndptr
+            model.planner.indices = model.navIndices
+
+    def close(self, unlink=False):
+        """
+        cierra la memoria compartida de este proceso. los modelos construidos con la
+        plantilla reciben antes copias propias de las capas, así que pueden seguir
+        corriendo; cualquier otra vista que se haya sacado a mano de las capas compartidas
+        (np.asarray, memoryview) debe soltarse antes de llamar close().
+        parámetros:
+            unlink: si es True además la libera (solo el proceso que llamó share())
+        """
+        if self._segments:
+            for model in list(self._users):
+                self.detach(model)
+        self._users = weakref.WeakSet()
+        for name, dtype in LAYERS.items():
+            # deja copias locales para que la plantilla siga siendo usable
+            setattr(self, name, np.array(getattr(self, name), dtype=dtype))
+            getattr(self, name).flags.writeable = False
+        for segment in self._segments:
+            segment.close()
+            if unlink:
+                segment.unlink()
+        self._segments = []
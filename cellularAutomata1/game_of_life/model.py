@@ -1,16 +1,199 @@
+import random
+from functools import lru_cache
+
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
 from .agent import Cell
+from .sparse import SparseRows
+from .stats import RowStats
+
+
+# RULE_SET como tabla: el índice es el patrón "abc" leído como número binario
+RULE_TABLE = np.array(
+    [Cell.RULE_SET[f"{pattern:03b}"] for pattern in range(8)], dtype=np.uint8
+)
+
+
+def random_row(width, initial_fraction_alive, rng):
+    """Return the random top row, drawing one number per cell from left to right."""
+    # mismos sorteos, en el mismo orden (por x), que al crear las celdas una por una
+    return [
+        Cell.ALIVE if rng.random() < initial_fraction_alive else Cell.DEAD
+        for _ in range(width)
+    ]
+
+
+def compute_diagram(width, height, top_row):
+    """Compute the whole space-time diagram in one pass.
+
+    Every row below the top one is computed from the three cells above it
+    (on a torus), one whole row at a time.
+
+    Args:
+        width, height: size of the grid
+        top_row: states of the top row
+
+    Returns:
+        (width, height) array with the final state of every cell
+    """
+    diagram = np.zeros((width, height), dtype=np.uint8)
+    diagram[:, height - 1] = top_row
+
+    # cada fila sale de la de arriba: patrón = 4 * izquierda + 2 * centro + derecha
+    for y in range(height - 2, -1, -1):
+        above = diagram[:, y + 1]
+        pattern = 4 * np.roll(above, 1) + 2 * above + np.roll(above, -1)
+        diagram[:, y] = RULE_TABLE[pattern]
+    return diagram
+
+
+@lru_cache(maxsize=32)
+def cached_diagram(width, height, initial_fraction_alive, seed):
+    """Return the (read-only) diagram for a set of parameters, computing it only once."""
+    top_row = random_row(width, initial_fraction_alive, random.Random(seed))
+    diagram = compute_diagram(width, height, top_row)
+    diagram.flags.writeable = False  # compartido entre modelos: no se debe modificar
+    return diagram
 
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(
+        self,
+        width=50,
+        height=50,
+        initial_fraction_alive=0.2,
+        seed=None,
+        engine="dense",
+        initial_cells=None,
+        stats=False,
+    ):
+        """Create a new playing area of (width, height) cells.
+
+        engine "dense" precomputes the whole diagram as an array; "sparse" only keeps
+        the live cells of the rows revealed so far, so width and height can be huge.
+        initial_cells (x positions of the live cells of the top row) replaces the
+        random top row. stats adds a RowStats stage that follows the revealed rows
+        (see add_stats).
+        """
         super().__init__(seed=seed)
+        self.width = width
+        self.height = height
+        self.engine = engine
 
-        """Grid where cells are connected to their 8 neighbors.
+        # la fila que ya fue actualizada (height - 1 = fila superior)
+        self.current_row = height - 1
+
+        if engine == "dense":
+            # el diagrama completo se calcula al inicio (o sale del cache si ya se calculó
+            # con los mismos parámetros); step solo va revelando sus filas
+            if initial_cells is not None:
+                top_row = np.zeros(width, dtype=np.uint8)
+                top_row[[x % width for x in initial_cells]] = Cell.ALIVE
+                self.diagram = compute_diagram(width, height, top_row)
+            elif seed is None:
+                top_row = random_row(width, initial_fraction_alive, self.random)
+                self.diagram = compute_diagram(width, height, top_row)
+            else:
+                self.diagram = cached_diagram(width, height, initial_fraction_alive, seed)
+
+            # estados revelados como arreglo (width, height) para dibujar el grid como
+            # una imagen; row_versions[y] aumenta cada vez que cambia la fila y
+            self._states = np.zeros((width, height), dtype=np.uint8)
+            self._states[:, self.current_row] = self.diagram[:, self.current_row]
+            self._row_versions = np.zeros(height, dtype=np.int64)
+        elif engine == "sparse":
+            self.sparse_rows = SparseRows(width, RULE_TABLE)
+            if initial_cells is None:
+                top_row = random_row(width, initial_fraction_alive, self.random)
+                initial_cells = [x for x, state in enumerate(top_row) if state == Cell.ALIVE]
+            # filas reveladas: y -> posiciones x de sus celdas vivas
+            self.live_rows = {self.current_row: {x % width for x in initial_cells}}
+        else:
+            raise ValueError(f"engine must be 'dense' or 'sparse', got {engine!r}")
+
+        # el grid y los agentes Cell se crean hasta que alguien los usa (ver cell_grid)
+        self._grid = None
+        self._cell_grid = None
+
+        # etapas de estadísticas: reciben cada fila nueva (ver add_stats)
+        self.stats = []
+        if stats:
+            self.add_stats(RowStats(width))
+
+        self.running = True
+
+    def add_stats(self, stage):
+        """Feed every revealed row, and then each new one, to a statistics stage.
+
+        Args:
+            stage: object with add_row(row), which receives the 0/1 states of the row
+                with the dense engine, and add_live_row(live), which receives the x
+                positions of its live cells with the sparse engine (like RowStats)
+
+        Returns:
+            the stage
+        """
+        self.stats.append(stage)
+        # filas ya reveladas, de arriba hacia abajo
+        for y in range(self.height - 1, self.current_row - 1, -1):
+            self._feed_stats(stage, y)
+        return stage
+
+    def _feed_stats(self, stage, y):
+        """Give row y to a statistics stage."""
+        if self.engine == "dense":
+            stage.add_row(self._states[:, y])
+        else:
+            stage.add_live_row(self.live_rows[y])
+
+    @property
+    def states(self):
+        """(width, height) array with the state of every revealed cell."""
+        if self.engine == "dense":
+            return self._states
+        # motor disperso: se arma solo cuando se pide (por ejemplo para dibujar)
+        states = np.zeros((self.width, self.height), dtype=np.uint8)
+        for y, live in self.live_rows.items():
+            states[list(live), y] = Cell.ALIVE
+        return states
+
+    @property
+    def row_versions(self):
+        """Number of times each row changed: 1 for the revealed rows below the top one."""
+        if self.engine == "dense":
+            return self._row_versions
+        versions = np.zeros(self.height, dtype=np.int64)
+        versions[self.current_row:self.height - 1] = 1
+        return versions
+
+    def rows(self, ys):
+        """(width, len(ys)) array with the states of rows ys, without building the whole grid."""
+        if self.engine == "dense":
+            return self._states[:, ys]
+        states = np.zeros((self.width, len(ys)), dtype=np.uint8)
+        for column, y in enumerate(ys):
+            states[list(self.live_rows.get(int(y), ())), column] = Cell.ALIVE
+        return states
+
+    @property
+    def grid(self):
+        """Grid where cells are connected to their 8 neighbors (created on first use)."""
+        if self._grid is None:
+            self._build_cells()
+        return self._grid
+
+    @property
+    def cell_grid(self):
+        """Cell agents by position (created on first use)."""
+        if self._cell_grid is None:
+            self._build_cells()
+        return self._cell_grid
+
+    def _build_cells(self):
+        """Create the grid and one Cell agent per position with its current state.
 
         Example for two dimensions:
         directions = [
@@ -19,74 +202,53 @@ class ConwaysGameOfLife(Model):
             ( 1, -1), ( 1, 0), ( 1, 1),
         ]
         """
-        self.grid = OrthogonalMooreGrid((width, height), capacity=1, torus=True)
+        states = self.states
+        self._grid = OrthogonalMooreGrid((self.width, self.height), capacity=1, torus=True)
         # referencia a los agentes por posición
-        self.cell_grid = {}
-
-        # la fila que ya fue actualizada (height - 1 = fila superior)
-        self.current_row = height - 1
+        self._cell_grid = {}
 
-        # inicializar todas las celdas
-        for cell in self.grid.all_cells:
+        for cell in self._grid.all_cells:
             x, y = cell.coordinate
-            if y == 49:
-                initial_state = (
-                    Cell.ALIVE
-                    if self.random.random() < initial_fraction_alive
-                    else Cell.DEAD
-                )
-            else:
-                initial_state = Cell.DEAD
-
-            agent = Cell(self, cell, init_state=initial_state)
-            self.cell_grid[(x, y)] = agent
-
-        self.running = True
+            agent = Cell(self, cell, init_state=int(states[x, y]))
+            self._cell_grid[(x, y)] = agent
 
     def step(self):
-        """Goes one row down for each step. Each step updates the next row based on the
-        top three cells and according to the rules of the exercise.
-        
+        """Goes one row down for each step. Each step reveals the next row, which
+        follows the top three cells and the rules of the exercise: it is read from the
+        precomputed diagram, or computed from the live cells above with the sparse
+        engine.
+
         Stops when the row is zero.
         """
-        width = self.grid.width
-
         # si ya actualizamos hasta la última fila (fila 0), detenemos
         if self.current_row <= 0:
             self.running = False
             return
 
-        # define la fila actual y la que sigue
-        prev_row = self.current_row
-        next_row = prev_row - 1
-
-        # para cada columna calculamos el estado de la celda en la fila siguiente
-        for x in range(width):
-            # los 3 vecinos en la fila superior
-            left_pos = ((x - 1) % width, prev_row)
-            center_pos = (x, prev_row)
-            right_pos = ((x + 1) % width, prev_row)
-
-            # obtener los agentes en esas posicionesntes
-            left_agent = self.cell_grid[left_pos]
-            center_agent = self.cell_grid[center_pos]
-            right_agent = self.cell_grid[right_pos]
-
-            # obtener la celda que vamos a actualizar
-            next_pos = (x, next_row)
-            next_agent = self.cell_grid[next_pos]
-
-            # calcular siguiente estado (set_next_state de agent.py)
-            next_agent.set_next_state(
-                left_agent.state,
-                center_agent.state,
-                right_agent.state,
-            )
-
-        # aplicar los next_state para toda la fila
-        for x in range(width):
-            next_agent = self.cell_grid[(x, next_row)]
-            next_agent.assume_state()
+        # define la fila que sigue
+        next_row = self.current_row - 1
+
+        if self.engine == "dense":
+            row = self.diagram[:, next_row]
+            self._states[:, next_row] = row
+            self._row_versions[next_row] += 1
+
+            # si ya existen los agentes, también se les asigna su estado
+            if self._cell_grid is not None:
+                for x, state in enumerate(row.tolist()):
+                    self._cell_grid[(x, next_row)].state = state
+        else:
+            # solo se revisan las celdas junto a las vivas de la fila de arriba
+            live = self.sparse_rows.next_row(self.live_rows[self.current_row])
+            self.live_rows[next_row] = live
+
+            # las filas sin revelar están muertas: solo hay que avisar a las vivas
+            if self._cell_grid is not None:
+                for x in live:
+                    self._cell_grid[(x, next_row)].state = Cell.ALIVE
+
+        for stage in self.stats:
+            self._feed_stats(stage, next_row)
 
         # marcar que la fila ya fue actualizada para ir a la de abajo
         self.current_row = next_row
\ No newline at end of file
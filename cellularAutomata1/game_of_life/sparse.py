@@ -0,0 +1,39 @@
+class SparseRows:
+    """Row-by-row rule that only looks at the live cells of a row.
+
+    A row is a set with the x positions of its live cells. Only the cells next to
+    a live cell of the row above can become alive, so computing the next row costs
+    O(live cells) instead of O(width).
+    """
+
+    def __init__(self, width, rule_table):
+        """Create the engine for a torus of the given width.
+
+        Args:
+            width: number of columns (can be huge: nothing of size width is stored)
+            rule_table: next state for each pattern 4 * left + 2 * center + right
+        """
+        if rule_table[0]:
+            # con 000 -> vivo, las celdas lejos de toda celda viva también nacen
+            raise ValueError("rules where 000 becomes alive cannot be sparse")
+        self.width = width
+        self.rule_table = rule_table
+
+    def next_row(self, live):
+        """Return the live x positions of the row below a row with live positions `live`."""
+        width = self.width
+        rule_table = self.rule_table
+
+        # candidatas: solo las celdas debajo de una celda viva o de sus vecinas
+        candidates = {(x + dx) % width for x in live for dx in (-1, 0, 1)}
+
+        next_live = set()
+        for x in candidates:
+            pattern = (
+                4 * (((x - 1) % width) in live)
+                + 2 * (x in live)
+                + (((x + 1) % width) in live)
+            )
+            if rule_table[pattern]:
+                next_live.add(x)
+        return next_live
@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+
+class RowStats:
+    """Online statistics of the rows of a run, updated one row at a time.
+
+    Each new row costs O(width) (O(live cells) for a set of live positions) and only
+    the previous row is kept, so long runs can be classified without storing the
+    diagram. The statistics are the live density, the Shannon entropy of the 3-cell
+    blocks of each row, the frequency of each block and the autocorrelation between
+    cells `lag` positions apart in a row and between consecutive rows.
+
+    Any object with add_row and add_live_row methods can be used as a stage of
+    ConwaysGameOfLife (see ConwaysGameOfLife.add_stats).
+    """
+
+    def __init__(self, width, max_lag=4):
+        """Create empty statistics.
+
+        Args:
+            width: number of cells of each row (on a torus)
+            max_lag: largest distance between cells for the autocorrelation
+        """
+        self.width = width
+        self.max_lag = max_lag
+        self.rows = 0
+        self.live = 0  # celdas vivas en todas las filas
+        # block_counts[p]: bloques con patrón p = 4 * izquierda + 2 * centro + derecha
+        self.block_counts = np.zeros(8, dtype=np.int64)
+        # pair_counts[k - 1]: parejas de celdas vivas a distancia k en la misma fila
+        self.pair_counts = np.zeros(max_lag, dtype=np.int64)
+        self.vertical_pairs = 0  # celdas vivas con la celda de la fila anterior viva
+        self.row_density = 0.0
+        self.row_entropy = 0.0
+        self.entropy_sum = 0.0
+        self._previous = None
+
+    def add_row(self, row):
+        """Add a row given as an array of 0/1 states."""
+        row = np.array(row, dtype=np.int64)  # copia: se guarda como fila anterior
+        # patrón de cada celda con sus vecinas de fila (en un toro)
+        patterns = 4 * np.roll(row, 1) + 2 * row + np.roll(row, -1)
+        pairs = [int(np.dot(row, np.roll(row, -lag))) for lag in range(1, self.max_lag + 1)]
+        vertical = int(np.dot(row, self._previous)) if self._previous is not None else 0
+        self._record(int(row.sum()), np.bincount(patterns, minlength=8), pairs, vertical)
+        self._previous = row
+
+    def add_live_row(self, live):
+        """Add a row given as the set of x positions of its live cells."""
+        width = self.width
+        live = set(live)
+
+        # solo los bloques junto a una celda viva pueden ser distintos de 000
+        counts = np.zeros(8, dtype=np.int64)
+        for x in {(x + dx) % width for x in live for dx in (-1, 0, 1)}:
+            pattern = (
+                4 * (((x - 1) % width) in live)
+                + 2 * (x in live)
+                + (((x + 1) % width) in live)
+            )
+            counts[pattern] += 1
+        counts[0] += width - counts.sum()
+
+        pairs = [
+            sum((x + lag) % width in live for x in live)
+            for lag in range(1, self.max_lag + 1)
+        ]
+        vertical = len(live & self._previous) if self._previous is not None else 0
+        self._record(len(live), counts, pairs, vertical)
+        self._previous = live
+
+    def _record(self, live, block_counts, pairs, vertical):
+        """Accumulate the counts of a new row."""
+        self.rows += 1
+        self.live += live
+        self.block_counts += block_counts
+        self.pair_counts += pairs
+        self.vertical_pairs += vertical
+
+        self.row_density = live / self.width
+        self.row_entropy = sum(
+            -p * math.log2(p) for p in (block_counts / self.width).tolist() if p > 0
+        )
+        self.entropy_sum += self.row_entropy
+
+    @property
+    def density(self):
+        """Fraction of live cells over all the rows."""
+        return self.live / (self.rows * self.width) if self.rows else 0.0
+
+    @property
+    def mean_entropy(self):
+        """Mean block entropy of the rows, in bits (0 to 3)."""
+        return self.entropy_sum / self.rows if self.rows else 0.0
+
+    @property
+    def block_frequencies(self):
+        """Fraction of the blocks with each pattern 4 * left + 2 * center + right."""
+        total = self.block_counts.sum()
+        return self.block_counts / total if total else self.block_counts.astype(float)
+
+    def _correlation(self, pairs, count):
+        """Correlation of two cells from the number of live pairs out of count pairs."""
+        p = self.density
+        if count == 0 or p in (0.0, 1.0):
+            return math.nan  # sin variación la correlación no está definida
+        return (pairs / count - p * p) / (p - p * p)
+
+    def autocorrelation(self, lag):
+        """Correlation between cells lag positions apart in the same row."""
+        return self._correlation(int(self.pair_counts[lag - 1]), self.rows * self.width)
+
+    @property
+    def vertical_autocorrelation(self):
+        """Correlation between a cell and the cell at the same x in the previous row."""
+        return self._correlation(self.vertical_pairs, (self.rows - 1) * self.width)
+
+    def summary(self):
+        """Return the statistics as a dictionary."""
+        return {
+            "rows": self.rows,
+            "density": self.density,
+            "row_density": self.row_density,
+            "row_entropy": self.row_entropy,
+            "mean_entropy": self.mean_entropy,
+            "block_frequencies": {
+                f"{pattern:03b}": frequency
+                for pattern, frequency in enumerate(self.block_frequencies.tolist())
+            },
+            "autocorrelation": {
+                lag: self.autocorrelation(lag) for lag in range(1, self.max_lag + 1)
+            },
+            "vertical_autocorrelation": self.vertical_autocorrelation,
+        }
@@ -1,22 +1,8 @@
 from game_of_life.model import ConwaysGameOfLife
-from mesa.visualization import (
-    SolaraViz,
-    make_space_component, # dibuja el grid
-)
-
-from mesa.visualization.components import AgentPortrayalStyle
-
-def agent_portrayal(agent): 
-    return AgentPortrayalStyle(
-        color="white" if agent.state == 0 else "black",
-        marker="s",
-        size=30,
-    )
-
-def post_process(ax): # que no se vean los numeros de la gráfica
-    ax.set_aspect("equal")
-    ax.set_xticks([])
-    ax.set_yticks([])
+from game_of_life.raster import make_raster_component # dibuja el grid como una imagen
+import solara
+from mesa.visualization import SolaraViz
+from mesa.visualization.utils import update_counter
 
 model_params = {
     "seed": {
@@ -29,7 +15,7 @@ model_params = {
         "value": 50,
         "label": "Width",
         "min": 5,
-        "max": 60,
+        "max": 1000,
         "step": 1,
     },
     "height": {
@@ -37,9 +23,20 @@ model_params = {
         "value": 50,
         "label": "Height",
         "min": 5,
-        "max": 60,
+        "max": 1000,
         "step": 1,
     },
+    "engine": {
+        "type": "Select",
+        "value": "dense",
+        "values": ["dense", "sparse"],
+        "label": "Engine (sparse = only live cells)",
+    },
+    "stats": {
+        "type": "Checkbox",
+        "value": True,
+        "label": "Row statistics",
+    },
     "initial_fraction_alive": {
         "type": "SliderFloat",
         "value": 0.2,
@@ -50,18 +47,38 @@ model_params = {
     },
 }
 
+def stats_component(model):
+    """Show the online row statistics of the model (if it has any stage)."""
+    update_counter.get()  # se actualiza en cada paso del modelo
+    if not model.stats:
+        return solara.Text("Row statistics are off")
+    summary = model.stats[0].summary()
+    blocks = " ".join(f"{pattern}: {value:.3f}" for pattern, value in summary["block_frequencies"].items())
+    lags = " ".join(f"{lag}: {value:.3f}" for lag, value in summary["autocorrelation"].items())
+    return solara.Markdown(
+        f"**Rows:** {summary['rows']}  \n"
+        f"**Density:** {summary['density']:.3f} (last row {summary['row_density']:.3f})  \n"
+        f"**Block entropy:** {summary['mean_entropy']:.3f} bits (last row {summary['row_entropy']:.3f})  \n"
+        f"**Blocks:** {blocks}  \n"
+        f"**Autocorrelation by lag:** {lags}  \n"
+        f"**Between rows:** {summary['vertical_autocorrelation']:.3f}"
+    )
+
+
 # Create initial model instance
-gof_model = ConwaysGameOfLife()
+gof_model = ConwaysGameOfLife(stats=model_params["stats"]["value"])  # mismo valor que la casilla
 
-space_component = make_space_component(
-        agent_portrayal,
-        draw_grid = False,
-        post_process=post_process
-)
+# una sola imagen en lugar de un marcador por celda; solo se repintan las filas que cambiaron
+space_component = make_raster_component()
 
 page = SolaraViz(
     gof_model,
-    components=[space_component],
+    components=[space_component, stats_component],
     model_params=model_params,
     name="Game of Life",
+    # los controles de mesa corren el modelo en un hilo aparte y solo redibujan cada
+    # render_interval pasos (se ajustan en la barra lateral)
+    play_interval=100,
+    render_interval=1,
+    use_threads=True,
 )
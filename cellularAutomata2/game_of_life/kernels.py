@@ -0,0 +1,63 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba es opcional: sin él el modelo usa sus operaciones de numpy
+    njit = None
+
+# True si los núcleos están compilados (ConwaysGameOfLife solo los usa en ese caso)
+AVAILABLE = njit is not None
+
+
+def rows_step(states, rule_table):
+    """Next states for the exercise rule: each cell follows the three cells above it.
+
+    Args:
+        states: (width, height) array of 0/1 states on a torus
+        rule_table: next state for each pattern 4 * left + 2 * center + right
+
+    Returns:
+        (width, height) array with the next states
+    """
+    width, height = states.shape
+    next_states = np.empty_like(states)
+    for x in range(width):
+        left = (x - 1) % width
+        right = (x + 1) % width
+        for y in range(height):
+            upper_y = (y + 1) % height
+            pattern = 4 * states[left, upper_y] + 2 * states[x, upper_y] + states[right, upper_y]
+            next_states[x, y] = rule_table[pattern]
+    return next_states
+
+
+def life_step(states, rule_table):
+    """Next states for an outer-totalistic rule over the 8 Moore neighbors.
+
+    Args:
+        states: (width, height) array of 0/1 states on a torus
+        rule_table: (2, 9) table as returned by parse_rule
+
+    Returns:
+        (width, height) array with the next states
+    """
+    width, height = states.shape
+    next_states = np.empty_like(states)
+    for x in range(width):
+        left = (x - 1) % width
+        right = (x + 1) % width
+        for y in range(height):
+            down = (y - 1) % height
+            up = (y + 1) % height
+            count = (
+                states[left, down] + states[left, y] + states[left, up]
+                + states[x, down] + states[x, up]
+                + states[right, down] + states[right, y] + states[right, up]
+            )
+            next_states[x, y] = rule_table[states[x, y], count]
+    return next_states
+
+
+if AVAILABLE:
+    rows_step = njit(cache=True, nogil=True)(rows_step)
+    life_step = njit(cache=True, nogil=True)(life_step)
@@ -1,15 +1,171 @@
+from collections import Counter
+
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
+from . import kernels
 from .agent import Cell
+from .sparse import SparseLife, SparseRows
+
+# regla del ejercicio: cada celda copia la regla de las 3 celdas de la fila de arriba
+ROWS_RULE = "rows"
+
+# RULE_SET como tabla: el índice es el patrón "abc" leído como número binario
+RULE_TABLE = np.array(
+    [Cell.RULE_SET[f"{pattern:03b}"] for pattern in range(8)], dtype=np.uint8
+)
+
+
+def parse_rule(rule):
+    """Parse an outer-totalistic rule in B/S notation, like "B3/S23".
+
+    Returns:
+        (2, 9) lookup table: table[state, live_neighbors] is the next state
+    """
+    table = np.zeros((2, 9), dtype=np.uint8)
+    parts = rule.upper().replace(" ", "").split("/")
+    if sorted(part[:1] for part in parts) != ["B", "S"]:
+        raise ValueError(f"rule must look like 'B3/S23', got {rule!r}")
+    for part in parts:
+        counts = part[1:]
+        if not all(c in "012345678" for c in counts):
+            raise ValueError(f"neighbor counts must be digits 0-8, got {rule!r}")
+        # B: una celda muerta nace, S: una celda viva sobrevive
+        state = Cell.DEAD if part[0] == "B" else Cell.ALIVE
+        for c in counts:
+            table[state, int(c)] = Cell.ALIVE
+    return table
+
+
+def neighbor_counts(states):
+    """Count the live Moore neighbors of every cell on a torus.
+
+    Args:
+        states: (width, height) array of 0/1 states
+
+    Returns:
+        (width, height) array with the number of live neighbors (0-8)
+    """
+    # suma separable: primero las 3 columnas x-1, x, x+1 y luego las filas y-1, y, y+1
+    columns = states + np.roll(states, 1, axis=0) + np.roll(states, -1, axis=0)
+    block = columns + np.roll(columns, 1, axis=1) + np.roll(columns, -1, axis=1)
+    return block - states  # la celda no es su propia vecina
+
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(
+        self,
+        width=50,
+        height=50,
+        initial_fraction_alive=0.2,
+        seed=None,
+        rule=ROWS_RULE,
+        engine="dense",
+        initial_cells=None,
+        accelerate=False,
+    ):
+        """Create a new playing area of (width, height) cells.
+
+        rule is ROWS_RULE for the exercise rule (three cells of the row above) or an
+        outer-totalistic B/S rule such as "B3/S23" for 2D Life over the 8 neighbors.
+        engine "dense" keeps every state in an array; "sparse" only keeps the live
+        cells, so width and height can be huge. initial_cells ((x, y) positions of
+        the live cells) replaces the random initial states. accelerate computes the
+        dense steps with compiled loops (kernels.py) when numba is installed, so the
+        rows rule does not need the Cell agents either; it is ignored without numba.
+        """
         super().__init__(seed=seed)
+        self.width = width
+        self.height = height
+        self.rule = rule
+        self.rule_table = None if rule == ROWS_RULE else parse_rule(rule)
+        self.engine = engine
+        self.accelerate = accelerate
+        self.kernels = kernels if accelerate and kernels.AVAILABLE else None
+        if engine not in ("dense", "sparse"):
+            raise ValueError(f"engine must be 'dense' or 'sparse', got {engine!r}")
+
+        if initial_cells is None:
+            # estados iniciales aleatorios, recorriendo el grid por x y luego por y
+            # (el mismo orden que grid.all_cells)
+            initial_states = np.fromiter(
+                (
+                    Cell.ALIVE if self.random.random() < initial_fraction_alive else Cell.DEAD
+                    for _ in range(width * height)
+                ),
+                dtype=np.uint8,
+                count=width * height,
+            ).reshape(width, height)
+            initial_cells = zip(*np.nonzero(initial_states))
+        initial_cells = [(int(x) % width, int(y) % height) for x, y in initial_cells]
+
+        # el grid y los agentes se crean hasta que alguien los usa (ver cell_grid),
+        # salvo con la regla de filas densa sin núcleos, que hace que cada agente
+        # calcule su estado
+        self._grid = None
+        self._cell_grid = None
 
-        """Grid where cells are connected to their 8 neighbors.
+        if engine == "dense":
+            # estados como arreglo (width, height) para dibujar el grid como una imagen;
+            # row_versions[y] aumenta cada vez que cambia la fila y
+            self._states = np.zeros((width, height), dtype=np.uint8)
+            if initial_cells:
+                self._states[tuple(zip(*initial_cells))] = Cell.ALIVE
+            self._row_versions = np.zeros(height, dtype=np.int64)
+            if self.rule_table is None and self.kernels is None:
+                self._build_cells()
+        else:
+            # motor disperso: solo guarda las celdas vivas y cuántas veces cambió cada fila
+            if self.rule_table is None:
+                self.sparse_grid = SparseRows(width, height, RULE_TABLE, initial_cells)
+            else:
+                self.sparse_grid = SparseLife(width, height, self.rule_table, initial_cells)
+            self._row_changes = Counter()
+
+        self.running = True
+
+    @property
+    def states(self):
+        """(width, height) array with the state of every cell."""
+        if self.engine == "dense":
+            return self._states
+        # motor disperso: se arma solo cuando se pide (por ejemplo para dibujar)
+        return self.sparse_grid.to_array()
+
+    @property
+    def row_versions(self):
+        """Number of times each row changed."""
+        if self.engine == "dense":
+            return self._row_versions
+        versions = np.zeros(self.height, dtype=np.int64)
+        for y, count in self._row_changes.items():
+            versions[y] = count
+        return versions
+
+    def rows(self, ys):
+        """(width, len(ys)) array with the states of rows ys, without building the whole grid."""
+        if self.engine == "dense":
+            return self._states[:, ys]
+        return self.sparse_grid.rows(ys)
+
+    @property
+    def grid(self):
+        """Grid where cells are connected to their 8 neighbors (created on first use)."""
+        if self._grid is None:
+            self._build_cells()
+        return self._grid
+
+    @property
+    def cell_grid(self):
+        """Cell agents by position (created on first use)."""
+        if self._cell_grid is None:
+            self._build_cells()
+        return self._cell_grid
+
+    def _build_cells(self):
+        """Create the grid and one Cell agent per position with its current state.
 
         Example for two dimensions:
         directions = [
@@ -18,31 +174,66 @@ class ConwaysGameOfLife(Model):
             ( 1, -1), ( 1, 0), ( 1, 1),
         ]
         """
-
-        self.grid = OrthogonalMooreGrid((width, height), capacity=1, torus=True)
+        states = self.states
+        self._grid = OrthogonalMooreGrid((self.width, self.height), capacity=1, torus=True)
 
         # mantener referencias a los agentes por posición para acceso directo
-        self.cell_grid = {}
+        self._cell_grid = {}
 
-        # colocar una celula en cada sección, y asignar aleatoriamente ALIVE y DEAD
-        for cell in self.grid.all_cells:
+        # colocar una celula en cada sección con su estado actual
+        for cell in self._grid.all_cells:
             x, y = cell.coordinate
-            init_state = (
-                Cell.ALIVE
-                if self.random.random() < initial_fraction_alive
-                else Cell.DEAD
-            )
-
-            agent = Cell(self, cell, init_state=init_state)
-            self.cell_grid[(x, y)] = agent
-            
-        self.running = True
+            agent = Cell(self, cell, init_state=int(states[x, y]))
+            self._cell_grid[(x, y)] = agent
+
+    def _collect_states(self):
+        """Return the cell states as a (width, height) array."""
+        # cell_grid se llenó recorriendo el grid por x y luego por y
+        states = np.fromiter(
+            (agent.state for agent in self.cell_grid.values()),
+            dtype=np.uint8,
+            count=len(self.cell_grid),
+        )
+        return states.reshape(self.width, self.height)
 
     def step(self):
         """Perform the model step in two stages:
 
         - First, all cells compute their next state based on the 3 neighbors above
+          (or, with a B/S rule, on the number of live neighbors)
         - Then, all cells change state to their next state.
+
+        With the sparse engine only the cells next to a live cell are evaluated, and
+        with the compiled kernels the whole array is computed at once.
         """
-        self.agents.do("determine_state")
-        self.agents.do("assume_state")
\ No newline at end of file
+        if self.engine == "sparse":
+            born, died = self.sparse_grid.step()
+            # solo se marcan como cambiadas las filas con alguna celda distinta
+            self._row_changes.update({y for _, y in born | died})
+            # si ya existen los agentes, solo se actualizan las celdas que cambiaron
+            if self._cell_grid is not None:
+                for position in born:
+                    self._cell_grid[position].state = Cell.ALIVE
+                for position in died:
+                    self._cell_grid[position].state = Cell.DEAD
+            return
+
+        if self.rule_table is None and self.kernels is None:
+            self.agents.do("determine_state")
+            self.agents.do("assume_state")
+            states = self._collect_states()
+        else:
+            if self.kernels is None:
+                states = self.rule_table[self._states, neighbor_counts(self._states)]
+            elif self.rule_table is None:
+                states = self.kernels.rows_step(self._states, RULE_TABLE)
+            else:
+                states = self.kernels.life_step(self._states, self.rule_table)
+            # si ya existen los agentes, solo se actualizan las celdas que cambiaron
+            if self._cell_grid is not None:
+                for x, y in zip(*np.nonzero(states != self._states)):
+                    self._cell_grid[(int(x), int(y))].state = int(states[x, y])
+
+        # solo se marcan como cambiadas las filas con alguna celda distinta
+        self._row_versions[np.any(states != self._states, axis=0)] += 1
+        self._states = states
\ No newline at end of file
@@ -0,0 +1,74 @@
+# cellularAutomata1 y cellularAutomata2 son apps independientes (cada una se corre
+# desde su carpeta con solara run, sin un paquete común instalado), así que cada una
+# tiene su copia de este módulo; los cambios se hacen en las dos.
+import io
+
+import numpy as np
+import PIL.Image
+import solara
+from mesa.visualization.utils import update_counter
+
+
+# color de cada estado: DEAD = blanco, ALIVE = negro
+PALETTE = np.array([[255, 255, 255], [0, 0, 0]], dtype=np.uint8)
+
+
+class RasterBuffer:
+    """Paletted image of the model's state array that only repaints the rows that changed."""
+
+    def __init__(self, model, max_pixels=600):
+        """Create the image for the given model.
+
+        Args:
+            model: ConwaysGameOfLife with row_versions and rows(ys)
+            max_pixels: small grids are scaled up to roughly this many pixels per side
+        """
+        width, height = model.width, model.height
+        # escala entera para que cada celda sea un cuadro de scale x scale pixeles
+        self.scale = max(1, max_pixels // max(width, height))
+        # cada pixel guarda el estado de su celda; PALETTE le da el color al codificar
+        self.pixels = np.empty((height * self.scale, width * self.scale), dtype=np.uint8)
+        # versión de cada fila que ya está pintada (-1 = nunca pintada)
+        self.row_versions = np.full(height, -1, dtype=np.int64)
+        self._png = None
+
+    def update(self, model):
+        """Repaint the rows whose version changed and return the image as png bytes."""
+        changed = np.flatnonzero(model.row_versions != self.row_versions)
+        if len(changed):
+            height = len(self.row_versions)
+            # solo se piden las filas cambiadas (el motor disperso no arma el grid entero)
+            rows = np.repeat(model.rows(changed).T, self.scale, axis=1)
+            # la fila y del grid se dibuja abajo hacia arriba (y = 0 es la última fila de la imagen)
+            blocks = self.pixels.reshape(height, self.scale, -1)
+            blocks[height - 1 - changed] = rows[:, None]
+            self.row_versions[changed] = model.row_versions[changed]
+            self._png = None
+
+        if self._png is None:
+            image = PIL.Image.fromarray(self.pixels)
+            image.putpalette(PALETTE.tobytes())
+            data = io.BytesIO()
+            image.save(data, format="png", compress_level=1)  # compresión ligera: prioriza velocidad
+            self._png = data.getvalue()
+        return self._png
+
+
+def make_raster_component(max_pixels=600):
+    """Create a component that draws the model's states as a single image.
+
+    Args:
+        max_pixels: small grids are scaled up to roughly this many pixels per side
+
+    Returns:
+        function that creates the component for a model
+    """
+
+    def raster_component(model):
+        update_counter.get()  # se vuelve a dibujar en cada paso del modelo
+        buffer = solara.use_memo(
+            lambda: RasterBuffer(model, max_pixels), dependencies=[model]
+        )
+        return solara.Image(buffer.update(model))
+
+    return raster_component
@@ -0,0 +1,135 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+
+import numpy as np
+
+# desplazamientos de la vecindad de Moore (mismo orden que OrthogonalMooreGrid)
+MOORE_OFFSETS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+)
+
+
+class SparseGrid(ABC):
+    """Cells on a torus stored only as the set of live (x, y) positions.
+
+    Each generation only evaluates the cells next to a live cell, so memory and
+    step time scale with the population instead of the area. Subclasses define the
+    rule in _next_live.
+    """
+
+    def __init__(self, width, height, live=()):
+        """Create the grid.
+
+        Args:
+            width, height: size of the torus (can be huge: nothing of that size is stored)
+            live: (x, y) positions of the initial live cells
+        """
+        self.width = width
+        self.height = height
+        self.live = {(x % width, y % height) for x, y in live}
+        self.generation = 0
+
+    @abstractmethod
+    def _next_live(self):
+        """Return the set of live positions of the next generation."""
+
+    def step(self):
+        """Advance one generation.
+
+        Returns:
+            (born, died): sets with the positions that changed state
+        """
+        next_live = self._next_live()
+        born = next_live - self.live
+        died = self.live - next_live
+        self.live = next_live
+        self.generation += 1
+        return born, died
+
+    def to_array(self):
+        """Return the states as a dense (width, height) array (only for small grids)."""
+        states = np.zeros((self.width, self.height), dtype=np.uint8)
+        if self.live:
+            xs, ys = zip(*self.live)
+            states[list(xs), list(ys)] = 1
+        return states
+
+    def rows(self, ys):
+        """Return the states of rows ys as a dense (width, len(ys)) array.
+
+        Costs O(live cells + width * len(ys)) instead of the whole area of to_array.
+        """
+        states = np.zeros((self.width, len(ys)), dtype=np.uint8)
+        column = {int(y): i for i, y in enumerate(ys)}
+        cells = [(x, column[y]) for x, y in self.live if y in column]
+        if cells:
+            xs, columns = zip(*cells)
+            states[list(xs), list(columns)] = 1
+        return states
+
+
+class SparseLife(SparseGrid):
+    """Outer-totalistic B/S rule over the 8 Moore neighbors."""
+
+    def __init__(self, width, height, rule_table, live=()):
+        """Create the grid for a (2, 9) rule table as returned by parse_rule."""
+        if rule_table[0, 0]:
+            # con B0 las celdas lejos de toda celda viva también nacen
+            raise ValueError("rules with B0 cannot be sparse")
+        super().__init__(width, height, live)
+        self.birth = {n for n in range(9) if rule_table[0, n]}
+        self.survive = {n for n in range(9) if rule_table[1, n]}
+
+    def _next_live(self):
+        width, height = self.width, self.height
+        live = self.live
+
+        # vecinos vivos de cada candidata (las celdas junto a alguna viva)
+        counts = Counter(
+            ((x + dx) % width, (y + dy) % height)
+            for x, y in live
+            for dx, dy in MOORE_OFFSETS
+        )
+        next_live = {
+            cell
+            for cell, n in counts.items()
+            if (n in self.survive if cell in live else n in self.birth)
+        }
+        # las vivas sin ningún vecino vivo no aparecen en counts
+        if 0 in self.survive:
+            next_live.update(cell for cell in live if cell not in counts)
+        return next_live
+
+
+class SparseRows(SparseGrid):
+    """Exercise rule: each cell follows the three cells of the row above it."""
+
+    def __init__(self, width, height, rule_table, live=()):
+        """Create the grid for a rule table indexed by 4 * left + 2 * center + right."""
+        if rule_table[0]:
+            raise ValueError("rules where 000 becomes alive cannot be sparse")
+        super().__init__(width, height, live)
+        self.rule_table = rule_table
+
+    def _next_live(self):
+        width, height = self.width, self.height
+        live = self.live
+        rule_table = self.rule_table
+
+        # candidatas: las celdas debajo de una viva o de sus vecinas de fila
+        candidates = {
+            ((x + dx) % width, (y - 1) % height) for x, y in live for dx in (-1, 0, 1)
+        }
+        next_live = set()
+        for x, y in candidates:
+            upper_y = (y + 1) % height
+            pattern = (
+                4 * (((x - 1) % width, upper_y) in live)
+                + 2 * ((x, upper_y) in live)
+                + (((x + 1) % width, upper_y) in live)
+            )
+            if rule_table[pattern]:
+                next_live.add((x, y))
+        return next_live
@@ -1,22 +1,6 @@
 from game_of_life.model import ConwaysGameOfLife
-from mesa.visualization import (
-    SolaraViz,
-    make_space_component, # dibuja el grid
-)
-
-from mesa.visualization.components import AgentPortrayalStyle
-
-def agent_portrayal(agent): 
-    return AgentPortrayalStyle(
-        color="white" if agent.state == 0 else "black",
-        marker="s",
-        size=30,
-    )
-
-def post_process(ax): # que no se vean los numeros de la gráfica
-    ax.set_aspect("equal")
-    ax.set_xticks([])
-    ax.set_yticks([])
+from game_of_life.raster import make_raster_component # dibuja el grid como una imagen
+from mesa.visualization import SolaraViz
 
 model_params = {
     "seed": {
@@ -29,7 +13,7 @@ model_params = {
         "value": 50,
         "label": "Width",
         "min": 5,
-        "max": 60,
+        "max": 200,
         "step": 1,
     },
     "height": {
@@ -37,9 +21,26 @@ model_params = {
         "value": 50,
         "label": "Height",
         "min": 5,
-        "max": 60,
+        "max": 200,
         "step": 1,
     },
+    "rule": {
+        "type": "Select",
+        "value": "rows",
+        "values": ["rows", "B3/S23", "B36/S23", "B3678/S34678", "B2/S"],
+        "label": "Rule (rows = 3 cells above, B/S = 2D Life)",
+    },
+    "engine": {
+        "type": "Select",
+        "value": "dense",
+        "values": ["dense", "sparse"],
+        "label": "Engine (sparse = only live cells)",
+    },
+    "accelerate": {
+        "type": "Checkbox",
+        "value": False,
+        "label": "Compiled kernels (needs numba)",
+    },
     "initial_fraction_alive": {
         "type": "SliderFloat",
         "value": 0.2,
@@ -53,15 +54,17 @@ model_params = {
 # Create initial model instance
 gof_model = ConwaysGameOfLife()
 
-space_component = make_space_component(
-        agent_portrayal,
-        draw_grid = False,
-        post_process=post_process
-)
+# una sola imagen en lugar de un marcador por celda; solo se repintan las filas que cambiaron
+space_component = make_raster_component()
 
 page = SolaraViz(
     gof_model,
     components=[space_component],
     model_params=model_params,
     name="Game of Life",
+    # los controles de mesa corren el modelo en un hilo aparte y solo redibujan cada
+    # render_interval pasos (se ajustan en la barra lateral)
+    play_interval=100,
+    render_interval=1,
+    use_threads=True,
 )
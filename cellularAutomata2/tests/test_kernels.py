@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from game_of_life import kernels
+from game_of_life.model import RULE_TABLE, ConwaysGameOfLife, neighbor_counts, parse_rule
+
+LIFE_RULES = ["B3/S23", "B36/S23", "B3678/S34678", "B2/S"]
+
+requires_numba = pytest.mark.skipif(not kernels.AVAILABLE, reason="numba is not installed")
+
+
+def random_states(width, height, seed):
+    return (np.random.default_rng(seed).random((width, height)) < 0.3).astype(np.uint8)
+
+
+def python_version(kernel):
+    """Return the uncompiled function of a kernel (the kernel itself without numba)."""
+    return getattr(kernel, "py_func", kernel)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 5), (17, 9), (64, 64)])
+def test_rows_step_matches_the_cell_agents(shape):
+    model = ConwaysGameOfLife(*shape, seed=1)
+    states = model.states.copy()
+    model.step()
+
+    assert np.array_equal(python_version(kernels.rows_step)(states, RULE_TABLE), model.states)
+
+
+@pytest.mark.parametrize("rule", LIFE_RULES)
+@pytest.mark.parametrize("shape", [(1, 1), (3, 5), (17, 9), (64, 64)])
+def test_life_step_matches_numpy(rule, shape):
+    rule_table = parse_rule(rule)
+    states = random_states(*shape, seed=2)
+    expected = rule_table[states, neighbor_counts(states)]
+
+    assert np.array_equal(python_version(kernels.life_step)(states, rule_table), expected)
+
+
+@requires_numba
+@pytest.mark.parametrize("shape", [(1, 1), (3, 5), (64, 64)])
+def test_compiled_kernels_match_python(shape):
+    states = random_states(*shape, seed=3)
+    assert np.array_equal(
+        kernels.rows_step(states, RULE_TABLE), kernels.rows_step.py_func(states, RULE_TABLE)
+    )
+    for rule in LIFE_RULES:
+        rule_table = parse_rule(rule)
+        assert np.array_equal(
+            kernels.life_step(states, rule_table), kernels.life_step.py_func(states, rule_table)
+        )
+
+
+@requires_numba
+@pytest.mark.parametrize("rule", ["rows"] + LIFE_RULES)
+def test_accelerated_model_matches_default(rule):
+    default = ConwaysGameOfLife(30, 20, seed=4, rule=rule)
+    accelerated = ConwaysGameOfLife(30, 20, seed=4, rule=rule, accelerate=True)
+    assert accelerated.kernels is not None
+
+    for generation in range(40):
+        default.step()
+        accelerated.step()
+        if generation == 10:
+            accelerated.cell_grid  # a partir de aquí también se actualizan los agentes
+        assert np.array_equal(default.states, accelerated.states)
+        assert np.array_equal(default.row_versions, accelerated.row_versions)
+
+    assert all(
+        agent.state == accelerated.states[position]
+        for position, agent in accelerated.cell_grid.items()
+    )
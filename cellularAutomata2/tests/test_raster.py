@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from game_of_life.model import ConwaysGameOfLife
+from game_of_life.raster import RasterBuffer
+
+
+@pytest.mark.parametrize("engine", ["dense", "sparse"])
+@pytest.mark.parametrize("rule", ["rows", "B3/S23"])
+def test_rows_match_the_states(engine, rule):
+    model = ConwaysGameOfLife(23, 17, seed=2, rule=rule, engine=engine)
+    for _ in range(5):
+        model.step()
+
+    ys = np.array([0, 4, 16, 9])
+    assert np.array_equal(model.rows(ys), model.states[:, ys])
+    assert model.rows(np.array([], dtype=np.int64)).shape == (23, 0)
+
+
+def test_sparse_raster_only_asks_for_the_changed_rows(monkeypatch):
+    model = ConwaysGameOfLife(40, 30, seed=3, engine="sparse")
+    buffer = RasterBuffer(model, max_pixels=120)
+    buffer.update(model)
+
+    # repintar no debe armar el grid entero
+    monkeypatch.setattr(model.sparse_grid, "to_array", pytest.fail)
+    for _ in range(10):
+        model.step()
+        png = buffer.update(model)
+    monkeypatch.undo()
+
+    assert png == RasterBuffer(model, max_pixels=120).update(model)